@@ -0,0 +1,53 @@
+# app/api/core/bloom.py
+"""
+간단한 Bloom filter (외부 의존성 없음).
+
+- "없음" 판정은 확정, "있음" 판정은 오탐 가능 → 있음이면 원본(DB) 확인 필요
+- 비트 배열은 bytearray, 해시는 blake2b 128bit 를 둘로 나눈 double hashing
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    __slots__ = ("capacity", "error_rate", "num_bits", "num_hashes", "count", "_bits")
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001) -> None:
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = min(max(float(error_rate), 1e-9), 0.5)
+        m = math.ceil(-self.capacity * math.log(self.error_rate) / (math.log(2) ** 2))
+        self.num_bits = max(m, 8)
+        self.num_hashes = max(round(self.num_bits / self.capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % m
+
+    def add(self, key: str) -> None:
+        bits = self._bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def saturated(self) -> bool:
+        """설계 용량 초과 → 오탐률 상승(정확성은 유지). 재구성 권장"""
+        return self.count > self.capacity
+
+
+__all__ = ["BloomFilter"]
@@ -0,0 +1,79 @@
+# app/api/core/cache.py
+"""
+프로세스 내 LRU + TTL 캐시.
+
+- maxsize 초과 시 가장 오래 안 쓴 항목부터 제거
+- 항목마다 만료 시각(monotonic)을 따로 가짐
+- hit/miss 카운터는 metrics 레지스트리에 `<name>.hit` / `<name>.miss` 로 노출
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.api.core import metrics
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self.name = name
+        self.maxsize = max(int(maxsize), 1)
+        self.ttl = float(ttl)
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.hits = metrics.counter(f"{name}.hit")
+        self.misses = metrics.counter(f"{name}.miss")
+        metrics.gauge(f"{name}.size", lambda: len(self._data))
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses.inc()
+            return default
+        expires_at, value = item  # type: ignore[misc]
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            self.misses.inc()
+            return default
+        self._data.move_to_end(key)
+        self.hits.inc()
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(float(ttl), self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Optional[V]:
+        item = self._data.pop(key, _MISSING)
+        if item is _MISSING:
+            return default
+        return item[1]  # type: ignore[index]
+
+    def discard_if(self, predicate: Callable[[Hashable, V], bool]) -> int:
+        """predicate(key, value)가 참인 항목 제거 후 개수 반환 (O(n), 드문 무효화용)"""
+        doomed = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+        for k in doomed:
+            self._data.pop(k, None)
+        return len(doomed)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+__all__ = ["TTLCache"]
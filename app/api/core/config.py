@@ -5,12 +5,64 @@ from pydantic import Field
 class Settings(BaseSettings):
     # JWT/쿠키
     SECRET_KEY: str = "dev-secret"
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"              # HS256 | ES256 | EdDSA (app/api/core/jwt_keys.py)
+    #  - ES256/EdDSA: 서명 개인키(PEM 본문 또는 파일 경로), 키 교체 중 이전/다음 공개키 목록
+    #    새 키는 python -m app.api.scripts.gen_jwt_key --alg EdDSA
+    JWT_SIGNING_KEY: str | None = None
+    JWT_VERIFICATION_KEYS: list[str] = []
+    JWT_ACCEPT_HS256: bool = True             # 비대칭으로 옮기는 동안 kid 없는 기존 HS256 토큰 허용
+    JWT_BACKEND: str = "fast"                 # HS* 인코딩/검증: fast | jose (app/api/core/security.py)
     ACCESS_TOKEN_MINUTES: int = 60
     REFRESH_TOKEN_DAYS: int = 7
     COOKIE_SECURE: bool = False
     COOKIE_DOMAIN: str | None = None
 
+    # 인증 principal 캐시 (access jti -> User)
+    #  - TTL은 토큰 exp 를 넘지 않음. 다른 워커의 로그아웃은 최대 TTL 만큼 늦게 반영됨
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+
+    # GET /metrics 접근 토큰 (Authorization: Bearer <토큰>, 스크레이퍼에만 배포)
+    #  - 비어 있으면 /metrics 는 404 (사용자 수/캐시 크기 등 내부 값이 공개되지 않게)
+    METRICS_TOKEN: str | None = None
+
+    # 비밀번호 해시 정책
+    #  - 첫 번째 스킴으로 새로 해시, 나머지는 검증만 (로그인 시 자동 재해시)
+    #  - argon2 사용 시 `argon2-cffi` 설치 필요 (pip install .[argon2])
+    #  - env 예: PASSWORD_SCHEMES='["argon2","bcrypt"]'
+    PASSWORD_SCHEMES: list[str] = ["bcrypt"]
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
+    # 비밀번호 해시 워커 풀 ("thread" | "process")
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_CONCURRENCY: int = 4
+    PASSWORD_HASH_MAX_WAITING: int = 64
+
+    # 로그인 시도 제한 (app/api/core/ratelimit.py): IP 별 / (이메일, IP) 별 token bucket, 넘으면 bcrypt 전에 429
+    #  - 이메일 버킷은 비밀번호가 틀렸을 때만 씀 (LOGIN_EMAIL_* = 같은 IP 에서 한 계정에 허용하는 실패 횟수)
+    #  - 워커 로컬 기본. RATE_LIMIT_REDIS_URL 이 있으면 워커들이 같은 버킷 공유 (pip install .[redis])
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 10.0
+    LOGIN_EMAIL_BURST: int = 5
+    LOGIN_EMAIL_PER_MINUTE: float = 2.0
+    RATE_LIMIT_MAX_KEYS: int = 100_000          # 리미터별 최대 키 수 (넘으면 오래 안 쓴 키부터 제거)
+    RATE_LIMIT_EVICT_SECONDS: float = 60.0      # 가득 찬 버킷 정리 주기
+    RATE_LIMIT_REDIS_URL: str | None = None
+    # 앞단 프록시/로드밸런서 주소(IP 또는 CIDR). 여기서 온 요청만 X-Forwarded-For 로 클라이언트 IP 를 읽음
+    #  - 비어 있으면 연결 주소 그대로 (uvicorn --proxy-headers --forwarded-allow-ips 로 바꿔 둔 값이면 그것)
+    TRUSTED_PROXIES: list[str] = []
+
+    # 블랙리스트 Bloom filter (DB 조회 앞단)
+    #  - 다른 워커의 블랙리스트 등록은 최대 SYNC 주기만큼 늦게 보임
+    BLACKLIST_FILTER_CAPACITY: int = 100_000
+    BLACKLIST_FILTER_ERROR_RATE: float = 0.001
+    BLACKLIST_SYNC_SECONDS: float = 1.0
+    BLACKLIST_REBUILD_SECONDS: float = 600.0
+
     # DB (.env 키와 동일한 이름으로 정의)
     POSTGRES_HOST: str = Field("localhost")
     POSTGRES_PORT: int = Field(5432)
@@ -18,12 +70,74 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = Field("1234")
     POSTGRES_DB: str = Field("mydatabase")
 
+    # Postgres 커넥션 풀 (asyncpg) — DSN 쿼리스트링에 같은 키가 있으면 그쪽이 우선
+    #  - pgbouncer(transaction 모드) 뒤라면 DB_STATEMENT_CACHE_SIZE=0
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_MAX_QUERIES: int = 50_000
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float | None = 30.0
+    DB_MAX_INACTIVE_CONNECTION_LIFETIME: float = 300.0
+    DB_POOL_WARMUP: bool = True
+
+    # 읽기 복제본 (app/api/db/routing.py)
+    #  - env 예: DB_REPLICA_URLS='["postgres://u:p@replica1:5432/db"]'
+    #  - 쓴 사용자의 읽기는 READ_YOUR_WRITES 동안 primary 로 (워커 로컬)
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_HEALTH_SECONDS: float = 5.0
+    DB_REPLICA_HEALTH_TIMEOUT_SECONDS: float = 1.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore",
     )
 
+    # 일기 목록 페이지 캐시 (사용자별, 워커 로컬)
+    #  - 키에 users.diary_version(쓰기 트랜잭션에서 +1)이 들어가 어느 워커의 쓰기든 바로 miss
+    DIARY_LIST_CACHE_SIZE: int = 10_000
+    DIARY_LIST_CACHE_TTL_SECONDS: int = 10
+
+    # AI 요약/분석 결과 캐시 (내용 해시 키): 메모리 LRU + DB(ai_result) 2단
+    AI_CACHE_SIZE: int = 10_000
+    AI_CACHE_TTL_SECONDS: int = 86_400
+    AI_CACHE_DB_ENABLED: bool = True
+
+    # AI 백그라운드 작업 (DB 큐 ai_job, 워커는 각 앱 프로세스 안에서 실행)
+    AI_JOB_WORKER_ENABLED: bool = True
+    AI_JOB_CONCURRENCY: int = 4
+    AI_JOB_MAX_ATTEMPTS: int = 3
+    AI_JOB_BACKOFF_SECONDS: float = 2.0       # 1회 실패 후 대기, 이후 2배씩
+    AI_JOB_BACKOFF_MAX_SECONDS: float = 60.0
+    AI_JOB_POLL_SECONDS: float = 1.0          # 다른 프로세스가 넣은 작업을 찾는 주기
+    AI_JOB_LEASE_SECONDS: float = 300.0       # running 으로 이보다 오래 멈춘 작업은 재실행
+
+    # 주기 정리 (app/api/services/maintenance.py): 만료된 token_blacklist / revoked_tokens 삭제
+    #  - 여러 워커 중 maintenance_lease 를 잡은 하나만 실행
+    MAINTENANCE_ENABLED: bool = True
+    MAINTENANCE_INTERVAL_SECONDS: float = 300.0
+    MAINTENANCE_BATCH_SIZE: int = 1000          # DELETE 한 문장당 최대 행 수
+    MAINTENANCE_BATCH_PAUSE_SECONDS: float = 0.05
+    MAINTENANCE_LEASE_SECONDS: float = 900.0    # 리더가 이 시간 동안 갱신 못 하면 다른 워커가 넘겨받음
+
+    # Gemini REST 클라이언트 (httpx, 커넥션 재사용)
+    GEMINI_BASE_URL: str = "https://generativelanguage.googleapis.com"
+    GEMINI_MODEL: str = "gemini-1.5-flash"
+    AI_MAX_CONCURRENCY: int = 16              # 동시에 보내는 요청 수(=커넥션 풀 크기), 넘치면 대기
+    AI_HTTP_TIMEOUT_SECONDS: float = 30.0
+
+    # AI provider 체인 (Gemini → rule-based 폴백)
+    AI_CALL_DEADLINE_SECONDS: float = 8.0     # 호출 하나의 총 마감, 넘으면 폴백
+    AI_SLOW_CALL_SECONDS: float = 4.0         # 성공했어도 이보다 느리면 브레이커에 실패로 셈
+    AI_BREAKER_FAILURES: int = 5              # 연속 실패 횟수 → open
+    AI_BREAKER_RESET_SECONDS: float = 30.0    # open 유지 시간, 이후 시험 호출 1번(half-open)
+
+    # AI 일괄 분석 (POST /ai/diaries/analyze-bulk, scripts/bulk_analyze.py)
+    AI_BULK_CONCURRENCY: int = 4              # 동시에 진행하는 provider 호출 수
+    AI_BULK_PROMPT_SIZE: int = 8              # Gemini 프롬프트 하나에 묶는 일기 수
+    AI_BULK_MAX_DIARIES: int = 500            # API 한 번에 처리하는 최대 일기 수
+
     # 🔽 테스트에서 인메모리 레포를 쓸지 여부
     USE_FAKE_REPOS: bool = Field(default=False, alias="USE_FAKE_REPOS")
 
@@ -0,0 +1,274 @@
+# app/api/core/jwt_keys.py
+"""
+JWT 비대칭 서명 키 (ES256 / EdDSA) + kid + JWKS.
+
+- JWT_ALGORITHM 이 ES256 / EdDSA 면 JWT_SIGNING_KEY(PEM 개인키 또는 그 파일 경로)로 서명
+  · 헤더 kid = 공개키 JWK thumbprint (RFC 7638) → 키마다 자동으로 다름, 따로 설정 없음
+- 검증 키 = 서명 키의 공개키 + JWT_VERIFICATION_KEYS (PEM 공개키 또는 파일 경로 목록)
+  · 키 교체: 새 키로 JWT_SIGNING_KEY 를 바꾸고 이전 공개키를 VERIFICATION_KEYS 에 남겨 두면
+    이미 발급된 토큰은 만료까지 계속 통과 (REFRESH_TOKEN_DAYS 뒤 목록에서 제거)
+  · JWT_ACCEPT_HS256: HS256 에서 옮기는 동안 kid 없는 기존 토큰은 SECRET_KEY 로 검증
+- PEM 파싱/공개키 JWK 계산은 get_keyring() 에서 한 번 (요청마다 키를 읽지 않음)
+  설정을 바꿨으면 reload_keyring()
+- python-jose 는 EdDSA 를 지원하지 않아 compact JWS 를 cryptography 로 직접 서명/검증
+- /.well-known/jwks.json (app/main.py): 검증 키 공개 → 다른 서비스가 /users/me 호출 없이 로컬 검증
+- base64url / JSON(orjson 있으면) / 클레임 검증 헬퍼는 security.py 의 fast HS 백엔드와 같이 씀
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+from jose import JWTError
+from jose.exceptions import ExpiredSignatureError
+
+from app.api.core.config import settings
+
+try:
+    import orjson
+except Exception:  # 미설치 대비
+    orjson = None
+
+ASYMMETRIC_ALGORITHMS = ("ES256", "EdDSA")
+
+
+def json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def to_claims(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """datetime 값 → epoch 초 (python-jose 와 같은 변환)"""
+    return {k: int(v.timestamp()) if isinstance(v, datetime) else v for k, v in payload.items()}
+
+
+def validate_claims(claims: Any) -> Dict[str, Any]:
+    """서명 검증 뒤 시간 클레임 확인 (python-jose 기본 옵션과 같게: exp/nbf/iat 숫자, exp 지남 → 만료)"""
+    if not isinstance(claims, dict):
+        raise JWTError("Invalid payload")
+    for name in ("exp", "nbf", "iat"):
+        value = claims.get(name)
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+            raise JWTError(f"Invalid {name} claim")
+    now = time.time()
+    if (nbf := claims.get("nbf")) is not None and nbf > now:
+        raise JWTError("The token is not yet valid (nbf)")
+    if (exp := claims.get("exp")) is not None and exp < now:
+        raise ExpiredSignatureError("Signature has expired")
+    return claims
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _read_pem(value: str) -> bytes:
+    """PEM 본문이면 그대로, 아니면 파일 경로로 보고 읽음"""
+    if value.lstrip().startswith("-----BEGIN"):
+        return value.encode()
+    return Path(value).read_bytes()
+
+
+def _alg_of(public_key: Any) -> str:
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and isinstance(public_key.curve, ec.SECP256R1):
+        return "ES256"
+    raise ValueError(f"unsupported JWT key type: {type(public_key).__name__} (ES256 P-256 / EdDSA Ed25519 only)")
+
+
+def _jwk(public_key: Any) -> Dict[str, str]:
+    """JWK 필수 멤버만 (thumbprint 계산용)"""
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        return {"crv": "Ed25519", "kty": "OKP", "x": b64url_encode(raw)}
+    numbers = public_key.public_numbers()
+    return {
+        "crv": "P-256",
+        "kty": "EC",
+        "x": b64url_encode(numbers.x.to_bytes(32, "big")),
+        "y": b64url_encode(numbers.y.to_bytes(32, "big")),
+    }
+
+
+def _thumbprint(jwk: Dict[str, str]) -> str:
+    canonical = json.dumps(jwk, sort_keys=True, separators=(",", ":"))
+    return b64url_encode(hashlib.sha256(canonical.encode()).digest())
+
+
+class VerificationKey:
+    """파싱된 공개키 + kid/alg/JWK (검증 때 그대로 사용)"""
+
+    def __init__(self, public_key: Any) -> None:
+        self.public_key = public_key
+        self.alg = _alg_of(public_key)
+        jwk = _jwk(public_key)
+        self.kid = _thumbprint(jwk)
+        self.jwk = {**jwk, "kid": self.kid, "alg": self.alg, "use": "sig"}
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            if self.alg == "EdDSA":
+                self.public_key.verify(signature, signing_input)
+            else:
+                if len(signature) != 64:
+                    return False
+                r = int.from_bytes(signature[:32], "big")
+                s = int.from_bytes(signature[32:], "big")
+                self.public_key.verify(encode_dss_signature(r, s), signing_input, ec.ECDSA(hashes.SHA256()))
+        except InvalidSignature:
+            return False
+        return True
+
+
+class SigningKey(VerificationKey):
+    def __init__(self, private_key: Any) -> None:
+        super().__init__(private_key.public_key())
+        self.private_key = private_key
+        header = {"alg": self.alg, "typ": "JWT", "kid": self.kid}
+        # 헤더는 키마다 고정 → 인코딩해 둔 조각 재사용
+        self.header_segment = b64url_encode(json_dumps(header))
+
+    def sign(self, signing_input: bytes) -> bytes:
+        if self.alg == "EdDSA":
+            return self.private_key.sign(signing_input)
+        r, s = decode_dss_signature(self.private_key.sign(signing_input, ec.ECDSA(hashes.SHA256())))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+
+class KeyRing:
+    def __init__(self, signing: Optional[SigningKey], verification: List[VerificationKey]) -> None:
+        self.signing = signing
+        self.by_kid: Dict[str, VerificationKey] = {}
+        for key in ([signing] if signing else []) + verification:
+            self.by_kid.setdefault(key.kid, key)
+
+    @classmethod
+    def from_settings(cls) -> "KeyRing":
+        signing = None
+        if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+            if not settings.JWT_SIGNING_KEY:
+                raise ValueError(f"JWT_SIGNING_KEY is required for {settings.JWT_ALGORITHM}")
+            private_key = serialization.load_pem_private_key(_read_pem(settings.JWT_SIGNING_KEY), password=None)
+            signing = SigningKey(private_key)
+            if signing.alg != settings.JWT_ALGORITHM:
+                raise ValueError(f"JWT_SIGNING_KEY is a {signing.alg} key, JWT_ALGORITHM is {settings.JWT_ALGORITHM}")
+        verification = [
+            VerificationKey(serialization.load_pem_public_key(_read_pem(v)))
+            for v in settings.JWT_VERIFICATION_KEYS
+        ]
+        return cls(signing, verification)
+
+    def jwks(self) -> Dict[str, List[Dict[str, str]]]:
+        return {"keys": [k.jwk for k in self.by_kid.values()]}
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        if self.signing is None:
+            raise ValueError("no asymmetric signing key configured")
+        payload_segment = b64url_encode(json_dumps(to_claims(claims)))
+        signing_input = f"{self.signing.header_segment}.{payload_segment}"
+        return f"{signing_input}.{b64url_encode(self.signing.sign(signing_input.encode()))}"
+
+    def decode(self, token: str, header: Dict[str, Any]) -> Dict[str, Any]:
+        """header 는 호출부가 이미 읽은 것 (kid 로 키 선택, alg 는 키와 같아야 함)"""
+        key = self.by_kid.get(header.get("kid"))  # type: ignore[arg-type]
+        if key is None or header.get("alg") != key.alg:
+            raise JWTError("Unknown signing key")
+        try:
+            signing_input, signature = token.rsplit(".", 1)
+            ok = key.verify(signing_input.encode(), b64url_decode(signature))
+        except ValueError:
+            raise JWTError("Malformed token")
+        if not ok:
+            raise JWTError("Signature verification failed")
+        try:
+            claims = json_loads(b64url_decode(signing_input.split(".", 1)[1]))
+        except ValueError:
+            raise JWTError("Invalid payload")
+        return validate_claims(claims)
+
+
+def read_header(token: str) -> Dict[str, Any]:
+    try:
+        header = json_loads(b64url_decode(token.split(".", 1)[0]))
+    except ValueError:
+        raise JWTError("Invalid header")
+    if not isinstance(header, dict):
+        raise JWTError("Invalid header")
+    return header
+
+
+_keyring: Optional[KeyRing] = None
+
+
+def get_keyring() -> KeyRing:
+    global _keyring
+    if _keyring is None:
+        _keyring = KeyRing.from_settings()
+    return _keyring
+
+
+def reload_keyring() -> KeyRing:
+    """설정(키) 변경 후 다시 파싱"""
+    global _keyring
+    _keyring = None
+    return get_keyring()
+
+
+def generate_private_key_pem(alg: str) -> str:
+    """새 서명 키 (scripts/gen_jwt_key.py, 테스트)"""
+    if alg == "EdDSA":
+        key: Any = ed25519.Ed25519PrivateKey.generate()
+    elif alg == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise ValueError(f"unsupported algorithm: {alg}")
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+def public_key_pem(private_pem: str) -> str:
+    key = serialization.load_pem_private_key(_read_pem(private_pem), password=None)
+    return key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+
+__all__ = [
+    "ASYMMETRIC_ALGORITHMS",
+    "KeyRing",
+    "SigningKey",
+    "VerificationKey",
+    "get_keyring",
+    "reload_keyring",
+    "read_header",
+    "generate_private_key_pem",
+    "public_key_pem",
+    "b64url_encode",
+    "b64url_decode",
+    "json_dumps",
+    "json_loads",
+    "to_claims",
+    "validate_claims",
+]
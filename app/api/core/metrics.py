@@ -0,0 +1,153 @@
+# app/api/core/metrics.py
+"""
+프로세스 내 간단한 메트릭 레지스트리.
+
+- 외부 의존성 없이 카운터/게이지/히스토그램 제공 (워커별 값)
+- GET /metrics 에서 snapshot()을 그대로 JSON으로 내려줌
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+
+class Counter:
+    """단조 증가 카운터"""
+
+    __slots__ = ("name", "_value", "_lock")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1) -> None:
+        with self._lock:
+            self._value += n
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = 0
+
+
+class Gauge:
+    """현재값 게이지. fn을 주면 조회 시점에 계산한다."""
+
+    __slots__ = ("name", "_value", "_fn")
+
+    def __init__(self, name: str, fn: Optional[Callable[[], float]] = None) -> None:
+        self.name = name
+        self._value: float = 0
+        self._fn = fn
+
+    def set(self, v: float) -> None:
+        self._value = v
+
+    def inc(self, n: float = 1) -> None:
+        self._value += n
+
+    def dec(self, n: float = 1) -> None:
+        self._value -= n
+
+    @property
+    def value(self) -> float:
+        if self._fn is not None:
+            try:
+                return self._fn()
+            except Exception:
+                return 0
+        return self._value
+
+    def reset(self) -> None:
+        self._value = 0
+
+
+# ms 단위 기본 버킷 (상한 포함, 마지막은 +Inf)
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """고정 버킷 히스토그램. value 는 누적(le) 개수 + count/sum"""
+
+    __slots__ = ("name", "_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.name = name
+        self._bounds = sorted(buckets)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, v: float) -> None:
+        i = bisect.bisect_left(self._bounds, v)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += v
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def value(self) -> Dict[str, Any]:
+        le: Dict[str, int] = {}
+        running = 0
+        for bound, n in zip([*map(str, self._bounds), "+Inf"], self._counts):
+            running += n
+            le[bound] = running
+        return {"count": running, "sum": round(self._sum, 3), "le": le}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self._bounds) + 1)
+            self._sum = 0.0
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+_registry: Dict[str, Metric] = {}
+_lock = threading.Lock()
+
+
+def counter(name: str) -> Counter:
+    with _lock:
+        m = _registry.get(name)
+        if m is None:
+            m = _registry[name] = Counter(name)
+        return m  # type: ignore[return-value]
+
+
+def gauge(name: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+    with _lock:
+        m = _registry.get(name)
+        if m is None:
+            m = _registry[name] = Gauge(name, fn)
+        elif fn is not None:
+            m._fn = fn  # type: ignore[union-attr]
+        return m  # type: ignore[return-value]
+
+
+def histogram(name: str, buckets: Sequence[float] = DEFAULT_BUCKETS_MS) -> Histogram:
+    with _lock:
+        m = _registry.get(name)
+        if m is None:
+            m = _registry[name] = Histogram(name, buckets)
+        return m  # type: ignore[return-value]
+
+
+def snapshot() -> Dict[str, Any]:
+    return {name: m.value for name, m in sorted(_registry.items())}
+
+
+def _reset() -> None:
+    """테스트용: 값만 0으로 (등록된 메트릭 객체는 유지)"""
+    for m in _registry.values():
+        m.reset()
+
+
+__all__ = ["Counter", "Gauge", "Histogram", "counter", "gauge", "histogram", "snapshot", "_reset"]
@@ -0,0 +1,272 @@
+# app/api/core/ratelimit.py
+"""
+로그인 시도 제한 (token bucket, IP 별 + (이메일, IP) 별).
+
+- 버킷: 용량 burst, 분당 per_minute 개씩 다시 참. 시도마다 1개 쓰고 없으면 거부 + 다시 찰 때까지 초(Retry-After)
+- IP 버킷: 시도마다 1개. 이메일 버킷: 키 = (이메일, IP), 비밀번호가 틀렸을 때만 1개 (check 에선 남았는지만 봄)
+  → 다른 곳에서 남의 이메일로 틀려도 그 사용자의 로그인은 막히지 않고, 성공한 로그인은 버킷을 쓰지 않음
+- 클라이언트 IP: 직접 연결한 주소가 TRUSTED_PROXIES 안이면 X-Forwarded-For 를 오른쪽부터 읽어
+  신뢰하지 않는 첫 주소 (프록시 뒤에서 모든 요청이 프록시 IP 하나로 묶이지 않게, 헤더 위조는 무시)
+- 워커 로컬 저장: OrderedDict key → (남은 토큰, 갱신 시각 monotonic), 최근 쓴 키가 뒤
+  · RATE_LIMIT_EVICT_SECONDS 마다(요청 경로에서, 별도 태스크 없음) 가득 찬 버킷 제거
+    (가득 찬 버킷 = 새 버킷과 같으므로 지워도 결과 동일)
+  · RATE_LIMIT_MAX_KEYS 초과 시 가장 오래 안 쓴 키부터 제거 (키를 흩뿌리는 공격에도 메모리 상한)
+- 공유 저장(선택): RATE_LIMIT_REDIS_URL 이 있으면 여러 워커가 Redis 의 같은 버킷 사용
+  (pip install .[redis], Lua 스크립트로 원자적 갱신, 시각은 Redis 서버 기준)
+  Redis 오류 시엔 워커 로컬 버킷으로 계속 (로그인 자체를 막지 않음)
+- /auth/login 맨 앞에서 check, 비밀번호 확인 실패 시 failed → 거부는 사용자 조회/bcrypt 전에 429
+- 메트릭: ratelimit.login.allowed / ratelimit.login.rejected(.ip/.email), ratelimit.login.<ip|email>.keys
+"""
+from __future__ import annotations
+
+import ipaddress
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+
+from app.api.core import metrics
+from app.api.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except Exception:  # 미설치 대비
+    aioredis = None
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucketLimiter:
+    """키별 token bucket (워커 로컬)"""
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: float,
+        burst: int,
+        maxsize: int = 100_000,
+        evict_seconds: float = 60.0,
+    ) -> None:
+        self.name = name
+        self.rate = max(float(per_minute), 1e-9) / 60.0
+        self.burst = max(int(burst), 1)
+        self.maxsize = max(int(maxsize), 1)
+        self.evict_seconds = evict_seconds
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._evicted_at = time.monotonic()
+        metrics.gauge(f"{name}.keys", lambda: len(self._buckets))
+
+    def hit(self, key: str, now: Optional[float] = None, cost: int = 1) -> float:
+        """
+        토큰 cost 개 사용. 허용이면 0, 거부면 다음 토큰까지 남은 초.
+        cost=0: 남았는지만 확인 (없는 키는 새 버킷 = 허용, 저장하지 않음)
+        """
+        now = time.monotonic() if now is None else now
+        if now - self._evicted_at >= self.evict_seconds:
+            self.evict(now)
+        if cost == 0 and key not in self._buckets:
+            return 0.0
+        tokens, stamp = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+        if tokens >= 1:
+            tokens -= cost
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """가득 찬(= 새것과 같은) 버킷 제거, 제거 수 반환"""
+        now = time.monotonic() if now is None else now
+        self._evicted_at = now
+        full = [
+            k for k, (tokens, stamp) in self._buckets.items()
+            if tokens + (now - stamp) * self.rate >= self.burst
+        ]
+        for k in full:
+            del self._buckets[k]
+        return len(full)
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# KEYS[1]=버킷 키, ARGV: 초당 토큰, 용량, 쓸 토큰 수 → 허용이면 0, 거부면 다음 토큰까지 ms
+_REDIS_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+if cost == 0 and not state[1] then
+  return 0
+end
+local tokens = tonumber(state[1]) or burst
+local stamp = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - stamp) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - cost
+else
+  wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return wait
+"""
+
+
+class RedisBuckets:
+    """여러 워커가 같이 쓰는 버킷 (버킷이 가득 차는 시간이 지나면 키가 만료되어 정리됨)"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:") -> None:
+        if aioredis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL requires the redis package (pip install .[redis])")
+        self.prefix = prefix
+        self._client = aioredis.from_url(url)
+        self._script = self._client.register_script(_REDIS_BUCKET)
+
+    async def hit(self, limiter: TokenBucketLimiter, key: str, cost: int = 1) -> float:
+        wait_ms = await self._script(
+            keys=[f"{self.prefix}{limiter.name}:{key}"], args=[limiter.rate, limiter.burst, cost]
+        )
+        return int(wait_ms) / 1000.0
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _in_networks(host: str, networks: List[_Network]) -> bool:
+    try:
+        addr = ipaddress.ip_address(host.strip())
+    except ValueError:
+        return False
+    return any(addr in net for net in networks)
+
+
+class LoginLimiter:
+    def __init__(self) -> None:
+        self.trusted_proxies: List[_Network] = [
+            ipaddress.ip_network(p, strict=False) for p in settings.TRUSTED_PROXIES
+        ]
+        common = dict(maxsize=settings.RATE_LIMIT_MAX_KEYS, evict_seconds=settings.RATE_LIMIT_EVICT_SECONDS)
+        self.by_ip = TokenBucketLimiter(
+            "ratelimit.login.ip", settings.LOGIN_IP_PER_MINUTE, settings.LOGIN_IP_BURST, **common
+        )
+        self.by_email = TokenBucketLimiter(
+            "ratelimit.login.email", settings.LOGIN_EMAIL_PER_MINUTE, settings.LOGIN_EMAIL_BURST, **common
+        )
+        self.shared = RedisBuckets(settings.RATE_LIMIT_REDIS_URL) if settings.RATE_LIMIT_REDIS_URL else None
+        self._allowed = metrics.counter("ratelimit.login.allowed")
+        self._rejected = metrics.counter("ratelimit.login.rejected")
+        self._rejected_by = {
+            "ip": metrics.counter("ratelimit.login.rejected.ip"),
+            "email": metrics.counter("ratelimit.login.rejected.email"),
+        }
+
+    def client_ip(self, request: Request) -> Optional[str]:
+        """
+        시도 제한에 쓸 클라이언트 IP. 직접 연결한 주소가 신뢰 프록시면 X-Forwarded-For 를
+        오른쪽(가까운 프록시)부터 보며 신뢰 프록시가 아닌 첫 주소
+        (uvicorn --proxy-headers/--forwarded-allow-ips 로 이미 바뀐 request.client 도 그대로 동작)
+        """
+        host = request.client.host if request.client else None
+        if host is None or not self.trusted_proxies or not _in_networks(host, self.trusted_proxies):
+            return host
+        hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+        for hop in reversed(hops):
+            if not _in_networks(hop, self.trusted_proxies):
+                return hop
+        return hops[0] if hops else host
+
+    async def _hit(self, limiter: TokenBucketLimiter, key: str, cost: int = 1) -> float:
+        if self.shared is not None:
+            try:
+                return await self.shared.hit(limiter, key, cost)
+            except Exception as e:
+                log.warning("shared rate limit backend failed, using local buckets: %r", e)
+        return limiter.hit(key, cost=cost)
+
+    @staticmethod
+    def _email_key(ip: Optional[str], email: str) -> str:
+        return f"{email.strip().lower()}|{ip or 'unknown'}"
+
+    async def check(self, ip: Optional[str], email: str) -> None:
+        """
+        허용이면 그대로, 아니면 429. IP 버킷은 1개 쓰고, (이메일, IP) 버킷은 남았는지만 봄
+        (IP 먼저 — 막힌 IP 의 시도는 이메일 버킷을 보지 않음)
+        """
+        if not settings.LOGIN_RATE_LIMIT_ENABLED:
+            return
+        checks = (
+            ("ip", self.by_ip, ip or "unknown", 1),
+            ("email", self.by_email, self._email_key(ip, email), 0),
+        )
+        for dimension, limiter, key, cost in checks:
+            retry_after = await self._hit(limiter, key, cost)
+            if retry_after > 0:
+                self._rejected.inc()
+                self._rejected_by[dimension].inc()
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many login attempts",
+                    headers={"Retry-After": str(max(int(retry_after + 0.999), 1))},
+                )
+        self._allowed.inc()
+
+    async def failed(self, ip: Optional[str], email: str) -> None:
+        """비밀번호 확인 실패 (없는 이메일 포함) → (이메일, IP) 버킷에서 1개"""
+        if settings.LOGIN_RATE_LIMIT_ENABLED:
+            await self._hit(self.by_email, self._email_key(ip, email))
+
+    def reset(self) -> None:
+        self.by_ip.reset()
+        self.by_email.reset()
+
+    async def aclose(self) -> None:
+        if self.shared is not None:
+            await self.shared.aclose()
+
+
+_login_limiter: Optional[LoginLimiter] = None
+
+
+def get_login_limiter() -> LoginLimiter:
+    global _login_limiter
+    if _login_limiter is None:
+        _login_limiter = LoginLimiter()
+    return _login_limiter
+
+
+def configure_login_limiter() -> LoginLimiter:
+    """Settings 변경 후 다시 만듦 (테스트/런타임 튜닝용, 쌓인 버킷은 버림)"""
+    global _login_limiter
+    _login_limiter = LoginLimiter()
+    return _login_limiter
+
+
+async def close_login_limiter() -> None:
+    if _login_limiter is not None:
+        await _login_limiter.aclose()
+
+
+__all__ = [
+    "TokenBucketLimiter",
+    "RedisBuckets",
+    "LoginLimiter",
+    "get_login_limiter",
+    "configure_login_limiter",
+    "close_login_limiter",
+]
@@ -0,0 +1,97 @@
+# app/api/core/responses.py
+"""
+빠른 JSON 응답.
+
+- orjson 이 있으면 사용(선택 의존성: pip install .[speedups]), 없으면 stdlib json
+- 이미 bytes 로 인코딩된 본문은 그대로 전송 (FastAPI 재검증/재인코딩 생략)
+- datetime/date 는 FastAPI 기본 인코더와 같은 isoformat 문자열
+- ETag / If-None-Match 헬퍼 (일치하면 본문 없이 304)
+- Server-Sent Events: sse_event() 로 이벤트 한 개 인코딩, EventStreamResponse 로 전송
+"""
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+from typing import Any, AsyncIterable, Mapping, Optional
+
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except Exception:  # 미설치 대비
+    orjson = None
+
+
+def _default(o: Any) -> Any:
+    if isinstance(o, (dt.datetime, dt.date, dt.time)):
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """`event: <이름>` + `data: <JSON 한 줄>` (줄바꿈은 JSON 이스케이프로 data 한 줄 유지)"""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class EventStreamResponse(StreamingResponse):
+    """text/event-stream. 프록시 버퍼링/캐시를 끄고 조각을 바로 내보냄"""
+
+    media_type = "text/event-stream"
+
+    def __init__(self, content: AsyncIterable[bytes], status_code: int = 200) -> None:
+        super().__init__(
+            content,
+            status_code=status_code,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
+def make_etag(data: bytes) -> str:
+    """강한 ETag (따옴표 포함)"""
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 비교 (RFC 9110: 약한 비교, 목록/`*` 허용)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(status_code=304, headers=dict(headers or {}))
+
+
+__all__ = [
+    "dumps",
+    "FastJSONResponse",
+    "sse_event",
+    "EventStreamResponse",
+    "make_etag",
+    "etag_matches",
+    "not_modified",
+]
@@ -1,16 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import hmac
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Any
+from typing import Callable, Optional, Any, Protocol, TypeVar
 
+import anyio
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
+from app.api.core import metrics
+from app.api.core.cache import TTLCache
 from app.api.core.config import settings
+from app.api.core.jwt_keys import (
+    ASYMMETRIC_ALGORITHMS,
+    b64url_decode,
+    b64url_encode,
+    get_keyring,
+    json_dumps,
+    json_loads,
+    read_header,
+    to_claims,
+    validate_claims,
+)
 
 # ---------------------------------------------------------------------
 # Auth header(Bearer) 파서
@@ -19,8 +38,58 @@ bearer = HTTPBearer(auto_error=False)
 
 # ---------------------------------------------------------------------
 # Password hashing
+#  - 정책은 Settings 에서: PASSWORD_SCHEMES 첫 번째가 신규 해시 방식,
+#    나머지는 검증만 하고 deprecated 처리(→ 로그인 성공 시 재해시)
+#  - bcrypt rounds / argon2 파라미터가 바뀌어도 needs_update 로 감지
 # ---------------------------------------------------------------------
-_pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_password_context(
+    schemes: Optional[list[str]] = None,
+    *,
+    bcrypt_rounds: Optional[int] = None,
+    argon2_time_cost: Optional[int] = None,
+    argon2_memory_cost: Optional[int] = None,
+    argon2_parallelism: Optional[int] = None,
+) -> CryptContext:
+    """Settings(또는 인자로 덮어쓴 값)로 CryptContext 생성. 벤치마크에서도 사용"""
+    schemes = list(schemes or settings.PASSWORD_SCHEMES or ["bcrypt"])
+    opts: dict[str, Any] = {}
+    if "bcrypt" in schemes:
+        opts["bcrypt__rounds"] = bcrypt_rounds or settings.BCRYPT_ROUNDS
+    if "argon2" in schemes:
+        opts["argon2__time_cost"] = argon2_time_cost or settings.ARGON2_TIME_COST
+        opts["argon2__memory_cost"] = argon2_memory_cost or settings.ARGON2_MEMORY_COST
+        opts["argon2__parallelism"] = argon2_parallelism or settings.ARGON2_PARALLELISM
+    return CryptContext(schemes=schemes, deprecated="auto", **opts)
+
+def _password_policy() -> tuple:
+    """CryptContext 를 다시 만드는 데 필요한 설정 값 (프로세스 풀 작업에 같이 넘김)"""
+    return (
+        tuple(settings.PASSWORD_SCHEMES or ["bcrypt"]),
+        settings.BCRYPT_ROUNDS,
+        settings.ARGON2_TIME_COST,
+        settings.ARGON2_MEMORY_COST,
+        settings.ARGON2_PARALLELISM,
+    )
+
+@functools.lru_cache(maxsize=8)
+def _context_for(policy: tuple) -> CryptContext:
+    schemes, rounds, time_cost, memory_cost, parallelism = policy
+    return build_password_context(
+        list(schemes),
+        bcrypt_rounds=rounds,
+        argon2_time_cost=time_cost,
+        argon2_memory_cost=memory_cost,
+        argon2_parallelism=parallelism,
+    )
+
+_pwd_policy = _password_policy()
+_pwd_ctx = _context_for(_pwd_policy)
+
+def configure_password_context() -> None:
+    """Settings 변경 후 컨텍스트 재생성 (테스트/런타임 튜닝용, 해시 워커에는 다음 작업부터 반영)"""
+    global _pwd_ctx, _pwd_policy
+    _pwd_policy = _password_policy()
+    _pwd_ctx = _context_for(_pwd_policy)
 
 def get_password_hash(password: str) -> str:
     return _pwd_ctx.hash(password)
@@ -28,9 +97,90 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return _pwd_ctx.verify(plain_password, hashed_password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """현재 정책과 다른 방식/비용의 해시인지 (검증 없이 해시 문자열만 파싱)"""
+    try:
+        return _pwd_ctx.needs_update(hashed_password)
+    except ValueError:
+        return False
+
 # (호환용 별칭: 기존 코드에서 hash_password를 쓴 경우 지원)
 hash_password = get_password_hash
 
+# ---------------------------------------------------------------------
+# Password hashing (async)
+#  - bcrypt는 호출당 수십 ms CPU → 이벤트 루프 밖(스레드/프로세스)에서 실행
+#  - 동시 실행 수는 PASSWORD_HASH_CONCURRENCY 로 제한
+#  - 대기열이 PASSWORD_HASH_MAX_WAITING 이상이면 즉시 503 (로그인 폭주 시 워커 보호)
+#  - 작업마다 정책(_pwd_policy)을 같이 넘김 → 프로세스 풀 자식이 fork 시점의 옛 _pwd_ctx 를 쓰지 않음
+#    (자식은 정책별 CryptContext 를 _context_for 로 캐시)
+# ---------------------------------------------------------------------
+T = TypeVar("T")
+
+_hash_limiter: Optional[anyio.CapacityLimiter] = None
+_hash_process_pool: Optional[ProcessPoolExecutor] = None
+_hash_rejected = metrics.counter("password_hash.rejected")
+
+def _get_hash_limiter() -> anyio.CapacityLimiter:
+    global _hash_limiter
+    if _hash_limiter is None:
+        _hash_limiter = anyio.CapacityLimiter(settings.PASSWORD_HASH_CONCURRENCY)
+        metrics.gauge("password_hash.queue_depth", lambda: _hash_limiter.statistics().tasks_waiting)
+        metrics.gauge("password_hash.in_flight", lambda: _hash_limiter.borrowed_tokens)
+    return _hash_limiter
+
+def _get_hash_process_pool() -> ProcessPoolExecutor:
+    global _hash_process_pool
+    if _hash_process_pool is None:
+        _hash_process_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_CONCURRENCY)
+    return _hash_process_pool
+
+async def _run_hash_job(fn: Callable[..., T], *args: Any) -> T:
+    limiter = _get_hash_limiter()
+    if limiter.statistics().tasks_waiting >= settings.PASSWORD_HASH_MAX_WAITING:
+        _hash_rejected.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent authentication requests",
+            headers={"Retry-After": "1"},
+        )
+    if settings.PASSWORD_HASH_EXECUTOR == "process":
+        async with limiter:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_get_hash_process_pool(), fn, *args)
+    return await anyio.to_thread.run_sync(fn, *args, limiter=limiter)
+
+def _hash_with_policy(policy: tuple, password: str) -> str:
+    return _context_for(policy).hash(password)
+
+def _verify_with_policy(policy: tuple, plain_password: str, hashed_password: str) -> bool:
+    return _context_for(policy).verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_job(_hash_with_policy, _pwd_policy, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(_verify_with_policy, _pwd_policy, plain_password, hashed_password)
+
+async def upgrade_password_hash(user_id: int, plain_password: str) -> None:
+    """
+    로그인 성공 후 BackgroundTasks 로 실행: 현재 정책으로 재해시해 저장.
+    실패해도 로그인 결과에는 영향 없음(다음 로그인 때 다시 시도).
+    """
+    from app.api.repositories.user_repo import update_user_by_id  # 지연 임포트
+    try:
+        new_hash = await get_password_hash_async(plain_password)
+        await update_user_by_id(user_id, hashed_password=new_hash)
+    except Exception:
+        return
+    invalidate_user_principals(user_id)
+
+def shutdown_hash_pool() -> None:
+    global _hash_process_pool
+    if _hash_process_pool is not None:
+        _hash_process_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_process_pool = None
+
 # ---------------------------------------------------------------------
 # Email verification token (itsdangerous)
 # ---------------------------------------------------------------------
@@ -48,11 +198,104 @@ def read_email_token(token: str, max_age_sec: int = 60 * 60 * 24) -> str:
     except BadSignature:
         raise HTTPException(status_code=400, detail="Invalid verification token")
 
+# ---------------------------------------------------------------------
+# JWT backend (HS* 서명, SECRET_KEY) — 모든 인증 요청의 get_current_user 경로
+#  - "fast"(기본): 헤더 조각은 미리 인코딩, HMAC 키 준비는 한 번(요청마다 copy),
+#    세그먼트 split 한 번, orjson(있으면) → 요청마다 헤더 파싱/알고리즘 해석/datetime 변환 없음
+#    (헤더 조각이 미리 만든 것과 다를 때만 헤더를 읽어 alg 확인)
+#  - "jose": python-jose (이전 동작)
+#  - 두 백엔드의 토큰은 서로 호환 (클레임 sub/typ/jti/exp/iat 동일)
+#  - ES256/EdDSA 는 백엔드와 무관하게 core/jwt_keys.py 키링
+#  - 벤치마크: python -m app.api.scripts.bench_jwt
+# ---------------------------------------------------------------------
+class JWTBackend(Protocol):
+    name: str
+
+    def encode(self, claims: dict) -> str: ...
+
+    def decode(self, token: str) -> dict: ...
+
+class JoseJWTBackend:
+    name = "jose"
+
+    def __init__(self, secret: str, algorithm: str) -> None:
+        self.secret = secret
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        return jwt.decode(token, self.secret, algorithms=[self.algorithm])
+
+class FastJWTBackend:
+    name = "fast"
+    _DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def __init__(self, secret: str, algorithm: str) -> None:
+        if algorithm not in self._DIGESTS:
+            raise ValueError(f"unsupported JWT algorithm for fast backend: {algorithm}")
+        self.algorithm = algorithm
+        self._mac = hmac.new(secret.encode(), digestmod=self._DIGESTS[algorithm])
+        self._header = b64url_encode(json_dumps({"alg": algorithm, "typ": "JWT"}))
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: dict) -> str:
+        signing_input = f"{self._header}.{b64url_encode(json_dumps(to_claims(claims)))}"
+        return f"{signing_input}.{b64url_encode(self._sign(signing_input.encode()))}"
+
+    def decode(self, token: str) -> dict:
+        try:
+            header, payload, signature = token.split(".")
+            if header != self._header and read_header(token).get("alg") != self.algorithm:
+                raise JWTError("The specified alg value is not allowed")
+            expected = self._sign(f"{header}.{payload}".encode("ascii"))
+            if not hmac.compare_digest(expected, b64url_decode(signature)):
+                raise JWTError("Signature verification failed.")
+            claims = json_loads(b64url_decode(payload))
+        except ValueError:
+            raise JWTError("Malformed token")
+        return validate_claims(claims)
+
+JWT_BACKENDS: dict[str, Callable[[str, str], JWTBackend]] = {
+    "fast": FastJWTBackend,
+    "jose": JoseJWTBackend,
+}
+
+# 마지막 (백엔드 이름, SECRET_KEY, 알고리즘) 조합의 인스턴스 (설정이 바뀌면 새로 만듦)
+_jwt_backend: Optional[tuple[tuple[str, str, str], JWTBackend]] = None
+
+def get_jwt_backend(algorithm: Optional[str] = None) -> JWTBackend:
+    global _jwt_backend
+    key = (settings.JWT_BACKEND, settings.SECRET_KEY, algorithm or settings.JWT_ALGORITHM)
+    if _jwt_backend is None or _jwt_backend[0] != key:
+        _jwt_backend = (key, JWT_BACKENDS[key[0]](key[1], key[2]))
+    return _jwt_backend[1]
+
 # ---------------------------------------------------------------------
 # JWT helpers
 #  - typ: "access" | "refresh"  (주의: 키 이름은 typ 로 통일)
 #  - refresh 에 jti 포함(미션5: 블랙리스트용)
+#  - refresh 의 fam/gen: 로그인 세션(family)과 회전 횟수 (repositories/refresh_family_repo.py)
+#  - JWT_ALGORITHM 이 ES256/EdDSA 면 kid 헤더 + 비대칭 서명 (core/jwt_keys.py 키링)
 # ---------------------------------------------------------------------
+def _encode(payload: dict) -> str:
+    if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        return get_keyring().encode(payload)
+    return get_jwt_backend().encode(payload)
+
+def _decode(token: str) -> dict:
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return get_jwt_backend().decode(token)
+    header = read_header(token)
+    if "kid" not in header and header.get("alg") == "HS256" and settings.JWT_ACCEPT_HS256:
+        return get_jwt_backend("HS256").decode(token)
+    return get_keyring().decode(token, header)
+
 def _exp_after_minutes(minutes: int) -> datetime:
     return datetime.now(timezone.utc) + timedelta(minutes=minutes)
 
@@ -68,9 +311,14 @@ def create_access_token(sub: str, minutes: Optional[int] = None) -> str:
         "exp": _exp_after_minutes(minutes),
         "iat": datetime.now(timezone.utc),
     }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return _encode(payload)
 
-def create_refresh_token(sub: str, days: Optional[int] = None) -> str:
+def create_refresh_token(
+    sub: str,
+    days: Optional[int] = None,
+    family: Optional[str] = None,
+    generation: int = 0,
+) -> str:
     days = days or settings.REFRESH_TOKEN_DAYS
     payload = {
         "sub": sub,
@@ -79,11 +327,14 @@ def create_refresh_token(sub: str, days: Optional[int] = None) -> str:
         "exp": _exp_after_days(days),
         "iat": datetime.now(timezone.utc),
     }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    if family is not None:
+        payload["fam"] = family
+        payload["gen"] = generation
+    return _encode(payload)
 
 def decode_token(token: str, token_type: str = "access") -> dict:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = _decode(token)
         if payload.get("typ") != token_type:
             raise HTTPException(status_code=401, detail="Invalid token type")
         return payload
@@ -120,10 +371,41 @@ def clear_auth_cookies(response) -> None:
     response.delete_cookie("access_token", **args)
     response.delete_cookie("refresh_token", **args)
 
+# ---------------------------------------------------------------------
+# Principal cache
+#  - key: access 토큰 jti / value: 인증된 User
+#  - hit 면 사용자 조회(DB)를 생략. 블랙리스트는 hit 여도 매번 확인
+#    (Bloom filter 가 음성이면 메모리만 보므로 DB 왕복 없음, 다른 워커의 로그아웃은
+#     BLACKLIST_SYNC_SECONDS 안에 반영)
+#  - blacklist_jti / 프로필 수정 시 이 워커에서 무효화. 다른 워커에서 바뀐 프로필/탈퇴는
+#    최대 PRINCIPAL_CACHE_TTL_SECONDS 동안 이전 값이 보일 수 있음
+# ---------------------------------------------------------------------
+_principal_cache: TTLCache[Any] = TTLCache(
+    "auth.principal_cache",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+def _remember_principal(jti: str, user: Any, exp: Any) -> None:
+    try:
+        ttl = float(exp) - datetime.now(timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return
+    _principal_cache.set(jti, user, ttl=ttl)
+
+def invalidate_principal(jti: str) -> None:
+    """jti 하나에 대한 캐시 제거 (blacklist_jti에서 호출)"""
+    _principal_cache.pop(jti)
+
+def invalidate_user_principals(user_id: int) -> int:
+    """사용자의 모든 캐시 principal 제거 (프로필/비밀번호 변경, 탈퇴 시)"""
+    return _principal_cache.discard_if(lambda _k, u: getattr(u, "id", None) == user_id)
+
 # ---------------------------------------------------------------------
 # Current user dependency
 #  - 헤더 Bearer 우선, 없으면 access_token 쿠키 사용
-#  - access 토큰의 jti가 블랙리스트면 거부 (옵션)
+#  - access 토큰의 jti가 블랙리스트면 거부 (캐시 hit 여도)
+#  - jti 기준 principal 캐시 hit 면 사용자 DB 조회 생략
 # ---------------------------------------------------------------------
 async def get_current_user(
     request: Request,
@@ -141,15 +423,22 @@ async def get_current_user(
 
     # access jti 블랙리스트 체크 (로그아웃 시 refresh만 블랙리스트에 올린다면, 여기 체크는 항상 False가 됨)
     jti = payload.get("jti")
+    if not jti:
+        raise HTTPException(status_code=401, detail="Token blacklisted")
+
     from app.api.repositories.token_blacklist_repo import is_jti_blacklisted  # 지연 임포트
-    if not jti or await is_jti_blacklisted(jti):
+    if await is_jti_blacklisted(jti):
+        invalidate_principal(jti)
         raise HTTPException(status_code=401, detail="Token blacklisted")
+    if (cached := _principal_cache.get(jti)) is not None:
+        return cached
 
     from app.api.repositories.user_repo import get_by_email  # 지연 임포트
     email = payload.get("sub")
     user = await get_by_email(email)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    _remember_principal(jti, user, payload.get("exp"))
     return user
 
 # ---------------------------------------------------------------------
@@ -161,7 +450,7 @@ async def authenticate_user(email: str, password: str):
     user = await get_by_email(email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
@@ -0,0 +1,132 @@
+# app/api/db/bulk.py
+"""
+M2M 연결 테이블 일괄 처리 헬퍼.
+- link_m2m       : 인스턴스 하나 ↔ 대상 여러 개 추가
+- insert_m2m_rows / delete_m2m_rows / m2m_rows : 여러 인스턴스를 한 번에 (일괄 분석 등)
+- delete_in_batches : 조건에 맞는 행을 N 개씩 나눠 삭제 (만료 토큰 정리 등)
+
+Tortoise 의 `relation.add()` 는 "이미 연결됐는지" SELECT 후 INSERT 를 합니다.
+새로 만든 행이거나 diff 로 추가분을 이미 아는 경우엔 SELECT 가 낭비라
+INSERT 한 번으로 끝냅니다. (쿼리는 pypika로 만들어 DB별 파라미터 형식 자동 처리)
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable, Optional, Sequence, Tuple, Type
+
+from pypika_tortoise import Table
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.fields.relational import ManyToManyRelation
+from tortoise.models import Model
+
+
+def _through_of(field) -> Tuple[Table, str, str]:
+    return Table(field.through), field.backward_key, field.forward_key
+
+
+def _through(relation: ManyToManyRelation) -> Tuple[Table, str, str]:
+    return _through_of(relation.field)
+
+
+async def link_m2m(
+    relation: ManyToManyRelation,
+    targets: Sequence[Model],
+    using_db: Optional[BaseDBAsyncClient] = None,
+) -> None:
+    """relation.instance ↔ targets 연결을 INSERT 한 번으로 추가 (중복 확인 없음)"""
+    if not targets:
+        return
+    db = using_db or relation.remote_model._meta.db
+    table, backward_key, forward_key = _through(relation)
+    query = db.query_class.into(table).columns(table[forward_key], table[backward_key])
+    for t in targets:
+        query = query.insert(t.pk, relation.instance.pk)
+    await db.execute_query(*query.get_parameterized_sql())
+
+
+def _db_for(model: Type[Model], using_db: Optional[BaseDBAsyncClient]) -> BaseDBAsyncClient:
+    return using_db or model._meta.db
+
+
+async def insert_m2m_rows(
+    model: Type[Model],
+    field_name: str,
+    pairs: Iterable[Tuple[int, int]],
+    using_db: Optional[BaseDBAsyncClient] = None,
+) -> int:
+    """
+    여러 인스턴스의 연결을 INSERT 한 번으로 (중복 확인 없음).
+    pairs: (model pk, 대상 pk). 예) insert_m2m_rows(Diary, "emotion_keywords", [(1, 7), (2, 7)])
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return 0
+    db = _db_for(model, using_db)
+    table, backward_key, forward_key = _through_of(model._meta.fields_map[field_name])
+    query = db.query_class.into(table).columns(table[forward_key], table[backward_key])
+    for instance_pk, target_pk in pairs:
+        query = query.insert(target_pk, instance_pk)
+    await db.execute_query(*query.get_parameterized_sql())
+    return len(pairs)
+
+
+async def delete_m2m_rows(
+    model: Type[Model],
+    field_name: str,
+    instance_pks: Sequence[int],
+    using_db: Optional[BaseDBAsyncClient] = None,
+) -> None:
+    """instance_pks 의 연결을 모두 DELETE 한 번으로"""
+    if not instance_pks:
+        return
+    db = _db_for(model, using_db)
+    table, backward_key, _ = _through_of(model._meta.fields_map[field_name])
+    query = db.query_class.from_(table).where(table[backward_key].isin(list(instance_pks))).delete()
+    await db.execute_query(*query.get_parameterized_sql())
+
+
+async def m2m_rows(
+    model: Type[Model],
+    field_name: str,
+    instance_pks: Sequence[int],
+    using_db: Optional[BaseDBAsyncClient] = None,
+) -> list[Tuple[int, int]]:
+    """instance_pks 의 현재 연결 (model pk, 대상 pk)"""
+    if not instance_pks:
+        return []
+    db = _db_for(model, using_db)
+    table, backward_key, forward_key = _through_of(model._meta.fields_map[field_name])
+    query = (
+        db.query_class.from_(table)
+        .select(table[backward_key], table[forward_key])
+        .where(table[backward_key].isin(list(instance_pks)))
+    )
+    _, rows = await db.execute_query(*query.get_parameterized_sql())
+    return [(r[backward_key], r[forward_key]) for r in rows]
+
+
+async def delete_in_batches(
+    model: Type[Model],
+    batch_size: int,
+    pause: float = 0.0,
+    **filters,
+) -> int:
+    """
+    filters 에 맞는 행을 batch_size 개씩 삭제 (SELECT id LIMIT n → DELETE id IN (...) 반복).
+    문장마다 따로 커밋되어 큰 DELETE 하나처럼 잠금을 오래 잡지 않음. 반환: 삭제 행 수
+    """
+    batch_size = max(int(batch_size), 1)
+    deleted = 0
+    while True:
+        ids = await model.filter(**filters).limit(batch_size).values_list("id", flat=True)
+        if not ids:
+            break
+        deleted += await model.filter(id__in=ids).delete()
+        if len(ids) < batch_size:
+            break
+        if pause:
+            await asyncio.sleep(pause)
+    return deleted
+
+
+__all__ = ["link_m2m", "insert_m2m_rows", "delete_m2m_rows", "m2m_rows", "delete_in_batches"]
@@ -1,9 +1,18 @@
 # app/api/db/database.py
 from __future__ import annotations
 
+import logging
 import os
-from tortoise import Tortoise
+from tortoise import Tortoise, connections
+from tortoise.backends.base.config_generator import expand_db_url
+from tortoise.utils import get_schema_sql
 from app.api.core.config import settings
+from app.api.db.pool import warm_up
+from app.api.db.routing import replica_alias, start_routing, stop_routing
+from app.api.db.search import ensure_sqlite_search
+from app.api.models.ai_job import ACTIVE_JOB_INDEX_DDL
+
+log = logging.getLogger(__name__)
 
 
 def _resolve_db_url() -> str:
@@ -37,13 +46,42 @@ def _resolve_db_url() -> str:
     return "sqlite://:memory:"
 
 
-def build_tortoise_config(db_url: str | None = None) -> dict:
+def _connection_config(db_url: str) -> str | dict:
+    """
+    Postgres 는 DSN 을 credentials 로 펼쳐 풀 설정을 채우고 engine 을 계측 풀로 교체.
+    그 외(sqlite 등)는 DSN 문자열 그대로.
+    """
+    if not db_url.startswith(("postgres://", "asyncpg://")):
+        return db_url
+    conf = expand_db_url(db_url)
+    conf["engine"] = "app.api.db.pool"
+    creds = conf["credentials"]
+    creds.setdefault("minsize", settings.DB_POOL_MIN_SIZE)
+    creds.setdefault("maxsize", settings.DB_POOL_MAX_SIZE)
+    creds.setdefault("max_queries", settings.DB_POOL_MAX_QUERIES)
+    creds.setdefault("statement_cache_size", settings.DB_STATEMENT_CACHE_SIZE)
+    creds.setdefault("command_timeout", settings.DB_COMMAND_TIMEOUT)
+    creds.setdefault(
+        "max_inactive_connection_lifetime", settings.DB_MAX_INACTIVE_CONNECTION_LIFETIME
+    )
+    return conf
+
+
+def build_tortoise_config(
+    db_url: str | None = None, replica_urls: list[str] | None = None
+) -> dict:
     """
     Aerich가 그대로 읽을 수 있는 설정 객체 생성.
+    replica_urls 는 읽기 전용 연결 replica_0.. 로 추가 (모델은 계속 default 에 묶임)
     """
     db_url = db_url or _resolve_db_url()
+    if replica_urls is None:
+        replica_urls = settings.DB_REPLICA_URLS
+    conns: dict = {"default": _connection_config(db_url)}
+    for i, url in enumerate(replica_urls):
+        conns[replica_alias(i)] = _connection_config(url)
     return {
-        "connections": {"default": db_url},
+        "connections": conns,
         "apps": {
             "models": {
                 "models": [
@@ -55,6 +93,11 @@ def build_tortoise_config(db_url: str | None = None) -> dict:
                     "app.api.models.revoked_token",
                     "app.api.models.token_blacklist",
                     "app.api.models.diary",
+                    "app.api.models.ai_result",
+                    "app.api.models.ai_job",
+                    "app.api.models.diary_stat",
+                    "app.api.models.maintenance_lease",
+                    "app.api.models.refresh_family",
                     "aerich.models",
                 ],
                 "default_connection": "default",
@@ -73,11 +116,41 @@ async def init_db() -> None:
     - 테스트/로컬(SQLite)은 자동 스키마 생성 허용
     """
     db_url = _resolve_db_url()
-    await Tortoise.init(config=build_tortoise_config(db_url))
+    replica_urls = settings.DB_REPLICA_URLS
+    await Tortoise.init(config=build_tortoise_config(db_url, replica_urls))
 
     if db_url.startswith("sqlite://"):
         await Tortoise.generate_schemas(safe=True)
+        # 모델로 표현 못 하는 부분 인덱스 (Postgres 는 마이그레이션)
+        await connections.get("default").execute_script(ACTIVE_JOB_INDEX_DDL)
+        # Postgres 검색 인덱스는 마이그레이션, SQLite는 FTS5 테이블을 여기서 생성
+        await ensure_sqlite_search()
+        await prepare_sqlite_replicas(replica_urls)
+    elif settings.DB_POOL_WARMUP:
+        # 첫 요청 전에 min_size 커넥션을 미리 열어 둠 (실패하면 기동 실패 = 준비 안 됨)
+        await warm_up()
+
+    await start_routing([replica_alias(i) for i in range(len(replica_urls))])
+
+
+async def prepare_sqlite_replicas(replica_urls: list[str]) -> None:
+    """
+    SQLite 복제본 대역(로컬/테스트): primary 스키마와 FTS 테이블을 복제본 파일에도 생성.
+    (generate_schemas 는 모델이 묶인 default 연결에만 스키마를 만든다)
+    """
+    schema = get_schema_sql(connections.get("default"), safe=True) + ACTIVE_JOB_INDEX_DDL
+    for i, url in enumerate(replica_urls):
+        if not url.startswith("sqlite://"):
+            continue
+        alias = replica_alias(i)
+        try:
+            await connections.get(alias).execute_script(schema)
+            await ensure_sqlite_search(alias)
+        except Exception as e:
+            # 열 수 없는 복제본은 헬스체크에서 제외됨
+            log.warning("sqlite replica %s not prepared: %s", alias, e)
 
 
 async def close_db() -> None:
+    await stop_routing()
     await Tortoise.close_connections()
@@ -0,0 +1,134 @@
+# app/api/db/pool.py
+"""
+Postgres(asyncpg) 커넥션 풀 계측 + 워밍업.
+
+build_tortoise_config 가 Postgres 연결의 engine 을 이 모듈로 지정합니다.
+Tortoise 는 engine 모듈의 get_client_class() 로 클라이언트를 고르므로
+기본 asyncpg 클라이언트를 그대로 쓰되, 만들어지는 풀만 _MeteredPool 로 감쌉니다.
+
+메트릭 (연결 alias 별, 예: db.pool.default.*)
+- size / idle / in_use / max / saturation(in_use/max) : 조회 시점 값
+- waiting   : 지금 acquire 대기 중인 태스크 수
+- acquired  : acquire 성공 횟수
+- wait_us   : acquire 대기 시간 누적(µs)  → 평균 = wait_us / acquired
+- timeouts  : acquire 타임아웃 횟수 (풀 포화 신호)
+- cancelled : 대기 중 취소된 횟수 (클라이언트 연결 끊김/상위 타임아웃 등)
+- errors    : 그 밖의 acquire 실패 (풀 닫힘, 연결 오류 등)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from tortoise import connections
+
+from app.api.core import metrics
+
+log = logging.getLogger(__name__)
+
+
+class _MeteredPool:
+    """asyncpg.Pool 프록시: acquire 대기 시간/대기열만 기록하고 나머지는 위임"""
+
+    __slots__ = ("_pool", "_waiting", "_acquired", "_wait_us", "_timeouts", "_cancelled", "_errors")
+
+    def __init__(self, pool: Any, alias: str) -> None:
+        self._pool = pool
+        prefix = f"db.pool.{alias}"
+        self._waiting = metrics.gauge(f"{prefix}.waiting")
+        self._acquired = metrics.counter(f"{prefix}.acquired")
+        self._wait_us = metrics.counter(f"{prefix}.wait_us")
+        self._timeouts = metrics.counter(f"{prefix}.timeouts")
+        self._cancelled = metrics.counter(f"{prefix}.cancelled")
+        self._errors = metrics.counter(f"{prefix}.errors")
+        metrics.gauge(f"{prefix}.size", pool.get_size)
+        metrics.gauge(f"{prefix}.idle", pool.get_idle_size)
+        metrics.gauge(f"{prefix}.max", pool.get_max_size)
+        metrics.gauge(f"{prefix}.in_use", self.in_use)
+        metrics.gauge(f"{prefix}.saturation", self.saturation)
+
+    def in_use(self) -> int:
+        return self._pool.get_size() - self._pool.get_idle_size()
+
+    def saturation(self) -> float:
+        return self.in_use() / (self._pool.get_max_size() or 1)
+
+    async def acquire(self, *, timeout: float | None = None) -> Any:
+        self._waiting.inc()
+        started = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self._timeouts.inc()
+            raise
+        except asyncio.CancelledError:
+            self._cancelled.inc()
+            raise
+        except Exception:
+            self._errors.inc()
+            raise
+        finally:
+            self._waiting.dec()
+        self._acquired.inc()
+        self._wait_us.inc(int((time.perf_counter() - started) * 1_000_000))
+        return conn
+
+    def __getattr__(self, name: str) -> Any:
+        # release / close / terminate / expire_connections / get_* 등
+        return getattr(self._pool, name)
+
+
+_client_class: type | None = None
+
+
+def get_client_class(db_info: dict) -> type:
+    """Tortoise engine 훅. asyncpg 는 Postgres 를 쓸 때만 import."""
+    global _client_class
+    if _client_class is None:
+        from tortoise.backends.asyncpg import AsyncpgDBClient
+
+        class MeteredAsyncpgDBClient(AsyncpgDBClient):
+            async def create_pool(self, **kwargs) -> Any:
+                pool = await super().create_pool(**kwargs)
+                return _MeteredPool(pool, self.connection_name)
+
+        _client_class = MeteredAsyncpgDBClient
+    return _client_class
+
+
+async def _warm_up_client(client: Any) -> int:
+    if not hasattr(client, "_pool_init_lock"):  # 풀 없는 백엔드(sqlite)
+        return 0
+    async with client._pool_init_lock:
+        if client._pool is None:
+            await client.create_connection(with_db=True)
+    pool = client._pool
+    # min_size 개를 동시에 잡아 실제로 한 번씩 왕복 → 첫 요청이 연결 수립 비용을 안 내게
+    conns = await asyncio.gather(*(pool.acquire() for _ in range(client.pool_minsize)))
+    try:
+        await asyncio.gather(*(c.fetchval("SELECT 1") for c in conns))
+    finally:
+        for c in conns:
+            await pool.release(c)
+    return len(conns)
+
+
+async def warm_up() -> int:
+    """
+    초기화된 모든 풀 연결에 min_size 개 커넥션을 미리 열어 둔다. 연 커넥션 수 반환.
+    primary 실패는 그대로 올리고, 복제본 실패는 경고만 (헬스체크가 제외시킴).
+    """
+    opened = 0
+    for client in connections.all():
+        try:
+            opened += await _warm_up_client(client)
+        except Exception as e:
+            if client.connection_name == "default":
+                raise
+            log.warning("pool warm-up failed for %s: %s", client.connection_name, e)
+    return opened
+
+
+__all__ = ["get_client_class", "warm_up"]
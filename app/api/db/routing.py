@@ -0,0 +1,139 @@
+# app/api/db/routing.py
+"""
+읽기 복제본(read replica) 라우팅.
+
+- DB_REPLICA_URLS 의 DSN 마다 Tortoise 연결 "replica_0", "replica_1", ... 생성
+  (build_tortoise_config). 쓰기/트랜잭션은 항상 "default"(primary).
+- 읽기 전용 레포 함수가 read_db(key) 로 연결을 고름 (key: 보통 user_id, 로그인 조회는 email)
+  1) 최근 DB_READ_YOUR_WRITES_SECONDS 안에 쓰기 표시된 key → primary (read-your-writes)
+  2) 건강한 복제본 라운드로빈
+  3) 건강한 복제본이 없으면 primary
+- 헬스체크: DB_REPLICA_HEALTH_SECONDS 마다 복제본에 SELECT 1, 실패하면 다음 성공까지 제외
+- 쓰기 표시는 워커 로컬. 다른 워커로 간 읽기는 복제 지연만큼 늦게 보일 수 있음
+
+로컬/테스트에선 SQLite 파일 여러 개를 복제본 대역으로 쓸 수 있음
+(init_db 가 primary 스키마를 복제본 파일에도 만들어 줌. 데이터 복제는 하지 않음).
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from typing import Dict, Hashable, List, Optional
+
+from tortoise import connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from app.api.core import metrics
+from app.api.core.cache import TTLCache
+from app.api.core.config import settings
+
+log = logging.getLogger(__name__)
+
+PRIMARY = "default"
+REPLICA_PREFIX = "replica_"
+
+_replicas: List[str] = []
+_healthy: Dict[str, bool] = {}
+_rr = itertools.count()
+_health_task: Optional[asyncio.Task] = None
+
+# user_id/email -> True (쓰기 직후 stickiness 창)
+_recent_writers: TTLCache[bool] = TTLCache(
+    "db.route.sticky", maxsize=100_000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS
+)
+
+_to_replica = metrics.counter("db.route.replica")
+_to_primary = metrics.counter("db.route.primary")
+_check_failed = metrics.counter("db.replica.check_failed")
+metrics.gauge("db.replica.healthy", lambda: sum(_healthy.values()))
+
+
+def replica_alias(i: int) -> str:
+    return f"{REPLICA_PREFIX}{i}"
+
+
+def replica_aliases() -> List[str]:
+    return list(_replicas)
+
+
+def mark_write(*keys: Optional[Hashable]) -> None:
+    """primary 에 썼음을 기록 → 잠시 같은 key 의 읽기는 primary 로"""
+    if not _replicas:
+        return
+    for key in keys:
+        if key is not None:
+            _recent_writers.set(key, True)
+
+
+def read_db(key: Optional[Hashable] = None) -> BaseDBAsyncClient:
+    """읽기 전용 조회에 쓸 연결"""
+    if _replicas and not (key is not None and _recent_writers.get(key)):
+        healthy = [a for a in _replicas if _healthy.get(a)]
+        if healthy:
+            _to_replica.inc()
+            return connections.get(healthy[next(_rr) % len(healthy)])
+    _to_primary.inc()
+    return connections.get(PRIMARY)
+
+
+async def check_replicas() -> int:
+    """복제본마다 SELECT 1. 건강한 복제본 수 반환."""
+    timeout = settings.DB_REPLICA_HEALTH_TIMEOUT_SECONDS
+    for alias in _replicas:
+        try:
+            await asyncio.wait_for(connections.get(alias).execute_query("SELECT 1"), timeout)
+            ok = True
+        except Exception as e:
+            ok = False
+            _check_failed.inc()
+            if _healthy.get(alias, True):
+                log.warning("replica %s unhealthy: %s", alias, e)
+        _healthy[alias] = ok
+    return sum(_healthy.values())
+
+
+async def _health_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.DB_REPLICA_HEALTH_SECONDS)
+        try:
+            await check_replicas()
+        except Exception:
+            log.exception("replica health check failed")
+
+
+async def start_routing(aliases: List[str]) -> None:
+    """init_db 에서 호출: 복제본 연결 alias 로 첫 헬스체크 후 주기 점검 시작"""
+    global _health_task
+    await stop_routing()
+    _replicas[:] = aliases
+    if not _replicas:
+        return
+    await check_replicas()
+    _health_task = asyncio.create_task(_health_loop())
+
+
+async def stop_routing() -> None:
+    global _health_task
+    if _health_task is not None:
+        _health_task.cancel()
+        try:
+            await _health_task
+        except asyncio.CancelledError:
+            pass
+        _health_task = None
+    _replicas.clear()
+    _healthy.clear()
+    _recent_writers.clear()
+
+
+__all__ = [
+    "PRIMARY",
+    "replica_alias",
+    "replica_aliases",
+    "mark_write",
+    "read_db",
+    "check_replicas",
+    "start_routing",
+    "stop_routing",
+]
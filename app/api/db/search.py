@@ -0,0 +1,157 @@
+# app/api/db/search.py
+"""
+Diary 전문검색(title + content).
+
+- Postgres: GIN(user_id, tsvector) 인덱스 + to_tsquery 접두어 매칭 + ts_rank
+  (인덱스는 migrations/models/1_*_diary_search.py 에서 생성)
+- SQLite(테스트/로컬): FTS5 external-content 테이블 + 트리거, bm25 랭킹
+- 그 외/검색어에 단어가 없으면 None 반환 → 호출부가 기존 icontains 로 폴백
+
+검색어는 `\\w+` 토큰만 뽑아 각 토큰을 접두어로 AND 매칭합니다.
+- search_diary_ids: 관련도순 id (검색 엔드포인트). 바인드 파라미터로 전달
+- diary_match_subquery: 목록 쿼리에 그대로 넣는 `id IN (...)` 서브쿼리
+  (ORM 필터라 바인드 파라미터를 못 씀 → 토큰은 \\w 문자뿐이고 리터럴은 _quote 로 이스케이프)
+"""
+from __future__ import annotations
+
+import re
+from typing import List, Optional, Tuple
+
+from tortoise import Tortoise
+from tortoise.expressions import RawSQL
+
+_MAX_TOKENS = 8
+_MAX_TOKEN_LEN = 64
+
+# 인덱스 식과 글자 그대로 맞춰야 플래너가 인덱스를 씀
+PG_DIARY_TSVECTOR = (
+    "to_tsvector('simple', coalesce(\"title\", '') || ' ' || coalesce(\"content\", ''))"
+)
+
+_PG_SEARCH_SQL = f"""
+SELECT "id", ts_rank({PG_DIARY_TSVECTOR}, q) AS "rank"
+FROM "diary", to_tsquery('simple', $2) AS q
+WHERE "user_id" = $1 AND {PG_DIARY_TSVECTOR} @@ q
+ORDER BY "rank" DESC, "id" DESC
+LIMIT $3
+"""
+
+_SQLITE_SEARCH_SQL = """
+SELECT d."id", -bm25(diary_fts) AS "rank"
+FROM diary_fts JOIN "diary" d ON d."id" = diary_fts.rowid
+WHERE diary_fts MATCH ? AND d."user_id" = ?
+ORDER BY "rank" DESC, d."id" DESC
+LIMIT ?
+"""
+
+SQLITE_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS diary_fts USING fts5(
+    title, content, content='diary', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS diary_fts_ai AFTER INSERT ON "diary" BEGIN
+    INSERT INTO diary_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS diary_fts_ad AFTER DELETE ON "diary" BEGIN
+    INSERT INTO diary_fts(diary_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS diary_fts_au AFTER UPDATE OF title, content ON "diary" BEGIN
+    INSERT INTO diary_fts(diary_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO diary_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+INSERT INTO diary_fts(diary_fts) VALUES ('rebuild');
+"""
+
+# 목록 필터용 (user_id 는 int, 검색어는 _quote 한 리터럴)
+_PG_MATCH_SUBQUERY = (
+    f'(SELECT "id" FROM "diary" WHERE "user_id" = {{user_id}} '
+    f"AND {PG_DIARY_TSVECTOR} @@ to_tsquery('simple', {{query}}))"
+)
+_SQLITE_MATCH_SUBQUERY = "(SELECT rowid FROM diary_fts WHERE diary_fts MATCH {query})"
+
+# FTS5 테이블을 만든 SQLite 연결 alias (FTS5 없는 빌드면 비어 있음 → icontains 폴백)
+_sqlite_fts_ready: set[str] = set()
+
+
+def tokenize(q: str) -> List[str]:
+    return [t[:_MAX_TOKEN_LEN] for t in re.findall(r"\w+", q.lower())][:_MAX_TOKENS]
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _pg_tsquery(tokens: List[str]) -> str:
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def _sqlite_match(tokens: List[str]) -> str:
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def _dialect(connection: str = "default") -> str:
+    return Tortoise.get_connection(connection).capabilities.dialect
+
+
+async def ensure_sqlite_search(connection: str = "default") -> bool:
+    """SQLite면 FTS5 테이블/트리거 생성 (init_db에서 호출)"""
+    if _dialect(connection) != "sqlite":
+        return False
+    try:
+        await Tortoise.get_connection(connection).execute_script(SQLITE_FTS_DDL)
+        _sqlite_fts_ready.add(connection)
+    except Exception:
+        _sqlite_fts_ready.discard(connection)
+    return connection in _sqlite_fts_ready
+
+
+async def search_diary_ids(
+    user_id: int, q: str, limit: int, connection: str = "default"
+) -> Optional[List[Tuple[int, float]]]:
+    """
+    관련도 내림차순 (diary_id, rank) 목록. 인덱스 검색이 불가하면 None.
+    """
+    tokens = tokenize(q)
+    if not tokens:
+        return None
+    dialect = _dialect(connection)
+    conn = Tortoise.get_connection(connection)
+    if dialect == "postgres":
+        _, rows = await conn.execute_query(_PG_SEARCH_SQL, [user_id, _pg_tsquery(tokens), limit])
+    elif dialect == "sqlite" and connection in _sqlite_fts_ready:
+        _, rows = await conn.execute_query(
+            _SQLITE_SEARCH_SQL, [_sqlite_match(tokens), user_id, limit]
+        )
+    else:
+        return None
+    return [(int(r["id"]), float(r["rank"])) for r in rows]
+
+
+def diary_match_subquery(
+    user_id: int, q: str, connection: str = "default"
+) -> Optional[RawSQL]:
+    """
+    검색어에 매치되는 diary id 서브쿼리 → `filter(id__in=...)` 로 목록 쿼리 안에서 평가.
+    개수 제한이 없어 페이징/total 이 전체 매치 기준. 인덱스 검색이 불가하면 None.
+    """
+    tokens = tokenize(q)
+    if not tokens:
+        return None
+    dialect = _dialect(connection)
+    if dialect == "postgres":
+        return RawSQL(
+            _PG_MATCH_SUBQUERY.format(user_id=int(user_id), query=_quote(_pg_tsquery(tokens)))
+        )
+    if dialect == "sqlite" and connection in _sqlite_fts_ready:
+        return RawSQL(_SQLITE_MATCH_SUBQUERY.format(query=_quote(_sqlite_match(tokens))))
+    return None
+
+
+__all__ = [
+    "PG_DIARY_TSVECTOR",
+    "tokenize",
+    "ensure_sqlite_search",
+    "search_diary_ids",
+    "diary_match_subquery",
+]
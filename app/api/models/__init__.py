@@ -5,5 +5,10 @@ from .tag import Tag
 from .emotion import EmotionKeyword
 from .notification import Notification
 from .token_blacklist import TokenBlacklist
+from .ai_result import AIResult
+from .ai_job import AIJob
+from .diary_stat import DiaryStat
+from .maintenance_lease import MaintenanceLease
+from .refresh_family import RefreshFamily
 
-__all__ = ["User", "Diary", "Tag", "EmotionKeyword","Notification","RevokedToken", "TokenBlacklist"]
+__all__ = ["User", "Diary", "Tag", "EmotionKeyword","Notification","RevokedToken", "TokenBlacklist", "AIResult", "AIJob", "DiaryStat", "MaintenanceLease", "RefreshFamily"]
@@ -0,0 +1,38 @@
+# app/api/models/ai_job.py
+from tortoise import fields, models
+
+
+class AIJob(models.Model):
+    """AI 요약/분석 백그라운드 작업 (DB 큐, app/api/services/ai_jobs.py 가 처리)"""
+    id = fields.IntField(pk=True)
+    user = fields.ForeignKeyField("models.User", related_name="ai_jobs")
+    diary = fields.ForeignKeyField("models.Diary", related_name="ai_jobs")
+
+    kind = fields.CharField(max_length=16)                 # summarize | analyze
+    params = fields.JSONField(default=dict)                # analyze: top_k, overwrite
+    status = fields.CharField(max_length=16, default="queued")  # queued|running|succeeded|failed
+    attempts = fields.IntField(default=0)
+    max_attempts = fields.IntField(default=3)
+    run_after = fields.DatetimeField()                     # 재시도 backoff 이후 실행 시각
+    locked_at = fields.DatetimeField(null=True)            # running 시작 시각 (lease)
+    last_error = fields.TextField(null=True)
+    result = fields.JSONField(null=True)
+
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+    finished_at = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = "ai_job"
+        indexes = (("status", "run_after"),)
+        # + 부분 유니크 인덱스 ACTIVE_JOB_INDEX_DDL (모델 Meta 로는 표현 불가 → 마이그레이션 / SQLite 는 init_db)
+
+    def __str__(self) -> str:
+        return f"<AIJob {self.id} {self.kind} {self.status}>"
+
+
+# 일기·종류당 대기/실행 중 작업은 하나 (ai_jobs.enqueue 의 중복 등록 방지)
+ACTIVE_JOB_INDEX_DDL = """
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_ai_job_active" ON "ai_job" ("diary_id", "kind")
+WHERE "status" IN ('queued', 'running');
+"""
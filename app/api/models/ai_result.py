@@ -0,0 +1,19 @@
+# app/api/models/ai_result.py
+from tortoise import fields, models
+
+
+class AIResult(models.Model):
+    """AI 요약/분석 결과 캐시 (내용 해시 주소, 한 번 쓰면 변하지 않음)"""
+    id = fields.IntField(pk=True)
+    # sha256(kind, provider, prompt version, 입력, 파라미터)
+    key = fields.CharField(max_length=64, unique=True)
+    kind = fields.CharField(max_length=16)          # summary | analysis
+    provider = fields.CharField(max_length=64)      # 모델 이름
+    payload = fields.JSONField()
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = "ai_result"
+
+    def __str__(self) -> str:
+        return f"<AIResult {self.kind} {self.key[:12]}>"
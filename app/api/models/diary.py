@@ -15,6 +15,7 @@ class Diary(models.Model):
 
     # 추가 메타
     ai_summary = fields.TextField(null=True)
+    main_emotion = fields.CharField(max_length=20, null=True)   # AI 분석 결과 (positive|negative|neutral)
 
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
@@ -0,0 +1,25 @@
+# app/api/models/diary_stat.py
+from tortoise import fields, models
+
+
+class DiaryStat(models.Model):
+    """
+    사용자별 일기 통계 집계 (app/api/repositories/diary_stats_repo.py 가 일기 쓰기와 같이 갱신).
+    (기간 종류, 기간 시작일, 항목, 값) 마다 일기 수 하나
+    """
+    id = fields.IntField(pk=True)
+    user = fields.ForeignKeyField("models.User", related_name="diary_stats")
+
+    period = fields.CharField(max_length=8)          # day | week(월요일 시작) | month
+    period_start = fields.DateField()
+    dimension = fields.CharField(max_length=16)      # diary(값 없음) | mood | emotion | keyword
+    value = fields.CharField(max_length=50, default="")
+    count = fields.IntField(default=0)
+
+    class Meta:
+        table = "diary_stat"
+        # upsert 충돌 대상 + 범위 조회 (user_id, period, period_start 앞부분으로 seek)
+        unique_together = (("user", "period", "period_start", "dimension", "value"),)
+
+    def __str__(self) -> str:
+        return f"<DiaryStat {self.period} {self.period_start} {self.dimension}={self.value!r} {self.count}>"
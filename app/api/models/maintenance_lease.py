@@ -0,0 +1,18 @@
+# app/api/models/maintenance_lease.py
+from tortoise import fields, models
+
+
+class MaintenanceLease(models.Model):
+    """
+    주기 작업 리더 선출 (app/api/services/maintenance.py).
+    owner 가 expires_at 전까지 갱신하는 동안 다른 워커는 같은 작업을 실행하지 않음
+    """
+    name = fields.CharField(max_length=64, pk=True)
+    owner = fields.CharField(max_length=128, default="")
+    expires_at = fields.DatetimeField()
+
+    class Meta:
+        table = "maintenance_lease"
+
+    def __str__(self) -> str:
+        return f"<MaintenanceLease {self.name} {self.owner!r} until {self.expires_at}>"
@@ -0,0 +1,24 @@
+# app/api/models/refresh_family.py
+from tortoise import fields, models
+
+
+class RefreshFamily(models.Model):
+    """
+    로그인 세션 하나 = refresh 토큰 family 하나 (app/api/repositories/refresh_family_repo.py).
+    refresh 토큰의 fam/gen 클레임과 비교: 회전마다 generation +1 (행 갱신),
+    이전 generation 토큰이 다시 오면 재사용으로 보고 family 전체 폐기
+    """
+    id = fields.CharField(max_length=64, pk=True)          # 토큰의 fam 클레임
+    user = fields.ForeignKeyField("models.User", related_name="refresh_families")
+    generation = fields.IntField(default=0)                # 현재 유효한 refresh 토큰의 gen
+    revoked_at = fields.DatetimeField(null=True)           # 로그아웃/재사용 감지 시각
+    # 마지막으로 발급한 refresh 토큰의 만료 시각 (지나면 정리 대상)
+    expires_at = fields.DatetimeField(index=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "refresh_token_family"
+
+    def __str__(self) -> str:
+        return f"<RefreshFamily {self.id} gen={self.generation}>"
@@ -16,6 +16,8 @@ class User(models.Model):
     last_login = fields.DatetimeField(null=True)
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
+    # 일기 목록 캐시 버전 (diary_repo.bump_diary_version 으로만 +1, 모델 save 로 쓰지 말 것)
+    diary_version = fields.BigIntField(default=0)
 
     diaries: fields.ReverseRelation["Diary"]
 
@@ -1,6 +1,10 @@
 # app/api/repositories/db/token_blacklist_repo.py
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+from collections import deque
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -8,6 +12,135 @@ from typing import Optional
 # 예: from app.api.models.token_blacklist import TokenBlacklist
 # 또는: from app.db.models.token_blacklist import TokenBlacklist
 from app.api.models.token_blacklist import TokenBlacklist  # 예시
+from app.api.core import metrics
+from app.api.core.bloom import BloomFilter
+from app.api.core.config import settings
+from app.api.db.bulk import delete_in_batches
+
+# ---------------------------------------------------------------------
+# Bloom filter 프론트
+#  - 필터에 없으면 "블랙리스트 아님" 확정 → DB 조회 생략
+#  - 필터에 있으면(오탐 포함) 기존처럼 DB 확인
+#  - 다른 워커가 넣은 jti는 id 기준 delta sync로 반영
+#    (BLACKLIST_SYNC_SECONDS 마다 `id > 마지막 id - lookback` 조회)
+#  - lookback: 늦게 커밋된 작은 id 누락 방지
+#  - 전체 재구성은 start_filter_refresh() 의 백그라운드 태스크가 BLACKLIST_REBUILD_SECONDS 마다
+#    (요청 경로에선 필터가 아직 없거나 포화됐을 때만)
+#  - 재구성/sync 는 asyncio.Lock 하나로 직렬화 → 동시에 들어온 요청이 각자 재구성하지 않음
+# ---------------------------------------------------------------------
+_SYNC_LOOKBACK_IDS = 256
+
+log = logging.getLogger(__name__)
+
+# 재구성 중(await 사이)에 이 워커가 추가한 jti를 새 필터에 다시 넣기 위한 버퍼
+_recent_local: "deque[str]" = deque(maxlen=1024)
+
+_filter = BloomFilter(settings.BLACKLIST_FILTER_CAPACITY, settings.BLACKLIST_FILTER_ERROR_RATE)
+_last_id = 0
+_synced_at = 0.0
+_rebuilt_at = 0.0
+
+_lock: Optional[asyncio.Lock] = None
+_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+_skipped = metrics.counter("blacklist.filter.negative")
+_checked = metrics.counter("blacklist.filter.maybe")
+_rebuilds = metrics.counter("blacklist.filter.rebuilds")
+
+
+def _get_lock() -> asyncio.Lock:
+    # 이벤트 루프마다 새로 (테스트처럼 루프가 바뀌어도 다른 루프에 묶인 Lock 을 쓰지 않게)
+    global _lock, _lock_loop
+    loop = asyncio.get_running_loop()
+    if _lock is None or _lock_loop is not loop:
+        _lock, _lock_loop = asyncio.Lock(), loop
+    return _lock
+
+
+def _needs_rebuild() -> bool:
+    return _rebuilt_at == 0.0 or _filter.saturated
+
+
+async def rebuild_filter() -> int:
+    """테이블 전체로 필터 재구성 (startup/purge/주기 태스크). 적재 개수 반환"""
+    async with _get_lock():
+        return await _rebuild_locked()
+
+
+async def _rebuild_locked() -> int:
+    global _filter, _last_id, _synced_at, _rebuilt_at
+    rows = await TokenBlacklist.all().order_by("id").values_list("id", "jti")
+    capacity = max(settings.BLACKLIST_FILTER_CAPACITY, len(rows) * 2)
+    fresh = BloomFilter(capacity, settings.BLACKLIST_FILTER_ERROR_RATE)
+    last_id = 0
+    for row_id, jti in rows:
+        fresh.add(jti)
+        last_id = max(last_id, row_id)
+    for jti in list(_recent_local):
+        fresh.add(jti)
+    _filter, _last_id = fresh, last_id
+    _synced_at = _rebuilt_at = time.monotonic()
+    _rebuilds.inc()
+    return len(rows)
+
+
+def _sync_due() -> bool:
+    return time.monotonic() - _synced_at >= settings.BLACKLIST_SYNC_SECONDS
+
+
+async def _sync_filter() -> None:
+    if not _needs_rebuild() and not _sync_due():
+        return
+    async with _get_lock():
+        # 기다리는 동안 다른 요청이 이미 했으면 그대로 사용
+        if _needs_rebuild():
+            await _rebuild_locked()
+            return
+        if _sync_due():
+            await _sync_locked()
+
+
+async def _sync_locked() -> None:
+    global _last_id, _synced_at
+    _synced_at = time.monotonic()
+    rows = await (
+        TokenBlacklist.filter(id__gt=max(_last_id - _SYNC_LOOKBACK_IDS, 0))
+        .order_by("id")
+        .values_list("id", "jti")
+    )
+    for row_id, jti in rows:
+        if jti not in _filter:
+            _filter.add(jti)
+        _last_id = max(_last_id, row_id)
+
+
+async def _refresh_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.BLACKLIST_REBUILD_SECONDS)
+        try:
+            await rebuild_filter()
+        except Exception:
+            log.exception("blacklist filter rebuild failed")
+
+
+def start_filter_refresh() -> None:
+    """startup 에서 호출: 주기적 전체 재구성(만료분 정리)을 백그라운드로"""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_filter_refresh() -> None:
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+
 
 async def blacklist_jti(jti: str, expires_at: datetime) -> None:
     # 이미 존재하면 업데이트, 없으면 생성 (DB 종속 로직)
@@ -17,19 +150,41 @@ async def blacklist_jti(jti: str, expires_at: datetime) -> None:
         await obj.save()
     else:
         await TokenBlacklist.create(jti=jti, expires_at=expires_at)
+    # 이 워커는 즉시 반영 (다른 워커는 delta sync로)
+    _filter.add(jti)
+    _recent_local.append(jti)
 
 async def is_blacklisted(jti: str) -> bool:
+    await _sync_filter()
+    if jti not in _filter:
+        _skipped.inc()
+        return False
+    _checked.inc()
     obj = await TokenBlacklist.get_or_none(jti=jti)
     if not obj:
         return False
     # 만료된 항목은 블랙리스트에서 의미 없음
     return obj.expires_at > datetime.now(timezone.utc)
 
-async def purge_expired(now: Optional[datetime] = None) -> int:
-    """만료된 항목 일괄 삭제 후 삭제 개수 반환"""
+async def purge_expired(
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    pause: float = 0.0,
+) -> int:
+    """만료된 항목을 batch_size 개씩 나눠 삭제 후 삭제 개수 반환 (주기 정리: services/maintenance.py)"""
     now = now or datetime.now(timezone.utc)
-    # Tortoise 예시:
-    deleted = await TokenBlacklist.filter(expires_at__lte=now).delete()
+    deleted = await delete_in_batches(
+        TokenBlacklist, batch_size or settings.MAINTENANCE_BATCH_SIZE, pause, expires_at__lte=now
+    )
+    if deleted:
+        await rebuild_filter()
     return deleted
 
-__all__ = ["blacklist_jti", "is_blacklisted", "purge_expired"]
+__all__ = [
+    "blacklist_jti",
+    "is_blacklisted",
+    "purge_expired",
+    "rebuild_filter",
+    "start_filter_refresh",
+    "stop_filter_refresh",
+]
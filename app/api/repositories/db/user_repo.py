@@ -2,51 +2,66 @@ from __future__ import annotations
 from typing import Optional
 from tortoise.exceptions import IntegrityError
 
+from app.api.db.routing import PRIMARY, mark_write, read_db
 from app.api.models.user import User         # (예: app/api/models/user.py 인 경우)
 
 async def get_user_by_id(user_id: int) -> Optional[User]:
     return await User.get_or_none(id=user_id)
 
 async def get_by_email(email: str) -> Optional[User]:
-    return await User.get_or_none(email=email)
+    # 복제본 우선. 못 찾으면(방금 가입해 아직 복제 전일 수 있음) primary 로 한 번 더
+    db = read_db(email)
+    user = await User.get_or_none(email=email, using_db=db)
+    if user is None and db.connection_name != PRIMARY:
+        user = await User.get_or_none(email=email)
+    return user
 
 async def create_user(email: str, name: str, hashed_password: str) -> User:
     try:
-        return await User.create(email=email, name=name, hashed_password=hashed_password)
+        user = await User.create(email=email, name=name, hashed_password=hashed_password)
     except IntegrityError:
         # 레포에선 도메인 예외로 변환
         raise ValueError("email already exists")
+    mark_write(user.id, user.email)
+    return user
 
 async def mark_verified(email: str) -> Optional[User]:
     user = await User.get_or_none(email=email)
     if not user:
         return None
     user.is_verified = True
-    await user.save()
+    # 바꾼 필드만 (캐시된 User 의 옛 diary_version 등을 덮어쓰지 않게)
+    await user.save(update_fields=["is_verified", "updated_at"])
+    mark_write(user.id, user.email)
     return user
 
 async def update_user(user: User, **fields) -> User:
     allowed = {"name", "nickname", "phone_number", "hashed_password", "is_verified"}
-    for k, v in fields.items():
-        if k in allowed and v is not None:
-            setattr(user, k, v)
-    await user.save()
+    changed = [k for k, v in fields.items() if k in allowed and v is not None]
+    for k in changed:
+        setattr(user, k, fields[k])
+    await user.save(update_fields=[*changed, "updated_at"])
+    mark_write(user.id, user.email)
     return user
 
 async def update_user_by_id(user_id: int, **fields) -> Optional[User]:
     updated = await User.filter(id=user_id).update(**fields)
     if not updated:
         return None
-    return await User.get(id=user_id)
+    user = await User.get(id=user_id)
+    mark_write(user.id, user.email)
+    return user
 
 async def delete_user(user: User) -> None:
     await user.delete()
+    mark_write(user.id, user.email)
 
 async def delete_user_by_id(user_id: int) -> bool:
     user = await User.get_or_none(id=user_id)
     if not user:
         return False
     await user.delete()
+    mark_write(user.id, user.email)
     return True
 
 __all__ = [
@@ -1,9 +1,23 @@
 # app/api/repositories/diary_repo.py
 from __future__ import annotations
-from typing import Optional, List, Literal
-from datetime import date
-from tortoise.expressions import Q
-
+import base64
+import json
+from collections import Counter
+from typing import Hashable, Optional, List, Literal, Tuple
+from datetime import date, datetime
+from tortoise import connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.exceptions import NoValuesFetched
+from tortoise.expressions import F, Q
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
+
+from app.api.core.cache import TTLCache
+from app.api.core.config import settings
+from app.api.db.bulk import link_m2m
+from app.api.db.routing import PRIMARY, mark_write, read_db
+from app.api.db.search import diary_match_subquery, search_diary_ids
+from app.api.repositories.diary_stats_repo import apply_deltas, contributions, diff, keyword_names
 from app.api.models.diary import Diary
 from app.api.models.tag import Tag
 from app.api.models.user import User
@@ -28,49 +42,195 @@ def _norm_tags(names: Optional[List[str]]) -> List[str]:
     return out
 
 
-async def create_diary(user: User, data: dict) -> Diary:
+# ---------------------------------------------------------------------
+# Keyset(cursor) 페이징
+#  - 정렬키 (date, id) 를 그대로 커서로 사용 → ("user_id", "date") 인덱스로 seek
+#  - 커서는 불투명 문자열(base64url JSON). 잘못된 값이면 ValueError
+# ---------------------------------------------------------------------
+def encode_cursor(diary: Diary | dict) -> str:
+    """Diary 인스턴스 또는 list_diary_rows 의 dict 행"""
+    if isinstance(diary, dict):
+        d, diary_id = diary["date"], diary["id"]
+    else:
+        d, diary_id = diary.date, diary.id
+    d = d.date() if isinstance(d, datetime) else d
+    raw = json.dumps({"d": d.isoformat(), "i": int(diary_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(data["d"]), int(data["i"])
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+def _apply_cursor(qs: QuerySet[Diary], cursor: str, order: Literal["asc", "desc"]) -> QuerySet[Diary]:
+    """(date, id) 튜플 비교를 OR 조건으로 풀어 seek"""
+    c_date, c_id = decode_cursor(cursor)
+    if order == "desc":
+        return qs.filter(Q(date__lt=c_date) | Q(date=c_date, id__lt=c_id))
+    return qs.filter(Q(date__gt=c_date) | Q(date=c_date, id__gt=c_id))
+
+
+# ---------------------------------------------------------------------
+# 전문검색 (app/api/db/search.py)
+#  - 인덱스 검색 가능하면 매치 조건을 서브쿼리로 목록 쿼리에 넣음 (정렬/페이징/total 은 그대로)
+#  - 불가(미지원 DB/단어 없는 검색어)면 기존 icontains 폴백
+# ---------------------------------------------------------------------
+def _apply_search(
+    qs: QuerySet[Diary], user: User, q: str, db: BaseDBAsyncClient
+) -> QuerySet[Diary]:
+    matches = diary_match_subquery(user.id, q, db.connection_name)
+    if matches is None:
+        return qs.filter(Q(title__icontains=q) | Q(content__icontains=q))
+    return qs.filter(id__in=matches)
+
+
+async def search_diaries(user: User, q: str, limit: int = 20) -> List[Diary]:
+    """관련도순 검색 결과 (태그 prefetch 포함)"""
+    db = read_db(user.id)
+    hits = await search_diary_ids(user.id, q, limit, db.connection_name)
+    if hits is None:
+        return await (
+            Diary.filter(user=user)
+            .using_db(db)
+            .filter(Q(title__icontains=q) | Q(content__icontains=q))
+            .order_by("-date", "-id")
+            .prefetch_related("tags")
+            .limit(limit)
+        )
+    rank = {diary_id: i for i, (diary_id, _) in enumerate(hits)}
+    rows = await Diary.filter(user=user, id__in=list(rank)).using_db(db).prefetch_related("tags")
+    return sorted(rows, key=lambda d: rank[d.id])
+
+
+# ---------------------------------------------------------------------
+# 목록 페이지 캐시 (사용자별, 워커 로컬)
+#  - 키 = (사용자, users.diary_version, 조회 파라미터)
+#    · diary_version: 목록 응답을 바꾸는 쓰기(일기 생성/수정/삭제, 태그 삭제, AI 결과 저장)가
+#      같은 트랜잭션에서 bump_diary_version 으로 +1 → 모든 워커에 같이 반영
+#    · 키 만들기 = PK 로 users 한 행 읽기 (일기 수와 무관)
+#  - 조회 전에 키를 만들어 두므로 조회 중 쓰기가 끼면 옛 키로 저장 → 새 키로는 보이지 않음
+#  - 값은 호출부가 정함 (diary 엔드포인트: (etag, body, next_cursor))
+# ---------------------------------------------------------------------
+_list_pages: TTLCache[tuple] = TTLCache(
+    "diary.list_cache",
+    maxsize=settings.DIARY_LIST_CACHE_SIZE,
+    ttl=settings.DIARY_LIST_CACHE_TTL_SECONDS,
+)
+
+
+async def list_page_key(user: User, *params: Hashable) -> tuple:
+    """조회 전에 만들 것 (버전이 키에 고정됨)"""
+    version = await (
+        User.filter(id=user.id).using_db(read_db(user.id)).values_list("diary_version", flat=True)
+    )
+    return (user.id, version[0] if version else 0, *params)
+
+
+def get_list_page(key: tuple) -> Optional[tuple]:
+    return _list_pages.get(key)
+
+
+def set_list_page(key: tuple, value: tuple) -> None:
+    _list_pages.set(key, value)
+
+
+async def bump_diary_version(user_id: int, using_db: Optional[BaseDBAsyncClient] = None) -> None:
+    """목록 캐시 버전 +1. 쓰기와 같은 트랜잭션(using_db)에서 호출 (커밋돼야 다른 워커에 보임)"""
+    await User.filter(id=user_id).using_db(using_db).update(diary_version=F("diary_version") + 1)
+
+
+def _names(tags: List[Tag]) -> List[str]:
+    """응답용 태그 이름 (id 순 = 목록 행/prefetch 직렬화와 같은 순서)"""
+    return [t.name for t in sorted(tags, key=lambda t: t.id)]
+
+
+async def _loaded_tags(diary: Diary, conn: BaseDBAsyncClient) -> List[Tag]:
+    """prefetch_related("tags") 로 읽은 일기면 그 결과, 아니면 조회"""
+    try:
+        return list(diary.tags)
+    except NoValuesFetched:
+        return await diary.tags.all().using_db(conn)
+
+
+async def _resolve_tags(
+    user_id: int, names: List[str], conn: BaseDBAsyncClient
+) -> List[Tag]:
+    """
+    태그 이름 → Tag 일괄 해석 (태그 개수와 무관하게 최대 3쿼리)
+    1) 기존 (user_id, name) 조회  2) 없는 것만 bulk INSERT(충돌 무시)
+    3) 새로 만든 것 id 재조회 (bulk_create는 충돌 무시 시 pk를 돌려주지 않음)
+    """
+    if not names:
+        return []
+    by_name = {t.name: t for t in await Tag.filter(user_id=user_id, name__in=names).using_db(conn)}
+    missing = [n for n in names if n not in by_name]
+    if missing:
+        await Tag.bulk_create(
+            [Tag(user_id=user_id, name=n) for n in missing], ignore_conflicts=True, using_db=conn
+        )
+        for t in await Tag.filter(user_id=user_id, name__in=missing).using_db(conn):
+            by_name[t.name] = t
+    return [by_name[n] for n in names if n in by_name]
+
+
+async def create_diary(user: User, data: dict) -> Tuple[Diary, List[str]]:
     """
     - date 기본값 보정
-    - tags(M2M) 연결: 문자열 리스트를 Tag 엔티티로 정규화 후 add
+    - tags(M2M) 연결: 태그 일괄 해석 후 diary_tag 에 한 번에 INSERT
+    - 전체를 한 트랜잭션으로 (통계 집계 포함)
+    - 반환: (일기, 태그 이름) → 직렬화에 그대로 넘김 (태그 재조회 없음)
     """
     payload = dict(data)
     tag_names = _norm_tags(payload.pop("tags", None))
     if not payload.get("date"):
         payload["date"] = date.today()
 
-    diary = await Diary.create(user=user, **payload)
-
-    for name in tag_names:
-        t, _ = await Tag.get_or_create(user=user, name=name)
-        await diary.tags.add(t)
+    async with in_transaction(PRIMARY) as conn:
+        diary = await Diary.create(user=user, using_db=conn, **payload)
+        tags = await _resolve_tags(user.id, tag_names, conn)
+        await link_m2m(diary.tags, tags, using_db=conn)
+        await apply_deltas({user.id: contributions(diary.date, diary.mood)}, using_db=conn)
+        await bump_diary_version(user.id, conn)
 
-    return diary
+    mark_write(user.id)
+    return diary, _names(tags)
 
 
-async def get_diary_by_id_for_user(user: User, diary_id: int) -> Optional[Diary]:
-    # 태그도 함께 보고 싶으면 prefetch:
+async def get_diary_by_id_for_user(
+    user: User, diary_id: int, for_update: bool = False
+) -> Optional[Diary]:
+    """
+    태그까지 한 번에 (직렬화 시 추가 조회 없음).
+    for_update=True 면 primary 에서 읽음 → 수정/삭제가 복제본의 옛 행/태그를 기준으로 쓰지 않게
+    """
+    db = connections.get(PRIMARY) if for_update else read_db(user.id)
     return await (
         Diary.filter(id=diary_id, user=user)
+        .using_db(db)
         .prefetch_related("tags")
         .first()
     )
 
 
-async def list_diaries(
+def _filtered_qs(
     user: User,
-    page: int = 1,
-    page_size: int = 20,
-    q: Optional[str] = None,
-    date_from: Optional[date] = None,
-    date_to: Optional[date] = None,
-    order: Literal["asc", "desc"] = "desc",
-    tags_any: Optional[List[str]] = None,   # 태그 ANY
-    tags_all: Optional[List[str]] = None,   # 태그 ALL
-) -> List[Diary]:
-    qs = Diary.filter(user=user)
+    q: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    tags_any: Optional[List[str]],
+    tags_all: Optional[List[str]],
+    db: BaseDBAsyncClient,
+) -> QuerySet[Diary]:
+    """목록/개수/values 조회가 공유하는 필터 (정렬·페이징 전)"""
+    qs = Diary.filter(user=user).using_db(db)
 
     if q:
-        qs = qs.filter(Q(title__icontains=q) | Q(content__icontains=q))
+        qs = _apply_search(qs, user, q, db)
     if date_from:
         qs = qs.filter(date__gte=date_from)
     if date_to:
@@ -85,43 +245,152 @@ async def list_diaries(
         for t in all_norm:
             qs = qs.filter(tags__name=t)
         qs = qs.distinct()
+    return qs
 
 
+def _paged(
+    qs: QuerySet[Diary],
+    page: int,
+    page_size: int,
+    order: Literal["asc", "desc"],
+    cursor: Optional[str],
+) -> QuerySet[Diary]:
     if order == "desc":
         qs = qs.order_by("-date", "-id")
     else:
         qs = qs.order_by("date", "id")
 
-    qs = qs.prefetch_related("tags")
+    if cursor:
+        return _apply_cursor(qs, cursor, order).limit(page_size)
 
     offset = max(page - 1, 0) * page_size
-    return await qs.offset(offset).limit(page_size)
+    return qs.offset(offset).limit(page_size)
 
 
-async def update_diary(diary: Diary, data: dict) -> Diary:
+async def list_diaries(
+    user: User,
+    page: int = 1,
+    page_size: int = 20,
+    q: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    order: Literal["asc", "desc"] = "desc",
+    tags_any: Optional[List[str]] = None,   # 태그 ANY
+    tags_all: Optional[List[str]] = None,   # 태그 ALL
+    cursor: Optional[str] = None,           # 주면 offset 대신 keyset 페이징
+) -> List[Diary]:
+    qs = _filtered_qs(user, q, date_from, date_to, tags_any, tags_all, read_db(user.id))
+    # 페이지 전체 태그를 쿼리 1번으로 (행별 fetch_related 없음)
+    return await _paged(qs, page, page_size, order, cursor).prefetch_related("tags")
+
+
+# 응답 직렬화용 컬럼 (모델 인스턴스 생성 없이 values 로 조회)
+DIARY_ROW_FIELDS = (
+    "id", "title", "content", "mood", "date", "is_private", "created_at", "updated_at",
+)
+
+
+async def list_diary_rows(
+    user: User,
+    page: int = 1,
+    page_size: int = 20,
+    q: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    order: Literal["asc", "desc"] = "desc",
+    tags_any: Optional[List[str]] = None,
+    tags_all: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+) -> List[dict]:
+    """
+    list_diaries 와 같은 조건/순서로 dict 행 반환 (+ "tags": 이름 리스트).
+    쿼리 2번: 일기 values 1번 + 페이지 전체 태그 1번.
+    """
+    db = read_db(user.id)
+    qs = _filtered_qs(user, q, date_from, date_to, tags_any, tags_all, db)
+    rows = await _paged(qs, page, page_size, order, cursor).values(*DIARY_ROW_FIELDS)
+    if not rows:
+        return rows
+
+    by_id = {}
+    for r in rows:
+        r["tags"] = []
+        # 키 순서를 단건 응답(diary_to_dict)과 맞춤: ..., tags, created_at, updated_at
+        r["created_at"] = r.pop("created_at")
+        r["updated_at"] = r.pop("updated_at")
+        by_id[r["id"]] = r
+    pairs = await (
+        Tag.filter(diaries__id__in=list(by_id))
+        .using_db(db)
+        .order_by("id")
+        .values_list("diaries__id", "name")
+    )
+    for diary_id, name in pairs:
+        by_id[diary_id]["tags"].append(name)
+    return rows
+
+
+async def update_diary(diary: Diary, data: dict) -> Tuple[Diary, List[str]]:
     """
     - 허용 필드만 업데이트
-    - tags가 들어오면 전체 교체(clear → add)
+    - tags가 들어오면 전체 교체: 현재 연결과 diff 떠서 추가/삭제분만 반영
+      (diary 가 tags 를 prefetch 한 상태면 현재 연결은 다시 조회하지 않음)
+    - date/mood 가 바뀌면 통계 집계도 이동
+    - 전체를 한 트랜잭션으로
+    - 반환: (일기, 수정 후 태그 이름). diary.tags 의 prefetch 결과는 갱신하지 않으므로 이름을 쓸 것
     """
     changes = dict(data)
-    tag_names = _norm_tags(changes.pop("tags", None))
+    tag_names = _norm_tags(changes.pop("tags")) if "tags" in changes else None
 
+    old_date, old_mood = diary.date, diary.mood
     for k, v in changes.items():
         if k in ALLOWED_UPDATE_FIELDS:
             setattr(diary, k, v)
-    await diary.save()
 
-    if tag_names is not None:
-        await diary.tags.clear()
-        for name in tag_names:
-            t, _ = await Tag.get_or_create(user=diary.user, name=name)
-            await diary.tags.add(t)
-
-    return diary
+    async with in_transaction(PRIMARY) as conn:
+        await diary.save(using_db=conn)
+        if (old_date, old_mood) != (diary.date, diary.mood):
+            await _move_stats(diary, old_date, old_mood, conn)
+
+        current = await _loaded_tags(diary, conn)
+        if tag_names is not None:
+            wanted = await _resolve_tags(diary.user_id, tag_names, conn)
+
+            current_ids = {t.id for t in current}
+            wanted_ids = {t.id for t in wanted}
+            to_remove = [t for t in current if t.id not in wanted_ids]
+            to_add = [t for t in wanted if t.id not in current_ids]
+            if to_remove:
+                await diary.tags.remove(*to_remove, using_db=conn)
+            await link_m2m(diary.tags, to_add, using_db=conn)
+            current = wanted
+        await bump_diary_version(diary.user_id, conn)
+
+    mark_write(diary.user_id)
+    return diary, _names(current)
+
+
+async def _move_stats(
+    diary: Diary, old_date: date, old_mood: Optional[str], conn: BaseDBAsyncClient
+) -> None:
+    """수정 전 (date, mood) 기여 → 수정 후. 날짜가 바뀌면 감정/키워드도 다른 기간으로"""
+    emotion, names = None, []
+    if old_date != diary.date:
+        emotion = diary.main_emotion
+        names = (await keyword_names([diary.id], using_db=conn)).get(diary.id, [])
+    before = contributions(old_date, old_mood, emotion, names)
+    after = contributions(diary.date, diary.mood, emotion, names)
+    await apply_deltas({diary.user_id: diff(before, after)}, using_db=conn)
 
 
 async def delete_diary(diary: Diary) -> None:
-    await diary.delete()
+    async with in_transaction(PRIMARY) as conn:
+        names = (await keyword_names([diary.id], using_db=conn)).get(diary.id, [])
+        await diary.delete(using_db=conn)
+        gone = contributions(diary.date, diary.mood, diary.main_emotion, names)
+        await apply_deltas({diary.user_id: diff(gone, Counter())}, using_db=conn)
+        await bump_diary_version(diary.user_id, conn)
+    mark_write(diary.user_id)
 
 
 # (선택) total 포함 버전
@@ -135,31 +404,9 @@ async def list_diaries_with_total(
     order: Literal["asc", "desc"] = "desc",
     tags_any: Optional[List[str]] = None,
     tags_all: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
 ) -> tuple[List[Diary], int]:
-    qs = Diary.filter(user=user)
-
-    if q:
-        qs = qs.filter(Q(title__icontains=q) | Q(content__icontains=q))  # ← 오타 fix
-    if date_from:
-        qs = qs.filter(date__gte=date_from)
-    if date_to:
-        qs = qs.filter(date__lte=date_to)
-
-    any_norm = _norm_tags(tags_any)
-    all_norm = _norm_tags(tags_all)
-
-    if any_norm:
-        qs = qs.filter(tags__name__in=any_norm).distinct()
-    if all_norm:
-        for t in all_norm:
-            qs = qs.filter(tags__name=t)
-        qs = qs.distinct()
-
+    qs = _filtered_qs(user, q, date_from, date_to, tags_any, tags_all, read_db(user.id))
     total = await qs.count()
-
-    qs = qs.prefetch_related("tags")
-    qs = qs.order_by("-date", "-id") if order == "desc" else qs.order_by("date", "id")
-
-    offset = max(page - 1, 0) * page_size
-    items = await qs.offset(offset).limit(page_size)
+    items = await _paged(qs, page, page_size, order, cursor).prefetch_related("tags")
     return items, total
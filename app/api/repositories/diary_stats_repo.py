@@ -0,0 +1,235 @@
+# app/api/repositories/diary_stats_repo.py
+"""
+사용자별 일기 통계 (diary_stat 집계 테이블).
+
+일기 하나가 기여하는 키 = (기간 종류, 기간 시작일, 항목, 값) 를 day/week/month 마다
+- ("diary", "")        : 일기 수
+- ("mood", mood)       : 사용자가 고른 기분
+- ("emotion", 감정)    : AI 분석 main_emotion
+- ("keyword", 키워드)  : AI 분석 감정 키워드
+
+쓰기(작성/수정/삭제/분석)마다 바뀌기 전/후 기여를 비교해 차이만 반영
+- INSERT ... ON CONFLICT DO UPDATE SET count = count + 차이 한 번 (키 개수와 무관)
+- 0 이하가 된 행은 지움
+- 호출부의 트랜잭션(conn)에서 실행 → 일기 쓰기와 같이 커밋/롤백
+
+조회는 (사용자, 기간 종류, 기간 시작일 범위) 로 집계 행만 읽으므로 일기 수와 무관.
+기존 데이터를 채우거나 어긋났을 때: rebuild_stats() (scripts/rebuild_diary_stats.py)
+"""
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from pypika_tortoise import Table
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+
+from app.api.db.bulk import m2m_rows
+from app.api.db.routing import PRIMARY, read_db
+from app.api.models.diary import Diary
+from app.api.models.diary_stat import DiaryStat
+from app.api.models.emotion import EmotionKeyword
+
+PERIODS = ("day", "week", "month")
+
+_TABLE = Table(DiaryStat._meta.db_table)
+_COLUMNS = ("user_id", "period", "period_start", "dimension", "value", "count")
+_UPSERT = (
+    ' ON CONFLICT ("user_id", "period", "period_start", "dimension", "value")'
+    ' DO UPDATE SET "count" = "diary_stat"."count" + EXCLUDED."count"'
+)
+
+
+def period_start(d: date, period: str) -> date:
+    if isinstance(d, datetime):
+        d = d.date()
+    if period == "day":
+        return d
+    if period == "week":
+        return d - timedelta(days=d.weekday())
+    if period == "month":
+        return d.replace(day=1)
+    raise ValueError(f"unknown period: {period}")
+
+
+def contributions(
+    diary_date: date,
+    mood: Optional[str] = None,
+    emotion: Optional[str] = None,
+    keywords: Iterable[str] = (),
+) -> Counter:
+    """일기 하나가 더하는 키 (period, period_start, dimension, value) → 1"""
+    values = [("diary", "")]
+    if mood:
+        values.append(("mood", mood[:50]))
+    if emotion:
+        values.append(("emotion", emotion[:50]))
+    values.extend(("keyword", k[:50]) for k in dict.fromkeys(keywords) if k)
+    out: Counter = Counter()
+    for period in PERIODS:
+        start = period_start(diary_date, period)
+        for dimension, value in values:
+            out[(period, start, dimension, value)] += 1
+    return out
+
+
+def diff(before: Counter, after: Counter) -> Counter:
+    """after - before (음수 포함, 0 은 뺌)"""
+    delta = Counter(after)
+    delta.subtract(before)
+    return Counter({k: v for k, v in delta.items() if v})
+
+
+async def apply_deltas(
+    deltas: Mapping[int, Counter], using_db: Optional[BaseDBAsyncClient] = None
+) -> None:
+    """사용자별 차이를 한 번에 반영 (upsert 1번 + 음수가 있으면 정리 DELETE 1번)"""
+    rows = [
+        (user_id, *key, n)
+        for user_id, delta in deltas.items()
+        for key, n in delta.items()
+        if n
+    ]
+    if not rows:
+        return
+    db = using_db or DiaryStat._meta.db
+    query = db.query_class.into(_TABLE).columns(*_COLUMNS)
+    for row in rows:
+        query = query.insert(*row)
+    sql, params = query.get_parameterized_sql()
+    await db.execute_query(sql + _UPSERT, params)
+    shrunk = sorted({row[0] for row in rows if row[-1] < 0})
+    if shrunk:
+        await DiaryStat.filter(user_id__in=shrunk, count__lte=0).using_db(db).delete()
+
+
+async def keyword_names(
+    diary_ids: Sequence[int], using_db: Optional[BaseDBAsyncClient] = None
+) -> Dict[int, List[str]]:
+    """일기별 연결된 감정 키워드 이름 (연결 테이블 1번 + 이름 1번)"""
+    pairs = await m2m_rows(Diary, "emotion_keywords", diary_ids, using_db=using_db)
+    if not pairs:
+        return {}
+    kw_ids = {kw_id for _, kw_id in pairs}
+    qs = EmotionKeyword.filter(id__in=kw_ids)
+    if using_db is not None:
+        qs = qs.using_db(using_db)
+    names = dict(await qs.values_list("id", "name"))
+    out: Dict[int, List[str]] = defaultdict(list)
+    for diary_id, kw_id in pairs:
+        if kw_id in names:
+            out[diary_id].append(names[kw_id])
+    return out
+
+
+# ---------------------------------------------------------------------
+# 조회
+# ---------------------------------------------------------------------
+async def get_stats(
+    user_id: int,
+    period: str,
+    date_from: date,
+    date_to: date,
+    top_keywords: int = 5,
+) -> Dict[str, Any]:
+    """
+    기간별 버킷 + 범위 합계.
+    buckets: [{"start", "diaries", "moods": {값: 수}, "emotions": {...}, "keywords": [{"name", "count"}]}]
+    """
+    rows = await (
+        DiaryStat.filter(
+            user_id=user_id,
+            period=period,
+            period_start__gte=period_start(date_from, period),
+            period_start__lte=date_to,
+        )
+        .using_db(read_db(user_id))
+        .order_by("period_start")
+        .values_list("period_start", "dimension", "value", "count")
+    )
+    buckets: Dict[date, Dict[str, Any]] = {}
+    totals: Dict[str, Counter] = defaultdict(Counter)
+    for start, dimension, value, n in rows:
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = buckets[start] = {
+                "start": start, "diaries": 0,
+                "moods": Counter(), "emotions": Counter(), "keywords": Counter(),
+            }
+        if dimension == "diary":
+            bucket["diaries"] += n
+        elif dimension in ("mood", "emotion", "keyword"):
+            bucket[dimension + "s"][value] += n
+        totals[dimension][value] += n
+
+    def _top(counter: Counter) -> List[Dict[str, Any]]:
+        return [{"name": k, "count": v} for k, v in counter.most_common(top_keywords)]
+
+    return {
+        "period": period,
+        "date_from": date_from,
+        "date_to": date_to,
+        "totals": {
+            "diaries": totals["diary"][""],
+            "moods": dict(totals["mood"].most_common()),
+            "emotions": dict(totals["emotion"].most_common()),
+            "keywords": _top(totals["keyword"]),
+        },
+        "buckets": [
+            {
+                "start": b["start"],
+                "diaries": b["diaries"],
+                "moods": dict(b["moods"].most_common()),
+                "emotions": dict(b["emotions"].most_common()),
+                "keywords": _top(b["keywords"]),
+            }
+            for b in buckets.values()
+        ],
+    }
+
+
+# ---------------------------------------------------------------------
+# 전체 재계산 (마이그레이션 후 채우기 / 점검)
+# ---------------------------------------------------------------------
+async def rebuild_stats(user_id: Optional[int] = None, chunk: int = 1000) -> int:
+    """diary 원본에서 다시 계산해 교체. 반환: 처리한 일기 수"""
+    done = 0
+    async with in_transaction(PRIMARY) as conn:
+        stale = DiaryStat.all().using_db(conn)
+        if user_id is not None:
+            stale = stale.filter(user_id=user_id)
+        await stale.delete()
+        after_id = 0
+        while True:
+            qs = Diary.filter(id__gt=after_id).using_db(conn)
+            if user_id is not None:
+                qs = qs.filter(user_id=user_id)
+            rows = await qs.order_by("id").limit(chunk).values(
+                "id", "user_id", "date", "mood", "main_emotion"
+            )
+            if not rows:
+                break
+            names = await keyword_names([r["id"] for r in rows], using_db=conn)
+            deltas: Dict[int, Counter] = defaultdict(Counter)
+            for r in rows:
+                deltas[r["user_id"]].update(
+                    contributions(r["date"], r["mood"], r["main_emotion"], names.get(r["id"], ()))
+                )
+            await apply_deltas(deltas, using_db=conn)
+            done += len(rows)
+            after_id = rows[-1]["id"]
+    return done
+
+
+__all__ = [
+    "PERIODS",
+    "period_start",
+    "contributions",
+    "diff",
+    "apply_deltas",
+    "keyword_names",
+    "get_stats",
+    "rebuild_stats",
+]
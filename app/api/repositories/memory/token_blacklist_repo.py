@@ -17,14 +17,38 @@ async def is_blacklisted(jti: str) -> bool:
     # 만료면 의미 없음
     return exp > datetime.now(timezone.utc)
 
-async def purge_expired(now: Optional[datetime] = None) -> int:
+async def purge_expired(
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    pause: float = 0.0,
+) -> int:
+    # dict 라 나눠 지울 필요 없음 (DB 레포와 인터페이스만 맞춤)
     now = now or datetime.now(timezone.utc)
     to_del = [k for k, v in _store.items() if v <= now]
     for k in to_del:
         _store.pop(k, None)
     return len(to_del)
 
+async def rebuild_filter() -> int:
+    # 인메모리 저장소는 dict 조회라 별도 필터 불필요 (DB 레포와 인터페이스만 맞춤)
+    return len(_store)
+
+def start_filter_refresh() -> None:
+    # 재구성할 필터 없음
+    return None
+
+async def stop_filter_refresh() -> None:
+    return None
+
 def _reset() -> None:
     _store.clear()
 
-__all__ = ["blacklist_jti", "is_blacklisted", "purge_expired", "_reset"]
+__all__ = [
+    "blacklist_jti",
+    "is_blacklisted",
+    "purge_expired",
+    "rebuild_filter",
+    "start_filter_refresh",
+    "stop_filter_refresh",
+    "_reset",
+]
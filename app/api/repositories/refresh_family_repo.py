@@ -0,0 +1,100 @@
+# app/api/repositories/refresh_family_repo.py
+"""
+refresh 토큰 family (로그인 세션당 행 하나, 모델: app/api/models/refresh_family.py).
+
+- 로그인: start_family() → 새 family(generation 0), 토큰에 fam/gen 클레임
+- 회전(/auth/refresh): rotate() 조건부 UPDATE 한 번
+  `SET generation = generation + 1 WHERE id=? AND user_id=? AND generation=? AND 폐기 안 됨 AND 만료 안 됨`
+  · 갱신됐으면 새 토큰은 gen+1 → 같은 토큰을 두 번(동시에라도) 쓰면 한 번만 성공
+  · 안 됐으면 이미 회전된(탈취 가능성) 토큰 → family 전체 폐기 (정상 사용자도 다시 로그인)
+- 로그아웃: revoke_family() UPDATE 한 번 → 그 세션의 모든 refresh 토큰 무효
+- 테이블 크기는 회전 횟수가 아니라 활성 세션 수에 비례, 만료 행은 services/maintenance.py 가 정리
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+
+from app.api.core import metrics
+from app.api.core.config import settings
+from app.api.db.bulk import delete_in_batches
+from app.api.models.refresh_family import RefreshFamily
+
+_reuse_detected = metrics.counter("auth.refresh.reuse_detected")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _expires_at() -> datetime:
+    return _now() + timedelta(days=settings.REFRESH_TOKEN_DAYS)
+
+
+async def start_family(user_id: int, family_id: Optional[str] = None, generation: int = 0) -> str:
+    """새 family INSERT 후 id 반환 (id 가 이미 있으면 IntegrityError)"""
+    family_id = family_id or uuid.uuid4().hex
+    await RefreshFamily.create(
+        id=family_id, user_id=user_id, generation=generation, expires_at=_expires_at()
+    )
+    return family_id
+
+
+async def rotate(family_id: str, generation: int, user_id: int) -> bool:
+    """generation 이 현재 값이면 +1 하고 True. 아니면(재사용/폐기/만료) family 폐기 후 False"""
+    now = _now()
+    updated = await RefreshFamily.filter(
+        id=family_id,
+        user_id=user_id,
+        generation=generation,
+        revoked_at__isnull=True,
+        expires_at__gt=now,
+    ).update(generation=F("generation") + 1, expires_at=_expires_at(), updated_at=now)
+    if updated:
+        return True
+    if await revoke_family(family_id):
+        _reuse_detected.inc()
+    return False
+
+
+async def adopt_legacy(jti: str, user_id: int) -> bool:
+    """
+    fam 클레임 없는(배포 전 발급) refresh 토큰: jti 를 family id 로 generation 1 family 생성.
+    같은 토큰이 다시 오면 INSERT 가 충돌 → False (한 번만 회전 가능)
+    """
+    try:
+        await start_family(user_id, family_id=jti, generation=1)
+    except IntegrityError:
+        await revoke_family(jti)
+        return False
+    return True
+
+
+async def revoke_family(family_id: str) -> bool:
+    """UPDATE 한 번으로 family 폐기. 살아 있던 family 였으면 True"""
+    n = await RefreshFamily.filter(id=family_id, revoked_at__isnull=True).update(
+        revoked_at=_now(), updated_at=_now()
+    )
+    return bool(n)
+
+
+async def purge_expired_families(
+    now: Optional[datetime] = None, batch_size: Optional[int] = None, pause: float = 0.0
+) -> int:
+    now = now or _now()
+    return await delete_in_batches(
+        RefreshFamily, batch_size or settings.MAINTENANCE_BATCH_SIZE, pause, expires_at__lt=now
+    )
+
+
+__all__ = [
+    "start_family",
+    "rotate",
+    "adopt_legacy",
+    "revoke_family",
+    "purge_expired_families",
+]
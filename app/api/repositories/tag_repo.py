@@ -2,26 +2,39 @@
 from __future__ import annotations
 from .memory import tag_repo as mem
 # app/api/repositories/tag_repo.py
+from datetime import datetime, timezone
 from typing import List, Optional
 from tortoise.exceptions import IntegrityError
+from tortoise.transactions import in_transaction
 
+from app.api.db.routing import PRIMARY, mark_write, read_db
+from app.api.repositories.diary_repo import bump_diary_version
 from app.api.models import Tag, User, Diary
 
 async def list_tags(user: User) -> List[Tag]:
-    return await Tag.filter(user=user).order_by("name")
+    return await Tag.filter(user=user).using_db(read_db(user.id)).order_by("name")
 
 async def create_tag(user: User, name: str) -> Tag:
     try:
-        return await Tag.create(user=user, name=name.strip())
+        tag = await Tag.create(user=user, name=name.strip())
     except IntegrityError:
         # 사용자별 중복 이름 방지
         raise ValueError("tag already exists")
+    mark_write(user.id)
+    return tag
 
 async def delete_tag(user: User, tag_id: int) -> bool:
     tag = await Tag.get_or_none(id=tag_id, user=user)
     if not tag:
         return False
-    await tag.delete()
+    # 응답의 tags 가 바뀜 → 붙어 있던 일기의 updated_at 을 올리고 목록 캐시 버전도 같은 트랜잭션에서 +1
+    async with in_transaction(PRIMARY) as conn:
+        diary_ids = await Diary.filter(user=user, tags__id=tag_id).using_db(conn).values_list("id", flat=True)
+        await tag.delete(using_db=conn)
+        if diary_ids:
+            await Diary.filter(id__in=diary_ids).using_db(conn).update(updated_at=datetime.now(timezone.utc))
+        await bump_diary_version(user.id, conn)
+    mark_write(user.id)
     return True
 
 list_by_user = mem.list_by_user
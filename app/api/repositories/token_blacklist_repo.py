@@ -1,7 +1,10 @@
 # app/api/repositories/token_blacklist_repo.py
 from __future__ import annotations
 
+from datetime import datetime
+
 from app.api.core.config import settings
+from app.api.core.security import invalidate_principal
 
 USE_FAKE = bool(getattr(settings, "USE_FAKE_REPOS", False))
 
@@ -10,6 +13,14 @@ if USE_FAKE:
 else:
     from .db.token_blacklist_repo import *      # noqa: F401,F403
 
+_store_blacklist_jti = blacklist_jti
+
+
+async def blacklist_jti(jti: str, expires_at: datetime) -> None:
+    """저장소에 등록 + 이 워커의 principal 캐시 무효화"""
+    await _store_blacklist_jti(jti, expires_at)
+    invalidate_principal(jti)
+
 
 async def is_jti_blacklisted(jti: str) -> bool:
     return await is_blacklisted(jti)
@@ -1,4 +1,6 @@
 from datetime import datetime, timezone
+from app.api.core.config import settings
+from app.api.db.bulk import delete_in_batches
 from app.api.models.revoked_token import RevokedToken
 
 async def revoke_refresh(jti: str, user_id: int | None, exp_ts: int) -> None:
@@ -9,9 +11,12 @@ async def revoke_refresh(jti: str, user_id: int | None, exp_ts: int) -> None:
 async def is_refresh_revoked(jti: str) -> bool:
     return await RevokedToken.exists(jti=jti)
 
-# 선택: 청소(만료 지난 블랙리스트 제거)
-async def purge_revoked_expired(now: datetime | None = None) -> int:
+# 청소(만료 지난 항목 제거): batch_size 개씩 나눠 삭제, 주기 실행은 services/maintenance.py
+async def purge_revoked_expired(
+    now: datetime | None = None, batch_size: int | None = None, pause: float = 0.0
+) -> int:
     now = now or datetime.now(timezone.utc)
-    deleted = await RevokedToken.filter(expires_at__lt=now).delete()
-    return deleted
+    return await delete_in_batches(
+        RevokedToken, batch_size or settings.MAINTENANCE_BATCH_SIZE, pause, expires_at__lt=now
+    )
 
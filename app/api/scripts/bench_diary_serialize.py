@@ -0,0 +1,123 @@
+# app/api/scripts/bench_diary_serialize.py
+"""
+일기 목록 응답 직렬화 마이크로벤치마크 (SQLite 메모리 DB).
+
+    python -m app.api.scripts.bench_diary_serialize [--rows 100] [--repeat 200]
+
+- legacy: 모델 인스턴스 + getattr/str()/bool() dict + response_model 검증 + jsonable_encoder + json
+- fast  : values 행 + orjson(없으면 stdlib) bytes 직접 인코딩
+각각 "직렬화만" / "DB 조회 포함" 으로 측정합니다.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime as _dt, timedelta
+from typing import Any, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from tortoise import Tortoise
+
+from app.api.core import responses
+from app.api.db.database import build_tortoise_config
+from app.api.models import User
+from app.api.repositories.diary_repo import create_diary, list_diaries, list_diary_rows
+from app.api.v1.diary.serializers import encode_diary_rows
+
+_list_of_dict = TypeAdapter(List[dict])
+
+
+def _legacy_to_out_dict(d) -> dict[str, Any]:
+    """변경 전 diary/endpoints.py 의 _to_out_dict 그대로"""
+    raw_date = getattr(d, "date", None)
+    out_date = raw_date.date() if isinstance(raw_date, _dt) else raw_date
+    try:
+        tag_names = [str(t.name) for t in d.tags]
+    except Exception:
+        tag_names = []
+    return {
+        "id": int(d.id),
+        "title": str(getattr(d, "title", "")),
+        "content": str(getattr(d, "content", "")),
+        "mood": getattr(d, "mood", None),
+        "date": out_date,
+        "is_private": bool(getattr(d, "is_private", True)),
+        "tags": tag_names,
+        "created_at": getattr(d, "created_at", None),
+        "updated_at": getattr(d, "updated_at", None),
+    }
+
+
+def _legacy_encode(diaries) -> bytes:
+    # response_model=List[dict] 검증 → jsonable_encoder → JSONResponse.render 와 같은 단계
+    body = _list_of_dict.validate_python([_legacy_to_out_dict(d) for d in diaries])
+    return json.dumps(
+        jsonable_encoder(body), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _us(total: float, repeat: int) -> float:
+    return total / repeat * 1e6
+
+
+async def _run(rows: int, repeat: int) -> None:
+    await Tortoise.init(config=build_tortoise_config("sqlite://:memory:"))
+    await Tortoise.generate_schemas()
+    try:
+        user = await User.create(email="bench@example.com", name="bench", hashed_password="x")
+        start = date(2025, 1, 1)
+        for i in range(rows):
+            await create_diary(user, {
+                "title": f"제목 {i}",
+                "content": "오늘은 점심에 파스타를 먹고 30분 운동했다. " * 5,
+                "mood": "happy",
+                "date": start + timedelta(days=i),
+                "tags": ["food", "exercise", f"t{i % 7}"],
+            })
+
+        models = await list_diaries(user, page_size=rows)
+        values = await list_diary_rows(user, page_size=rows)
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            _legacy_encode(models)
+        legacy_ser = _us(time.perf_counter() - t0, repeat)
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            encode_diary_rows([dict(r) for r in values])
+        fast_ser = _us(time.perf_counter() - t0, repeat)
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            _legacy_encode(await list_diaries(user, page_size=rows))
+        legacy_e2e = _us(time.perf_counter() - t0, repeat)
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            encode_diary_rows(await list_diary_rows(user, page_size=rows))
+        fast_e2e = _us(time.perf_counter() - t0, repeat)
+    finally:
+        await Tortoise.close_connections()
+
+    backend = "orjson" if responses.orjson is not None else "stdlib json"
+    print(f"rows={rows} repeat={repeat} encoder={backend}")
+    print(f"{'path':<10}{'serialize µs':>16}{'query+serialize µs':>22}")
+    print(f"{'legacy':<10}{legacy_ser:>16.0f}{legacy_e2e:>22.0f}")
+    print(f"{'fast':<10}{fast_ser:>16.0f}{fast_e2e:>22.0f}")
+    print(f"{'speedup':<10}{legacy_ser / fast_ser:>15.1f}x{legacy_e2e / fast_e2e:>21.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(_run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# app/api/scripts/bench_jwt.py
+"""
+JWT 인코딩/검증 처리량 (토큰/초): HS256 백엔드(fast, jose) + 비대칭 키링(ES256, EdDSA).
+
+    python -m app.api.scripts.bench_jwt [--n 20000] [--repeat 3]
+
+- 클레임은 create_access_token 과 같게 (sub, typ, jti, exp, iat — datetime 포함)
+- 측정 전에 두 HS256 백엔드 토큰이 서로 검증되는지 확인
+- fast 백엔드의 JSON 은 orjson(선택 의존성: pip install .[speedups]) 이 있으면 그걸로
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Tuple
+
+from cryptography.hazmat.primitives import serialization
+
+from app.api.core import jwt_keys
+from app.api.core.security import JWT_BACKENDS
+
+_SECRET = "bench-secret"
+
+
+def _claims() -> Dict[str, object]:
+    now = datetime.now(timezone.utc)
+    return {
+        "sub": "bench@example.com",
+        "typ": "access",
+        "jti": uuid.uuid4().hex,
+        "exp": now + timedelta(minutes=60),
+        "iat": now,
+    }
+
+
+def _rate(fn: Callable[[], object], n: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return n / best
+
+
+def _keyring(alg: str) -> jwt_keys.KeyRing:
+    pem = jwt_keys.generate_private_key_pem(alg)
+    key = jwt_keys.SigningKey(serialization.load_pem_private_key(pem.encode(), password=None))
+    return jwt_keys.KeyRing(key, [])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000, help="측정당 토큰 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    claims = _claims()
+    backends = {name: factory(_SECRET, "HS256") for name, factory in JWT_BACKENDS.items()}
+    for a in backends.values():
+        for b in backends.values():
+            assert b.decode(a.encode(dict(claims)))["jti"] == claims["jti"], f"{a.name} → {b.name} 검증 실패"
+
+    rows: List[Tuple[str, float, float]] = []
+    for name, backend in backends.items():
+        token = backend.encode(dict(claims))
+        rows.append((
+            f"HS256/{name}",
+            # python-jose 는 넘긴 dict 의 datetime 을 제자리에서 바꿈 → 매번 복사 (두 백엔드 같은 조건)
+            _rate(lambda: backend.encode(dict(claims)), args.n, args.repeat),
+            _rate(lambda: backend.decode(token), args.n, args.repeat),
+        ))
+    for alg in jwt_keys.ASYMMETRIC_ALGORITHMS:
+        ring = _keyring(alg)
+        token = ring.encode(claims)
+        header = jwt_keys.read_header(token)
+        n = max(args.n // 10, 1)  # 서명 연산이 무거움
+        rows.append((
+            f"{alg}/keyring",
+            _rate(lambda: ring.encode(dict(claims)), n, args.repeat),
+            _rate(lambda: ring.decode(token, jwt_keys.read_header(token)), n, args.repeat),
+        ))
+        assert ring.decode(token, header)["jti"] == claims["jti"]
+
+    json_lib = "orjson" if jwt_keys.orjson is not None else "json"
+    print(f"n={args.n} repeat={args.repeat} json={json_lib}")
+    print(f"{'path':<16}{'encode/s':>12}{'decode/s':>12}")
+    for name, enc, dec in rows:
+        print(f"{name:<16}{enc:>12.0f}{dec:>12.0f}")
+    base = dict((r[0], r) for r in rows)
+    fast, jose = base.get("HS256/fast"), base.get("HS256/jose")
+    if fast and jose:
+        print(f"fast vs jose: encode {fast[1] / jose[1]:.1f}x, decode {fast[2] / jose[2]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# app/api/scripts/bench_password_hash.py
+"""
+비밀번호 해시 정책 후보별 hash/verify 지연 측정.
+
+    python -m app.api.scripts.bench_password_hash [--repeat 5]
+
+- 후보: bcrypt rounds 10~13, (argon2-cffi 설치 시) argon2 몇 가지 파라미터
+- 결과를 보고 Settings(PASSWORD_SCHEMES / BCRYPT_ROUNDS / ARGON2_*)를 정하면 됨
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.api.core.security import build_password_context
+
+CANDIDATES: list[tuple[str, dict]] = [
+    ("bcrypt rounds=10", {"schemes": ["bcrypt"], "bcrypt_rounds": 10}),
+    ("bcrypt rounds=11", {"schemes": ["bcrypt"], "bcrypt_rounds": 11}),
+    ("bcrypt rounds=12", {"schemes": ["bcrypt"], "bcrypt_rounds": 12}),
+    ("bcrypt rounds=13", {"schemes": ["bcrypt"], "bcrypt_rounds": 13}),
+    ("argon2 t=2 m=19MiB p=1", {"schemes": ["argon2"], "argon2_time_cost": 2,
+                                "argon2_memory_cost": 19456, "argon2_parallelism": 1}),
+    ("argon2 t=3 m=64MiB p=4", {"schemes": ["argon2"], "argon2_time_cost": 3,
+                                "argon2_memory_cost": 65536, "argon2_parallelism": 4}),
+    ("argon2 t=1 m=256MiB p=4", {"schemes": ["argon2"], "argon2_time_cost": 1,
+                                 "argon2_memory_cost": 262144, "argon2_parallelism": 4}),
+]
+
+
+def _ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    password = "P@ssw0rd-benchmark"
+    print(f"{'candidate':<28}{'hash ms':>10}{'verify ms':>12}")
+    for label, opts in CANDIDATES:
+        try:
+            ctx = build_password_context(**opts)
+            hashed = ctx.hash(password)
+        except Exception as e:  # argon2 백엔드 미설치 등
+            print(f"{label:<28}{'skipped':>10}  ({type(e).__name__}: {e})")
+            continue
+        hash_ms = _ms(lambda: ctx.hash(password), args.repeat)
+        verify_ms = _ms(lambda: ctx.verify(password, hashed), args.repeat)
+        print(f"{label:<28}{hash_ms:>10.1f}{verify_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
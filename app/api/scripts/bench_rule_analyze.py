@@ -0,0 +1,83 @@
+# app/api/scripts/bench_rule_analyze.py
+"""
+RuleBasedAI 감정 분석: 한 건씩(analyze) vs 묶음(analyze_many) 처리량 비교.
+
+    python -m app.api.scripts.bench_rule_analyze [--texts 5000] [--words 120] [--batch 256] [--repeat 3]
+
+- 합성 일기(한국어/영어/문장부호/해시태그 섞음)로 측정, 두 결과가 같은지도 확인
+- 묶음은 --batch 개씩 (bulk 분석에서 RuleBasedAI.batch_size 만큼 넘기는 것과 같게)
+- numpy(선택 의존성: pip install .[speedups]) 가 없으면 순수 파이썬 경로로 측정됨
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List
+
+from app.api.services import ai_rules
+from app.api.services.ai_provider import RuleBasedAI
+
+_WORDS = (
+    "오늘 날씨 좋다 행복 산책 친구와 커피 회사에서 짜증 우울 저녁 운동 공부 비 카페 "
+    "#일기 @친구 2025 walk rain good great love bad hate meeting Coffee"
+).split()
+
+
+def _texts(n: int, words: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(
+            rng.choice(_WORDS) + rng.choice(["", "", ".", ",", "!", "~"])
+            for _ in range(rng.randint(words // 2, words * 3 // 2))
+        )
+        for _ in range(n)
+    ]
+
+
+def _best(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return min(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=120, help="일기당 평균 단어 수")
+    parser.add_argument("--batch", type=int, default=RuleBasedAI.batch_size)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ai = RuleBasedAI()
+    texts = _texts(args.texts, args.words)
+
+    async def one_by_one():
+        return [await ai.analyze(t) for t in texts]
+
+    async def batched():
+        out = []
+        for i in range(0, len(texts), args.batch):
+            out += await ai.analyze_many(texts[i:i + args.batch])
+        return out
+
+    assert asyncio.run(one_by_one()) == asyncio.run(batched()), "analyze_many 결과가 analyze 와 다름"
+    single = _best(lambda: asyncio.run(one_by_one()), args.repeat)
+    many = _best(lambda: asyncio.run(batched()), args.repeat)
+
+    backend = "numpy" if ai_rules.np is not None else "pure python"
+    chars = statistics.mean(len(t) for t in texts)
+    print(f"texts={len(texts)} avg_chars={chars:.0f} batch={args.batch} backend={backend}")
+    print(f"{'path':<14}{'seconds':>10}{'texts/s':>12}")
+    print(f"{'analyze':<14}{single:>10.3f}{len(texts) / single:>12.0f}")
+    print(f"{'analyze_many':<14}{many:>10.3f}{len(texts) / many:>12.0f}")
+    print(f"{'speedup':<14}{single / many:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# app/api/scripts/bulk_analyze.py
+"""
+일기 감정 분석 백로그 일괄 처리 (앱 설정의 DB / AI provider 사용).
+
+    python -m app.api.scripts.bulk_analyze [--email a@b.c] [--from 2025-01-01] [--to 2025-12-31]
+                                           [--all] [--limit N] [--chunk 500] [--top-k 5]
+                                           [--concurrency 4]
+
+- 기본은 아직 분석되지 않은(main_emotion 없음) 일기 전체, 사용자 무관
+- --chunk 개씩 선택 → 분석/저장을 반복하고 구간마다 처리량을 출력
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import date
+from typing import Optional
+
+from app.api.db.database import close_db, init_db
+from app.api.models import User
+from app.api.services import ai_provider
+from app.api.services.ai_bulk import bulk_analyze, select_diaries
+
+
+async def _run(
+    email: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    only_unanalyzed: bool,
+    limit: Optional[int],
+    chunk: int,
+    top_k: int,
+    concurrency: Optional[int],
+) -> None:
+    await init_db()
+    try:
+        user_id = None
+        if email:
+            user = await User.get_or_none(email=email)
+            if user is None:
+                raise SystemExit(f"user not found: {email}")
+            user_id = user.id
+
+        provider = ai_provider.ai
+        print(f"provider={provider.name} batch_size={provider.batch_size}")
+        started = time.perf_counter()
+        done = failed = 0
+        after_id = 0
+        while limit is None or done + failed < limit:
+            size = chunk if limit is None else min(chunk, limit - done - failed)
+            # 실패한 일기는 계속 미분석으로 남으므로 id 로 앞으로 진행
+            rows = await select_diaries(
+                user_id, date_from, date_to, only_unanalyzed, limit=size, after_id=after_id
+            )
+            if not rows:
+                break
+            after_id = rows[-1]["id"]
+            report = await bulk_analyze(
+                provider, rows, top_k=top_k, concurrency=concurrency
+            )
+            done += report["analyzed"]
+            failed += report["failed"]
+            print(
+                f"  {report['analyzed']:>6} analyzed {report['failed']:>5} failed "
+                f"{report['seconds']:>8.2f}s {report['diaries_per_second'] or 0:>8.1f} diaries/s"
+            )
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        print(f"total: {done} analyzed, {failed} failed in {elapsed:.2f}s ({rate:.1f} diaries/s)")
+    finally:
+        await close_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", help="이 사용자의 일기만")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    parser.add_argument("--all", action="store_true", help="이미 분석된 일기도 다시")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(_run(
+        args.email, args.date_from, args.date_to, not args.all,
+        args.limit, args.chunk, args.top_k, args.concurrency,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# app/api/scripts/gen_jwt_key.py
+"""
+JWT 서명 키 생성 (ES256 / EdDSA).
+
+    python -m app.api.scripts.gen_jwt_key [--alg EdDSA] [--out jwt_signing.pem]
+
+- 개인키(PEM)는 --out 파일 또는 stdout, 공개키와 kid 는 stderr 로
+- 키 교체: 새 개인키를 JWT_SIGNING_KEY 로, 이전 공개키를 JWT_VERIFICATION_KEYS 에 추가
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+from cryptography.hazmat.primitives import serialization
+
+from app.api.core.jwt_keys import ASYMMETRIC_ALGORITHMS, VerificationKey, generate_private_key_pem, public_key_pem
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alg", choices=ASYMMETRIC_ALGORITHMS, default="EdDSA")
+    parser.add_argument("--out", help="개인키를 쓸 파일 (권한 600)")
+    args = parser.parse_args()
+
+    private_pem = generate_private_key_pem(args.alg)
+    public_pem = public_key_pem(private_pem)
+    kid = VerificationKey(serialization.load_pem_public_key(public_pem.encode())).kid
+    if args.out:
+        fd = os.open(args.out, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(private_pem)
+    else:
+        sys.stdout.write(private_pem)
+    sys.stderr.write(f"alg={args.alg} kid={kid}\n{public_pem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# app/api/scripts/rebuild_diary_stats.py
+"""
+일기 통계 집계(diary_stat)를 diary 원본에서 다시 계산 (앱 설정의 DB 사용).
+
+    python -m app.api.scripts.rebuild_diary_stats [--email a@b.c] [--chunk 1000]
+
+- diary_stat 마이그레이션 직후 기존 일기를 채울 때 / 집계가 어긋났을 때
+- 대상 사용자(기본 전체)의 집계 행을 지우고 일기를 --chunk 개씩 읽어 다시 upsert (한 트랜잭션)
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+from app.api.db.database import close_db, init_db
+from app.api.models import User
+from app.api.repositories.diary_stats_repo import rebuild_stats
+
+
+async def _run(email: Optional[str], chunk: int) -> None:
+    await init_db()
+    try:
+        user_id = None
+        if email:
+            user = await User.get_or_none(email=email)
+            if user is None:
+                raise SystemExit(f"user not found: {email}")
+            user_id = user.id
+        started = time.perf_counter()
+        n = await rebuild_stats(user_id, chunk=chunk)
+        print(f"rebuilt stats from {n} diaries in {time.perf_counter() - started:.2f}s")
+    finally:
+        await close_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", help="이 사용자만")
+    parser.add_argument("--chunk", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.email, args.chunk))
+
+
+if __name__ == "__main__":
+    main()
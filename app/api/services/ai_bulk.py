@@ -0,0 +1,179 @@
+# app/api/services/ai_bulk.py
+"""
+일기 여러 개를 한 번에 감정 분석 (백로그 채우기용).
+
+- 대상: 사용자/기간/아직 분석 안 된 것(main_emotion 없음) 조건으로 선택
+- provider.batch_size 개씩 묶어 analyze_many 한 번 (Gemini 는 프롬프트 하나에 여러 일기)
+  묶음들은 AI_BULK_CONCURRENCY 개까지 동시에 진행. 결과 캐시(ai_cache)는 그대로 사용
+- 저장은 묶음마다 트랜잭션 하나:
+  main_emotion 은 감정별 UPDATE, 키워드는 일괄 해석 + 연결 테이블 DELETE/INSERT 한 번씩
+  (일기당 get_or_create/add 왕복 없음)
+  감정/키워드 통계(diary_stat)도 같은 트랜잭션에서 바뀐 만큼 upsert 한 번
+- 반환: 처리 개수와 처리량(diaries/s)
+
+목록/단건 응답에 main_emotion/키워드는 없으므로 updated_at 은 건드리지 않습니다
+(백로그를 채워도 목록 캐시/ETag 가 흔들리지 않음).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from tortoise.transactions import in_transaction
+
+from app.api.core import metrics
+from app.api.core.config import settings
+from app.api.db.bulk import delete_m2m_rows, insert_m2m_rows
+from app.api.db.routing import PRIMARY
+from app.api.models.diary import Diary
+from app.api.models.emotion import EmotionKeyword
+from app.api.repositories.diary_stats_repo import apply_deltas, contributions, diff, keyword_names
+from app.api.services.ai_cache import cached_analyze_many
+from app.api.services.ai_provider import AIProvider
+
+log = logging.getLogger(__name__)
+
+_analyzed = metrics.counter("ai_bulk.analyzed")
+_failed = metrics.counter("ai_bulk.failed")
+
+
+async def select_diaries(
+    user_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    only_unanalyzed: bool = True,
+    limit: Optional[int] = None,
+    after_id: int = 0,
+) -> List[dict]:
+    """분석 대상 (id, title, content) 행. id 순 (after_id 로 이어서 선택)"""
+    qs = Diary.filter(id__gt=after_id)
+    if user_id is not None:
+        qs = qs.filter(user_id=user_id)
+    if date_from:
+        qs = qs.filter(date__gte=date_from)
+    if date_to:
+        qs = qs.filter(date__lte=date_to)
+    if only_unanalyzed:
+        qs = qs.filter(main_emotion__isnull=True)
+    qs = qs.order_by("id")
+    if limit:
+        qs = qs.limit(limit)
+    return await qs.values("id", "title", "content")
+
+
+async def _keyword_ids(names: Sequence[str], conn) -> Dict[str, int]:
+    """키워드 이름 → id 일괄 해석 (없는 것만 bulk INSERT, 충돌 무시)"""
+    if not names:
+        return {}
+    ids = dict(await EmotionKeyword.filter(name__in=names).using_db(conn).values_list("name", "id"))
+    missing = [n for n in names if n not in ids]
+    if missing:
+        await EmotionKeyword.bulk_create(
+            [EmotionKeyword(name=n) for n in missing], ignore_conflicts=True, using_db=conn
+        )
+        ids.update(
+            await EmotionKeyword.filter(name__in=missing).using_db(conn).values_list("name", "id")
+        )
+    return ids
+
+
+async def save_analyses(
+    results: Sequence[Tuple[int, str, List[str]]], top_k: int = 5, overwrite: bool = True
+) -> None:
+    """(diary_id, emotion, keywords) 여러 건 저장. analyze_diary 와 같은 top_k/overwrite 규칙"""
+    if not results:
+        return
+    by_emotion: Dict[str, List[int]] = defaultdict(list)
+    for diary_id, emotion, _ in results:
+        by_emotion[emotion].append(diary_id)
+    names = list(dict.fromkeys(str(k) for _, _, kws in results for k in kws[:top_k] if k))
+    diary_ids = [diary_id for diary_id, _, _ in results]
+
+    async with in_transaction(PRIMARY) as conn:
+        # 통계용 이전 상태 (감정/키워드 바꾸기 전에)
+        prev = {
+            r["id"]: r
+            for r in await Diary.filter(id__in=diary_ids)
+            .using_db(conn)
+            .values("id", "user_id", "date", "main_emotion")
+        }
+        prev_names = await keyword_names(diary_ids, using_db=conn)
+
+        for emotion, ids in by_emotion.items():
+            await Diary.filter(id__in=ids).using_db(conn).update(main_emotion=emotion)
+
+        ids_by_name = await _keyword_ids(names, conn)
+        if overwrite:
+            await delete_m2m_rows(Diary, "emotion_keywords", diary_ids, using_db=conn)
+
+        pairs = []
+        deltas: Dict[int, Counter] = defaultdict(Counter)
+        for diary_id, emotion, kws in results:
+            linked = [] if overwrite else list(prev_names.get(diary_id, ()))
+            seen = set(linked)
+            for name in kws[:top_k]:
+                name = str(name)
+                kw_id = ids_by_name.get(name)
+                if kw_id is not None and name not in seen:
+                    seen.add(name)
+                    linked.append(name)
+                    pairs.append((diary_id, kw_id))
+            row = prev.get(diary_id)
+            if row is not None:
+                old_kws = prev_names.get(diary_id, ())
+                before = contributions(row["date"], emotion=row["main_emotion"], keywords=old_kws)
+                after = contributions(row["date"], emotion=emotion, keywords=linked)
+                deltas[row["user_id"]].update(diff(before, after))
+        await insert_m2m_rows(Diary, "emotion_keywords", pairs, using_db=conn)
+        await apply_deltas(deltas, using_db=conn)
+
+
+async def bulk_analyze(
+    provider: AIProvider,
+    diaries: Sequence[dict],
+    top_k: int = 5,
+    overwrite: bool = True,
+    concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """select_diaries 의 행들을 분석/저장. 실패한 묶음은 건너뛰고 개수만 보고"""
+    started = time.perf_counter()
+    size = max(int(getattr(provider, "batch_size", 1) or 1), 1)
+    chunks = [diaries[i:i + size] for i in range(0, len(diaries), size)]
+    sem = asyncio.Semaphore(max(int(concurrency or settings.AI_BULK_CONCURRENCY), 1))
+    counts = {"analyzed": 0, "failed": 0}
+
+    async def _one(chunk: Sequence[dict]) -> None:
+        texts = [f"{d['title']}\n{d['content'] or ''}" for d in chunk]
+        try:
+            async with sem:
+                analyses = await cached_analyze_many(provider, texts)
+            await save_analyses(
+                [(d["id"], emo, kws) for d, (emo, kws) in zip(chunk, analyses)],
+                top_k=top_k,
+                overwrite=overwrite,
+            )
+        except Exception as e:
+            counts["failed"] += len(chunk)
+            _failed.inc(len(chunk))
+            log.warning("bulk analyze chunk of %s failed: %s", len(chunk), e)
+            return
+        counts["analyzed"] += len(chunk)
+        _analyzed.inc(len(chunk))
+
+    await asyncio.gather(*(_one(c) for c in chunks))
+    seconds = time.perf_counter() - started
+    return {
+        "selected": len(diaries),
+        "analyzed": counts["analyzed"],
+        "failed": counts["failed"],
+        "batches": len(chunks),
+        "seconds": round(seconds, 3),
+        "diaries_per_second": round(counts["analyzed"] / seconds, 1) if seconds > 0 else None,
+    }
+
+
+__all__ = ["select_diaries", "save_analyses", "bulk_analyze"]
@@ -0,0 +1,167 @@
+# app/api/services/ai_cache.py
+"""
+AI 요약/분석 결과 캐시 (내용 주소 방식).
+
+키 = sha256(종류, provider.name, provider.prompt_version, 입력 텍스트, 파라미터)
+- 1단: 프로세스 메모리 LRU (TTLCache)
+- 2단: DB ai_result 테이블 (재시작/다른 워커와 공유, 결과는 불변이라 만료 없음)
+- 둘 다 없을 때만 provider 호출, 결과(dict)를 두 단에 모두 기록
+
+빈 결과는 일시 장애/파싱 실패의 대체값일 수 있어 저장하지 않습니다
+(요약 "", 키워드 없는 분석). 한 번 저장하면 만료가 없으므로 다음 호출에서 다시 시도.
+provider 체인이 폴백으로 만든 결과(ai_chain.degraded())도 같은 이유로 저장하지 않습니다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
+
+from tortoise.exceptions import IntegrityError
+
+from app.api.core import metrics
+from app.api.core.cache import TTLCache
+from app.api.core.config import settings
+from app.api.models.ai_result import AIResult
+from app.api.services.ai_chain import degraded
+from app.api.services.ai_provider import AIProvider
+
+log = logging.getLogger(__name__)
+
+_memory: TTLCache[dict] = TTLCache(
+    "ai.result_cache", maxsize=settings.AI_CACHE_SIZE, ttl=settings.AI_CACHE_TTL_SECONDS
+)
+_db_hits = metrics.counter("ai.result_cache.db_hit")
+_provider_calls = metrics.counter("ai.provider_calls")
+
+
+def result_key(kind: str, provider: AIProvider, *parts: Any) -> str:
+    raw = json.dumps(
+        [kind, provider.name, provider.prompt_version, *parts],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def _lookup(key: str) -> Optional[dict]:
+    value = _memory.get(key)
+    if value is not None:
+        return value
+    if not settings.AI_CACHE_DB_ENABLED:
+        return None
+    row = await AIResult.get_or_none(key=key)
+    if row is None:
+        return None
+    _db_hits.inc()
+    _memory.set(key, row.payload)
+    return row.payload
+
+
+async def _store(key: str, kind: str, provider: AIProvider, payload: dict) -> None:
+    _memory.set(key, payload)
+    if not settings.AI_CACHE_DB_ENABLED:
+        return
+    try:
+        await AIResult.create(key=key, kind=kind, provider=provider.name[:64], payload=payload)
+    except IntegrityError:
+        pass  # 다른 요청/워커가 먼저 저장 (같은 키 = 같은 입력)
+    except Exception:
+        log.exception("ai result not persisted")
+
+
+async def cached_summarize(
+    provider: AIProvider, title: str, content: str, max_sentences: int = 2
+) -> str:
+    key = result_key("summary", provider, title, content, max_sentences)
+    hit = await _lookup(key)
+    if hit is not None:
+        return hit["summary"]
+    _provider_calls.inc()
+    summary = await provider.summarize(title, content, max_sentences=max_sentences)
+    if summary and not degraded():
+        await _store(key, "summary", provider, {"summary": summary})
+    return summary
+
+
+async def cached_summarize_stream(
+    provider: AIProvider, title: str, content: str, max_sentences: int = 2
+) -> AsyncIterator[str]:
+    """cached_summarize 의 스트리밍 버전: 캐시에 있으면 한 조각, 없으면 provider 조각을 그대로 흘리고
+    끝까지 받았을 때만 저장 (중간에 끊기면 저장 안 함)"""
+    key = result_key("summary", provider, title, content, max_sentences)
+    hit = await _lookup(key)
+    if hit is not None:
+        yield hit["summary"]
+        return
+    _provider_calls.inc()
+    pieces: List[str] = []
+    async for piece in provider.summarize_stream(title, content, max_sentences=max_sentences):
+        pieces.append(piece)
+        yield piece
+    # summarize 와 같은 값으로 저장 (Gemini 는 응답을 strip)
+    summary = "".join(pieces).strip()
+    if summary and not degraded():
+        await _store(key, "summary", provider, {"summary": summary})
+
+
+async def cached_analyze(provider: AIProvider, text: str) -> Tuple[str, List[str]]:
+    """(emotion, keywords). top_k 자르기는 호출부에서 (provider 결과는 top_k와 무관)"""
+    key = result_key("analysis", provider, text)
+    hit = await _lookup(key)
+    if hit is not None:
+        return hit["emotion"], list(hit["keywords"])
+    _provider_calls.inc()
+    emotion, keywords = await provider.analyze(text)
+    if emotion and keywords and not degraded():
+        await _store(key, "analysis", provider, {"emotion": emotion, "keywords": list(keywords)})
+    return emotion, keywords
+
+
+async def cached_analyze_many(
+    provider: AIProvider, texts: Sequence[str]
+) -> List[Tuple[str, List[str]]]:
+    """
+    cached_analyze 의 묶음 버전: 캐시 조회(DB 는 IN 한 번) → 없는 것만 provider.analyze_many
+    한 번 → 저장(bulk INSERT 한 번). 결과는 texts 순서.
+    """
+    keys = [result_key("analysis", provider, t) for t in texts]
+    found: dict[str, dict] = {}
+    for k in keys:
+        if (v := _memory.get(k)) is not None:
+            found[k] = v
+    missing = [k for k in dict.fromkeys(keys) if k not in found]
+    if missing and settings.AI_CACHE_DB_ENABLED:
+        for row in await AIResult.filter(key__in=missing):
+            found[row.key] = row.payload
+            _memory.set(row.key, row.payload)
+            _db_hits.inc()
+
+    todo = {k: t for k, t in zip(keys, texts) if k not in found}
+    if todo:
+        _provider_calls.inc()
+        results = await provider.analyze_many(list(todo.values()))
+        keep = not degraded()
+        fresh = []
+        for k, (emotion, keywords) in zip(todo, results):
+            payload = {"emotion": emotion, "keywords": list(keywords)}
+            found[k] = payload
+            if keep and emotion and keywords:
+                _memory.set(k, payload)
+                fresh.append(AIResult(key=k, kind="analysis", provider=provider.name[:64], payload=payload))
+        if fresh and settings.AI_CACHE_DB_ENABLED:
+            try:
+                await AIResult.bulk_create(fresh, ignore_conflicts=True)
+            except Exception:
+                log.exception("ai results not persisted")
+    return [(found[k]["emotion"], list(found[k]["keywords"])) for k in keys]
+
+
+__all__ = [
+    "result_key",
+    "cached_summarize",
+    "cached_summarize_stream",
+    "cached_analyze",
+    "cached_analyze_many",
+]
@@ -0,0 +1,248 @@
+# app/api/services/ai_chain.py
+"""
+AI provider 체인: 앞 provider 가 실패/느리면 다음 provider 로 (마지막은 보통 RuleBasedAI).
+
+- 호출 전체에 마감(AI_CALL_DEADLINE_SECONDS). 앞 provider 는 남은 시간 안에 못 끝내면 취소하고 다음으로
+  마지막 provider 는 로컬 폴백이라 마감과 무관하게 실행
+- provider 마다 서킷 브레이커
+  · 연속 AI_BREAKER_FAILURES 번 실패(예외/타임아웃/AI_SLOW_CALL_SECONDS 초과) → open: 호출하지 않고 바로 다음으로
+  · AI_BREAKER_RESET_SECONDS 뒤 half-open: 한 번만 시험 호출, 성공하면 closed / 실패하면 다시 open
+- 메트릭 (provider 이름별, 예: ai.provider.gemini-1.5-flash.*)
+  latency_ms(성공) / error_latency_ms(실패) 히스토그램, errors / timeouts / short_circuited,
+  circuit(0 closed, 1 open, 2 half-open), ai.chain.fallbacks
+
+스트리밍(summarize_stream): 마감은 첫 조각까지만. 첫 조각이 나간 뒤엔 이미 클라이언트로 보냈으므로
+다음 provider 로 넘어가지 않고 오류를 그대로 올림
+
+폴백으로 만든 결과는 degraded() 가 True → ai_cache 가 영구 저장하지 않음
+(같은 내용이 다음엔 본 provider 결과로 채워지도록).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from app.api.core import metrics
+from app.api.core.config import settings
+
+if TYPE_CHECKING:
+    from app.api.services.ai_provider import AIProvider
+
+log = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+# 이 태스크에서 마지막으로 끝난 체인 호출이 폴백 결과였는지
+_degraded: ContextVar[bool] = ContextVar("ai_degraded", default=False)
+
+_fallbacks = metrics.counter("ai.chain.fallbacks")
+
+
+def degraded() -> bool:
+    return _degraded.get()
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failures: int, reset_seconds: float) -> None:
+        self.name = name
+        self.failures = max(int(failures), 1)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._trial = False
+        metrics.gauge(f"ai.provider.{name}.circuit", lambda: self.state)
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            self._trial = False
+        if self.state == HALF_OPEN and not self._trial:
+            self._trial = True  # 시험 호출은 하나만
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._consecutive = 0
+        if self.state != CLOSED:
+            log.info("ai provider %s circuit closed", self.name)
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self._consecutive += 1
+        if self.state == HALF_OPEN or self._consecutive >= self.failures:
+            if self.state != OPEN:
+                log.warning("ai provider %s circuit open", self.name)
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+
+class _Meters:
+    def __init__(self, name: str) -> None:
+        prefix = f"ai.provider.{name}"
+        self.latency = metrics.histogram(f"{prefix}.latency_ms")
+        self.error_latency = metrics.histogram(f"{prefix}.error_latency_ms")
+        self.errors = metrics.counter(f"{prefix}.errors")
+        self.timeouts = metrics.counter(f"{prefix}.timeouts")
+        self.short_circuited = metrics.counter(f"{prefix}.short_circuited")
+
+
+class ProviderChain:
+    """AIProvider 와 같은 인터페이스. name/prompt_version/batch_size 는 첫 provider 것"""
+
+    def __init__(
+        self,
+        providers: Sequence["AIProvider"],
+        deadline: Optional[float] = None,
+        slow_call: Optional[float] = None,
+        breaker_failures: Optional[int] = None,
+        breaker_reset_seconds: Optional[float] = None,
+    ) -> None:
+        if not providers:
+            raise ValueError("provider chain needs at least one provider")
+        self.providers = list(providers)
+        primary = self.providers[0]
+        self.name = primary.name
+        self.prompt_version = primary.prompt_version
+        self.batch_size = getattr(primary, "batch_size", 1)
+        self.deadline = deadline if deadline is not None else settings.AI_CALL_DEADLINE_SECONDS
+        self.slow_call = slow_call if slow_call is not None else settings.AI_SLOW_CALL_SECONDS
+        failures = breaker_failures or settings.AI_BREAKER_FAILURES
+        reset = breaker_reset_seconds if breaker_reset_seconds is not None else settings.AI_BREAKER_RESET_SECONDS
+        self.breakers = [CircuitBreaker(p.name, failures, reset) for p in self.providers[:-1]]
+        self._meters = [_Meters(p.name) for p in self.providers]
+
+    async def aclose(self) -> None:
+        for p in self.providers:
+            aclose = getattr(p, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _call(self, op: Callable[["AIProvider"], Awaitable[Any]]) -> Any:
+        _degraded.set(False)
+        loop = asyncio.get_running_loop()
+        until = loop.time() + self.deadline
+        last = len(self.providers) - 1
+        error: Optional[BaseException] = None
+        for i, provider in enumerate(self.providers):
+            meters = self._meters[i]
+            if i == last:
+                if i > 0:
+                    _fallbacks.inc()
+                    _degraded.set(True)
+                started = time.perf_counter()
+                try:
+                    result = await op(provider)
+                except Exception:
+                    meters.errors.inc()
+                    meters.error_latency.observe((time.perf_counter() - started) * 1000)
+                    raise
+                meters.latency.observe((time.perf_counter() - started) * 1000)
+                return result
+
+            breaker = self.breakers[i]
+            if not breaker.allow():
+                meters.short_circuited.inc()
+                continue
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(op(provider), max(until - loop.time(), 0.001))
+            except asyncio.TimeoutError as e:
+                meters.timeouts.inc()
+                error = e
+            except Exception as e:
+                meters.errors.inc()
+                error = e
+            else:
+                elapsed = time.perf_counter() - started
+                meters.latency.observe(elapsed * 1000)
+                # 결과는 쓰되, 느린 호출은 실패로 셈 (계속 느리면 브레이커가 열림)
+                if elapsed > self.slow_call:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                return result
+            meters.error_latency.observe((time.perf_counter() - started) * 1000)
+            breaker.record_failure()
+            log.warning("ai provider %s failed: %r", provider.name, error)
+        raise RuntimeError("no ai provider available") from error
+
+    async def summarize(self, title: str, content: str, max_sentences: int = 2) -> str:
+        return await self._call(lambda p: p.summarize(title, content, max_sentences=max_sentences))
+
+    async def analyze(self, text: str) -> Tuple[str, List[str]]:
+        return await self._call(lambda p: p.analyze(text))
+
+    async def analyze_many(self, texts: Sequence[str]) -> List[Tuple[str, List[str]]]:
+        return await self._call(lambda p: p.analyze_many(texts))
+
+    async def summarize_stream(
+        self, title: str, content: str, max_sentences: int = 2
+    ) -> AsyncIterator[str]:
+        _degraded.set(False)
+        until = asyncio.get_running_loop().time() + self.deadline
+        last = len(self.providers) - 1
+        error: Optional[BaseException] = None
+        for i, provider in enumerate(self.providers):
+            meters = self._meters[i]
+            breaker = self.breakers[i] if i < last else None
+            if breaker is not None and not breaker.allow():
+                meters.short_circuited.inc()
+                continue
+            if i == last and i > 0:
+                _fallbacks.inc()
+                _degraded.set(True)
+            stream = provider.summarize_stream(title, content, max_sentences=max_sentences)
+            started = time.perf_counter()
+            first: Optional[str] = None
+            try:
+                if breaker is None:
+                    first = await anext(stream, None)
+                else:
+                    async with asyncio.timeout_at(until):
+                        first = await anext(stream, None)
+            except TimeoutError as e:
+                meters.timeouts.inc()
+                error = e
+            except Exception as e:
+                meters.errors.inc()
+                error = e
+            else:
+                # 지연/느림 판정은 첫 조각까지 시간 (생성 길이에 따라 전체 시간은 원래 제각각)
+                first_ms = (time.perf_counter() - started) * 1000
+                # 첫 조각 이후: 폴백 없음 (오류면 실패로 세고 그대로 올림)
+                try:
+                    if first is not None:
+                        yield first
+                        async for piece in stream:
+                            yield piece
+                except Exception:
+                    meters.errors.inc()
+                    meters.error_latency.observe((time.perf_counter() - started) * 1000)
+                    if breaker is not None:
+                        breaker.record_failure()
+                    raise
+                finally:
+                    await stream.aclose()
+                meters.latency.observe(first_ms)
+                if breaker is not None:
+                    if first_ms > self.slow_call * 1000:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                return
+            await stream.aclose()
+            meters.error_latency.observe((time.perf_counter() - started) * 1000)
+            if breaker is None:
+                raise error
+            breaker.record_failure()
+            log.warning("ai provider %s stream failed: %r", provider.name, error)
+        raise RuntimeError("no ai provider available") from error
+
+
+__all__ = ["CircuitBreaker", "ProviderChain", "degraded", "CLOSED", "OPEN", "HALF_OPEN"]
@@ -0,0 +1,97 @@
+# app/api/services/ai_enrich.py
+"""
+AI 결과를 Diary 에 반영 (동기 엔드포인트와 백그라운드 작업이 공유).
+
+- summarize: ai_summary 저장 (summarize_diary_stream: 조각을 흘려보내고 끝나면 저장)
+- analyze  : main_emotion 저장 + emotion_keywords 교체/병합 (top_k 개까지)
+provider 호출은 ai_cache 를 거치므로 같은 내용이면 재호출하지 않습니다.
+save 가 updated_at 을 올리므로 diary 레포의 쓰기와 같이 같은 트랜잭션에서 목록 캐시 버전 +1, 쓰기 표시.
+analyze 는 감정/키워드 통계(diary_stat)도 바뀐 만큼 반영.
+"""
+from __future__ import annotations
+
+from typing import AsyncIterator, List
+
+from tortoise.transactions import in_transaction
+
+from app.api.db.routing import PRIMARY, mark_write
+from app.api.models.diary import Diary
+from app.api.models.emotion import EmotionKeyword
+from app.api.repositories.diary_repo import bump_diary_version
+from app.api.repositories.diary_stats_repo import apply_deltas, contributions, diff, keyword_names
+from app.api.services.ai_cache import cached_analyze, cached_summarize, cached_summarize_stream
+from app.api.services.ai_provider import AIProvider
+
+
+async def _save_summary(diary: Diary) -> None:
+    async with in_transaction(PRIMARY) as conn:
+        await diary.save(using_db=conn)
+        await bump_diary_version(diary.user_id, conn)
+    mark_write(diary.user_id)
+
+
+async def summarize_diary(provider: AIProvider, diary: Diary, max_sentences: int = 2) -> Diary:
+    diary.ai_summary = await cached_summarize(
+        provider, diary.title or "", diary.content or "", max_sentences
+    )
+    await _save_summary(diary)
+    return diary
+
+
+async def summarize_diary_stream(
+    provider: AIProvider, diary: Diary, max_sentences: int = 2
+) -> AsyncIterator[str]:
+    """요약 조각을 생성되는 대로 yield. 스트림이 끝까지 가면 ai_summary 저장 (중간에 끊기면 저장 안 함)"""
+    pieces: List[str] = []
+    async for piece in cached_summarize_stream(
+        provider, diary.title or "", diary.content or "", max_sentences
+    ):
+        pieces.append(piece)
+        yield piece
+    diary.ai_summary = "".join(pieces).strip()
+    await _save_summary(diary)
+
+
+async def analyze_diary(
+    provider: AIProvider, diary: Diary, top_k: int = 5, overwrite: bool = True
+) -> Diary:
+    """
+    provider 호출은 트랜잭션 밖에서, 저장은 한 트랜잭션에서:
+    일기 행을 잠그고(select_for_update) 다시 읽은 현재 감정/키워드 기준으로 교체/병합 + 통계 반영.
+    (동시에 도는 analyze/수정과 섞여도 통계가 실제 연결과 어긋나지 않게)
+    반환: 저장된 일기 (인자로 받은 객체가 아니라 다시 읽은 것)
+    """
+    # 1) AI 분석
+    emotion, keywords = await cached_analyze(provider, f"{diary.title}\n{diary.content or ''}")
+
+    async with in_transaction(PRIMARY) as conn:
+        locked = await Diary.filter(id=diary.id).using_db(conn).select_for_update().get()
+        old_emotion = locked.main_emotion
+        old_names = (await keyword_names([locked.id], using_db=conn)).get(locked.id, [])
+        locked.main_emotion = emotion
+        await locked.save(using_db=conn)
+
+        # 2) 키워드 저장 로직
+        if overwrite:
+            await locked.emotion_keywords.clear(using_db=conn)
+
+        # 기존 키워드와 병합(중복 제거) + top_k 제한
+        existing = set(old_names) if not overwrite else set()
+        names = [] if overwrite else list(old_names)
+        for kw in (keywords or [])[:top_k]:
+            if kw and kw not in existing:
+                ek, _ = await EmotionKeyword.get_or_create(name=str(kw), using_db=conn)
+                await locked.emotion_keywords.add(ek, using_db=conn)
+                existing.add(kw)
+                names.append(str(kw))
+
+        # 3) 통계: 같은 날짜 안에서 감정/키워드만 바뀜
+        before = contributions(locked.date, emotion=old_emotion, keywords=old_names)
+        after = contributions(locked.date, emotion=emotion, keywords=names)
+        await apply_deltas({locked.user_id: diff(before, after)}, using_db=conn)
+        await bump_diary_version(locked.user_id, conn)
+    mark_write(locked.user_id)
+    return locked
+
+
+__all__ = ["summarize_diary", "summarize_diary_stream", "analyze_diary"]
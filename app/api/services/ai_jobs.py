@@ -0,0 +1,292 @@
+# app/api/services/ai_jobs.py
+"""
+AI 요약/분석 백그라운드 작업 큐 (DB 테이블 ai_job, 외부 브로커 없음).
+
+- enqueue(): 작업 행 INSERT 후 같은 프로세스 워커를 깨움. 같은 일기·종류의
+  대기/실행 중 작업이 있으면 그 작업을 그대로 돌려줌 (중복 호출 방지)
+  · 일기·종류당 대기/실행 중 작업 1개는 부분 유니크 인덱스(uid_ai_job_active)가 보장
+    → 동시에 들어온 요청은 INSERT 충돌 후 먼저 들어간 작업을 돌려받음
+  · 대기 중 작업에 다른 params 로 다시 요청하면 params 를 새 값으로 (실행 중이면 그대로)
+- 워커(앱 startup 에서 시작): 실행 가능한 작업을 AI_JOB_CONCURRENCY 개까지 동시에 처리
+  · 선점은 `UPDATE ... WHERE id=? AND status='queued'` 조건부 갱신 → 여러 워커/프로세스여도 한 번만 실행
+  · 실패하면 지수 backoff(+지터) 후 재시도, max_attempts 넘으면 failed
+  · running 상태로 AI_JOB_LEASE_SECONDS 넘게 남은 작업(워커 중단)은 다시 queued
+- 상태 조회: job_status()
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Set
+
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+
+from app.api.core import metrics
+from app.api.core.config import settings
+from app.api.models.ai_job import AIJob
+from app.api.models.diary import Diary
+from app.api.models.user import User
+from app.api.services import ai_provider
+from app.api.services.ai_enrich import analyze_diary, summarize_diary
+
+log = logging.getLogger(__name__)
+
+KINDS = {"summarize", "analyze"}
+_ACTIVE = ("queued", "running")
+
+_enqueued = metrics.counter("ai_jobs.enqueued")
+_succeeded = metrics.counter("ai_jobs.succeeded")
+_failed = metrics.counter("ai_jobs.failed")
+_retried = metrics.counter("ai_jobs.retried")
+_reclaimed = metrics.counter("ai_jobs.reclaimed")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """attempts 번 실패 후 대기: base * 2^(n-1), 상한 적용, ±20% 지터"""
+    base = settings.AI_JOB_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return min(base, settings.AI_JOB_BACKOFF_MAX_SECONDS) * random.uniform(0.8, 1.2)
+
+
+async def enqueue(user: User, diary: Diary, kind: str, params: Optional[dict] = None) -> AIJob:
+    if kind not in KINDS:
+        raise ValueError(f"unknown job kind: {kind}")
+    params = params or {}
+    # 충돌 → 상대 작업이 그 사이 끝났으면 다시 INSERT (몇 번이면 충분)
+    for _ in range(3):
+        existing = await AIJob.filter(diary_id=diary.id, kind=kind, status__in=_ACTIVE).first()
+        if existing is not None:
+            return await _reuse(existing, params)
+        try:
+            job = await AIJob.create(
+                user=user,
+                diary=diary,
+                kind=kind,
+                params=params,
+                max_attempts=settings.AI_JOB_MAX_ATTEMPTS,
+                run_after=_now(),
+            )
+        except IntegrityError:
+            continue  # 동시에 들어온 요청이 먼저 등록
+        _enqueued.inc()
+        if _worker is not None:
+            _worker.wake()
+        return job
+    raise RuntimeError(f"could not enqueue {kind} job for diary {diary.id}")
+
+
+async def _reuse(job: AIJob, params: dict) -> AIJob:
+    """이미 있는 작업 반환. 아직 대기 중이면 params 만 새 요청 값으로 (조건부 갱신: 선점됐으면 그대로)"""
+    if job.params != params and job.status == "queued":
+        if await AIJob.filter(id=job.id, status="queued").update(params=params):
+            job.params = params
+    return job
+
+
+def job_status(job: AIJob) -> dict[str, Any]:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "diary_id": job.diary_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "last_error": job.last_error,
+        "result": job.result,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at,
+    }
+
+
+async def get_job_for_user(user: User, job_id: int) -> Optional[AIJob]:
+    return await AIJob.get_or_none(id=job_id, user=user)
+
+
+# ---------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------
+async def _execute(job: AIJob) -> dict[str, Any]:
+    diary = await Diary.get(id=job.diary_id)
+    provider = ai_provider.ai
+    if job.kind == "summarize":
+        await summarize_diary(provider, diary, int(job.params.get("max_sentences", 2)))
+        return {"ai_summary": diary.ai_summary}
+    diary = await analyze_diary(
+        provider,
+        diary,
+        top_k=int(job.params.get("top_k", 5)),
+        overwrite=bool(job.params.get("overwrite", True)),
+    )
+    await diary.fetch_related("emotion_keywords")
+    return {
+        "main_emotion": diary.main_emotion,
+        "emotion_keywords": [ek.name for ek in diary.emotion_keywords],
+    }
+
+
+async def run_job(job_id: int) -> None:
+    """선점된(running) 작업 1건 실행 → succeeded / 재시도 queued / failed"""
+    job = await AIJob.get(id=job_id)
+    try:
+        result = await _execute(job)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"[:1000]
+        if job.attempts >= job.max_attempts:
+            _failed.inc()
+            await AIJob.filter(id=job_id).update(
+                status="failed", last_error=error, finished_at=_now(), locked_at=None, updated_at=_now()
+            )
+        else:
+            _retried.inc()
+            await AIJob.filter(id=job_id).update(
+                status="queued",
+                last_error=error,
+                run_after=_now() + timedelta(seconds=backoff_seconds(job.attempts)),
+                locked_at=None,
+                updated_at=_now(),
+            )
+        log.warning("ai job %s attempt %s failed: %s", job_id, job.attempts, error)
+        return
+    _succeeded.inc()
+    await AIJob.filter(id=job_id).update(
+        status="succeeded",
+        result=result,
+        last_error=None,
+        finished_at=_now(),
+        locked_at=None,
+        updated_at=_now(),
+    )
+
+
+async def claim(job_id: int) -> bool:
+    """queued → running 조건부 갱신. 다른 워커가 먼저 가져갔으면 False"""
+    updated = await AIJob.filter(id=job_id, status="queued").update(
+        status="running", locked_at=_now(), attempts=F("attempts") + 1, updated_at=_now()
+    )
+    return bool(updated)
+
+
+async def reclaim_expired() -> int:
+    """lease 만료된 running 작업을 다시 queued 로"""
+    cutoff = _now() - timedelta(seconds=settings.AI_JOB_LEASE_SECONDS)
+    n = await AIJob.filter(status="running", locked_at__lt=cutoff).update(
+        status="queued", locked_at=None, run_after=_now(), updated_at=_now()
+    )
+    if n:
+        _reclaimed.inc(n)
+    return n
+
+
+class JobWorker:
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = max(int(concurrency), 1)
+        self._running: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        metrics.gauge("ai_jobs.running", lambda: len(self._running))
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+        for t in list(self._running):
+            t.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _loop(self) -> None:
+        next_reclaim = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if loop.time() >= next_reclaim:
+                    await reclaim_expired()
+                    next_reclaim = loop.time() + settings.AI_JOB_LEASE_SECONDS / 2
+                await self._fill()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("ai job poll failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.AI_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _fill(self) -> None:
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return
+        due = await (
+            AIJob.filter(status="queued", run_after__lte=_now())
+            .order_by("run_after", "id")
+            .limit(free)
+            .values_list("id", flat=True)
+        )
+        for job_id in due:
+            if await claim(job_id):
+                task = asyncio.create_task(self._run(job_id))
+                self._running.add(task)
+
+    async def _run(self, job_id: int) -> None:
+        try:
+            await run_job(job_id)
+        except asyncio.CancelledError:
+            # 종료 중: 다음 기동 때 바로 다시 실행되도록 되돌림 (attempts 는 이미 +1)
+            try:
+                await AIJob.filter(id=job_id, status="running").update(
+                    status="queued", locked_at=None, updated_at=_now()
+                )
+            except Exception:
+                pass
+            raise
+        except Exception:
+            log.exception("ai job %s crashed", job_id)
+        finally:
+            self._running.discard(asyncio.current_task())
+            self._wake.set()
+
+
+_worker: Optional[JobWorker] = None
+
+
+async def start_worker() -> None:
+    global _worker
+    if not settings.AI_JOB_WORKER_ENABLED or _worker is not None:
+        return
+    _worker = JobWorker(settings.AI_JOB_CONCURRENCY)
+    _worker.start()
+
+
+async def stop_worker() -> None:
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+__all__ = [
+    "enqueue",
+    "job_status",
+    "get_job_for_user",
+    "run_job",
+    "claim",
+    "reclaim_expired",
+    "backoff_seconds",
+    "start_worker",
+    "stop_worker",
+]
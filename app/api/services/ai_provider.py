@@ -1,30 +1,60 @@
 # app/api/services/ai_provider.py
 from __future__ import annotations
+import asyncio
 import os, json, re
-from typing import Protocol, Tuple, List, Any
+from typing import Protocol, Sequence, Tuple, List, Any, AsyncIterator, Dict, Optional
 from collections import Counter
-import anyio
 
-try:
-    import google.generativeai as genai
-except Exception:
-    genai = None  # 미설치 대비
+import httpx
+
+from app.api.core import metrics
+from app.api.core.config import settings
+from app.api.services.ai_chain import ProviderChain
+from app.api.services.ai_rules import Lexicon
 
 # ---- 인터페이스 --------------------------------------------------------------
 class AIProvider(Protocol):
+    # 결과 캐시 키에 들어감: 모델이나 프롬프트가 바뀌면 이전 결과를 쓰지 않도록
+    name: str
+    prompt_version: str
+    # analyze_many 한 번에 넘길 텍스트 수 (프롬프트 하나에 여러 일기를 묶을 수 있는 만큼)
+    batch_size: int = 1
+
     async def summarize(self, title: str, content: str, max_sentences: int = 2) -> str: ...
     async def analyze(self, text: str) -> Tuple[str, List[str]]: ...
 
+    async def analyze_many(self, texts: Sequence[str]) -> List[Tuple[str, List[str]]]:
+        """texts 순서대로 analyze 결과. 기본은 한 건씩 (묶어 보낼 수 있는 provider 가 재정의)"""
+        return [await self.analyze(t) for t in texts]
+
+    async def summarize_stream(
+        self, title: str, content: str, max_sentences: int = 2
+    ) -> AsyncIterator[str]:
+        """요약을 생성되는 대로 조각(str)으로. 이어 붙이면 요약 전체. 기본은 summarize 결과 한 번"""
+        yield await self.summarize(title, content, max_sentences=max_sentences)
+
 # ---- Rule-based 폴백(키 없거나 에러 시) --------------------------------------
 class RuleBasedAI(AIProvider):
+    name = "rule-based"
+    prompt_version = "1"
+    batch_size = 256
+
     POS = {"좋다","행복","기쁨","즐거","멋지","사랑","행운","훌륭","awesome","great","good","love"}
     NEG = {"나쁘","화남","짜증","우울","불안","실망","슬픔","싫다","terrible","bad","hate"}
+    # analyze_many 용: POS/NEG 로 한 번 만들어 둔 사전
+    _lexicon = Lexicon(POS, NEG)
 
     async def summarize(self, title: str, content: str, max_sentences: int = 2) -> str:
         text = f"{title}. {content}".strip()
         sents = re.split(r"(?<=[.!?。！？])\s+", text)
         return " ".join(sents[:max_sentences])[:400]
 
+    async def summarize_stream(self, title: str, content: str, max_sentences: int = 2):
+        # 테스트/폴백용: summarize 결과를 단어 단위 조각으로 (공백 포함해서 이어 붙이면 원문)
+        summary = await self.summarize(title, content, max_sentences=max_sentences)
+        for piece in re.findall(r"\S+\s*", summary):
+            yield piece
+
     async def analyze(self, text: str):
         words = re.findall(r"[A-Za-z가-힣0-9#@]+", text.lower())
         cnt = Counter(w for w in words if len(w) > 1)
@@ -33,53 +63,154 @@ class RuleBasedAI(AIProvider):
         keywords = [w for w, _ in cnt.most_common(3)]
         return emo, keywords
 
+    async def analyze_many(self, texts: Sequence[str]) -> List[Tuple[str, List[str]]]:
+        """analyze 를 한 건씩 부른 것과 같은 결과. 묶음 전체를 한 번에 (services/ai_rules.py)"""
+        return self._lexicon.analyze_many(texts)
+
 # ---- Gemini 구현 ------------------------------------------------------------
+#  - REST(generateContent)를 httpx.AsyncClient 로 직접 호출: 스레드풀을 쓰지 않고,
+#    keep-alive 커넥션을 재사용 (풀 크기 = AI_MAX_CONCURRENCY)
+#  - 동시 요청 수는 세마포어로 제한, 넘치면 대기
+#  - 같은 프롬프트가 이미 진행 중이면 새로 보내지 않고 그 결과를 같이 받음(coalescing)
+_GEMINI_TEXT_CONFIG = {"temperature": 0.6, "topP": 0.9, "maxOutputTokens": 512}   # 과하지 않게
+_GEMINI_JSON_CONFIG = {                                                            # 분류/추출은 낮게
+    "responseMimeType": "application/json", "temperature": 0.2, "maxOutputTokens": 256,
+}
+
+_gemini_requests = metrics.counter("ai.gemini.requests")
+_gemini_coalesced = metrics.counter("ai.gemini.coalesced")
+_gemini_in_flight = metrics.gauge("ai.gemini.in_flight")
+
+
 class GeminiAI(AIProvider):
-    def __init__(self, api_key: str, model_name: str = "gemini-1.5-flash"):
-        if genai is None:
-            raise RuntimeError("google-generativeai가 설치되지 않았습니다.")
-        genai.configure(api_key=api_key)
-        # 텍스트/JSON 응답을 분리해 안정성 ↑
-        self.model_text = genai.GenerativeModel(
-            model_name,
-            generation_config={
-                "temperature": 0.6,      # 과하지 않게
-                "top_p": 0.9,
-                "max_output_tokens": 512,
-            },
-        )
-        self.model_json = genai.GenerativeModel(
-            model_name,
-            generation_config={
-                "response_mime_type": "application/json",
-                "temperature": 0.2,     # 분류/추출은 낮게
-                "max_output_tokens": 256,
-            },
-        )
+    # 아래 summarize/analyze 프롬프트를 고치면 올릴 것 (캐시된 이전 결과 무효화)
+    prompt_version = "1"
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gemini-1.5-flash",
+        batch_size: int = 8,
+        *,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,  # 테스트: 가짜 서버
+    ):
+        self.name = model_name
+        self.batch_size = max(int(batch_size), 1)
+        self._api_key = api_key
+        self._base_url = base_url or settings.GEMINI_BASE_URL
+        self._limit = max(int(max_concurrency or settings.AI_MAX_CONCURRENCY), 1)
+        self._timeout = timeout or settings.AI_HTTP_TIMEOUT_SECONDS
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Tuple[bool, str], asyncio.Future] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # 첫 요청 때 생성 (import 시점엔 이벤트 루프가 없음). aclose 후엔 다시 생성
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers={"x-goog-api-key": self._api_key},
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=self._limit, max_keepalive_connections=self._limit),
+                transport=self._transport,
+            )
+            self._sem = asyncio.Semaphore(self._limit)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = self._sem = None
+
+    async def _request(self, prompt: str, json_mode: bool) -> str:
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": _GEMINI_JSON_CONFIG if json_mode else _GEMINI_TEXT_CONFIG,
+        }
+        client = self._get_client()
+        async with self._sem:
+            _gemini_in_flight.inc()
+            _gemini_requests.inc()
+            try:
+                resp = await client.post(f"/v1beta/models/{self.name}:generateContent", json=body)
+            finally:
+                _gemini_in_flight.dec()
+        resp.raise_for_status()
+        try:
+            parts = resp.json()["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise ValueError("unexpected Gemini response")
+        return "".join(p.get("text", "") for p in parts).strip()
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        """streamGenerateContent(SSE): 응답 조각의 텍스트를 오는 대로. 스트림은 합치지(coalescing) 않음"""
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": _GEMINI_TEXT_CONFIG,
+        }
+        client = self._get_client()
+        async with self._sem:
+            _gemini_in_flight.inc()
+            _gemini_requests.inc()
+            try:
+                async with client.stream(
+                    "POST", f"/v1beta/models/{self.name}:streamGenerateContent",
+                    params={"alt": "sse"}, json=body,
+                ) as resp:
+                    resp.raise_for_status()
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        try:
+                            parts = json.loads(line[5:])["candidates"][0]["content"]["parts"]
+                        except (KeyError, IndexError, TypeError, ValueError):
+                            continue  # 텍스트 없는 조각(종료 사유/안전 필터 정보 등)
+                        text = "".join(p.get("text", "") for p in parts)
+                        if text:
+                            yield text
+            finally:
+                _gemini_in_flight.dec()
+
+    async def _generate(self, prompt: str, json_mode: bool = False) -> str:
+        key = (json_mode, prompt)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(prompt, json_mode))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            _gemini_coalesced.inc()
+        # shield: 기다리던 요청 하나가 취소돼도 같은 프롬프트를 기다리는 다른 요청은 계속
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Tuple[bool, str], task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 기다리던 쪽이 모두 취소됐을 때 "never retrieved" 경고 방지
 
     async def _gen_text(self, prompt: str) -> str:
-        def _call():
-            resp = self.model_text.generate_content(prompt)
-            return getattr(resp, "text", "").strip()
-        return await anyio.to_thread.run_sync(_call)
+        return await self._generate(prompt)
 
     async def _gen_json(self, prompt: str) -> dict[str, Any]:
-        def _call():
-            resp = self.model_json.generate_content(prompt)
-            return json.loads(getattr(resp, "text", "").strip())
+        txt = await self._generate(prompt, json_mode=True)
         try:
-            return await anyio.to_thread.run_sync(_call)
-        except Exception:
-            # 가끔 텍스트/마크다운 섞여 나오는 경우 대비
-            def _call2():
-                resp = self.model_text.generate_content(prompt)
-                txt = getattr(resp, "text", "")
-                m = re.search(r"\{.*\}", txt, flags=re.S)
+            return json.loads(txt)
+        except ValueError:
+            # 가끔 텍스트/마크다운이 섞여 나오는 경우: 같은 응답에서 {...} 만 다시 파싱 (재요청 없음)
+            m = re.search(r"\{.*\}", txt, flags=re.S)
+            try:
                 return json.loads(m.group(0)) if m else {}
-            return await anyio.to_thread.run_sync(_call2)
+            except ValueError:
+                return {}
 
-    async def summarize(self, title: str, content: str, max_sentences: int = 2) -> str:
-        prompt = (
+    @staticmethod
+    def _summary_prompt(title: str, content: str, max_sentences: int) -> str:
+        return (
             "당신은 일기를 한국어로 깔끔하게 요약하는 비서입니다.\n"
             f"- 최대 {max_sentences}문장으로 요약하세요.\n"
             "- 핵심 사실/행동/감정만 남기고 군더더기(이모지·말줄임표·반복문장)는 제거합니다.\n"
@@ -87,7 +218,13 @@ class GeminiAI(AIProvider):
             f"제목: {title}\n"
             f"내용:\n{content}\n"
         )
-        return await self._gen_text(prompt)
+
+    async def summarize(self, title: str, content: str, max_sentences: int = 2) -> str:
+        return await self._gen_text(self._summary_prompt(title, content, max_sentences))
+
+    async def summarize_stream(self, title: str, content: str, max_sentences: int = 2):
+        async for piece in self._stream(self._summary_prompt(title, content, max_sentences)):
+            yield piece
 
     async def analyze(self, text: str):
         prompt = (
@@ -97,8 +234,14 @@ class GeminiAI(AIProvider):
             "- keywords: 최대 5개, 2~20자, 중복 제거, 한국어/영어 단어 중심, 특수문자·이모지 제외.\n"
             f"텍스트:\n{text}\n"
         )
-        data = await self._gen_json(prompt)
-        emo = (data.get("emotion") or "neutral").lower()
+        return self._clean_analysis(await self._gen_json(prompt))
+
+    @staticmethod
+    def _clean_analysis(data: Any) -> Tuple[str, List[str]]:
+        if not isinstance(data, dict) or not data.get("emotion"):
+            # 파싱 실패를 neutral 로 바꾸면 진짜 결과처럼 캐시/저장됨 → 실패로 올림
+            raise ValueError("unparseable analysis response")
+        emo = str(data["emotion"]).lower()
         if emo not in {"positive", "negative", "neutral"}:
             emo = "neutral"
         kws = data.get("keywords") or []
@@ -110,6 +253,31 @@ class GeminiAI(AIProvider):
                 seen.add(s); out.append(s)
         return emo, out[:5]
 
+    async def analyze_many(self, texts: Sequence[str]) -> List[Tuple[str, List[str]]]:
+        """batch_size 개까지 프롬프트 하나로. 응답에서 빠진 항목만 한 건씩 다시 요청"""
+        if len(texts) <= 1:
+            return [await self.analyze(t) for t in texts]
+        blocks = "\n".join(f"[{i}]\n{t}\n" for i, t in enumerate(texts))
+        prompt = (
+            "다음 번호 붙은 텍스트 각각의 감정을 분류하고 핵심 키워드를 추출하세요.\n"
+            'JSON으로만 응답하세요. 형식: {"results":[{"i":0,"emotion":"positive|negative|neutral","keywords":["키워드1"]}]}\n'
+            "- 모든 번호에 대해 하나씩, i는 텍스트 번호.\n"
+            "- emotion은 positive/negative/neutral 중 하나만.\n"
+            "- keywords: 최대 5개, 2~20자, 중복 제거, 한국어/영어 단어 중심, 특수문자·이모지 제외.\n"
+            f"텍스트:\n{blocks}"
+        )
+        data = await self._gen_json(prompt)
+        by_index: dict[int, Tuple[str, List[str]]] = {}
+        for item in (data.get("results") or []) if isinstance(data, dict) else []:
+            try:
+                by_index[int(item["i"])] = self._clean_analysis(item)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return [
+            by_index[i] if i in by_index else await self.analyze(t)
+            for i, t in enumerate(texts)
+        ]
+
 # ---- 팩토리 ------------------------------------------------------------------
 def make_ai() -> AIProvider:
     if os.getenv("USE_FAKE_AI", "").lower() in {"1","true","yes"}:
@@ -117,9 +285,20 @@ def make_ai() -> AIProvider:
     key = os.getenv("GEMINI_API_KEY")
     if key:
         try:
-            return GeminiAI(api_key=key)
+            gemini = GeminiAI(
+                api_key=key, model_name=settings.GEMINI_MODEL, batch_size=settings.AI_BULK_PROMPT_SIZE
+            )
         except Exception:
             return RuleBasedAI()
+        # 마감/서킷 브레이커: Gemini 가 느리거나 실패하면 rule-based 로
+        return ProviderChain([gemini, RuleBasedAI()])
     return RuleBasedAI()
 
 ai: AIProvider = make_ai()
+
+
+async def close_ai() -> None:
+    """shutdown 에서 호출: HTTP 커넥션 풀 정리"""
+    aclose = getattr(ai, "aclose", None)
+    if aclose is not None:
+        await aclose()
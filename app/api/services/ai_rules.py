@@ -0,0 +1,201 @@
+# app/api/services/ai_rules.py
+"""
+RuleBasedAI 의 여러 건 분석 (Gemini 장애로 폴백된 bulk 분석용).
+
+결과는 RuleBasedAI.analyze 를 한 건씩 부른 것과 항상 같습니다:
+- 토큰: 소문자화 후 [A-Za-z가-힣0-9#@]{2,}
+- 감정: 텍스트에 (중복 없이) 나온 POS 단어 수 - NEG 단어 수의 부호
+- 키워드: 빈도 상위 3개, 같은 빈도면 먼저 나온 토큰 먼저 (Counter.most_common 과 같은 순서)
+
+경로
+- numpy 있으면(선택 의존성: pip install .[speedups]) 묶음 전체를 배열로 한 번에 처리
+  · 코드포인트 배열의 토큰 문자 마스크로 토큰 구간(시작/끝)을 구함 (토큰마다 str 을 만들지 않음)
+  · 구간 다항식 해시로 (텍스트, 토큰) 을 묶어 개수/첫 위치를 세고,
+    사전 점수 합은 bincount, 상위 3개는 lexsort → 뽑힌 키워드만 문자열로 자름
+  · 해시 충돌이 보이거나(두 번째 해시로 확인) NUL 이 섞인 묶음 등은 한 건씩 처리
+- 없거나 묶음이 작으면 미리 컴파일한 정규식 + frozenset 사전으로 한 건씩
+"""
+from __future__ import annotations
+
+import heapq
+import re
+from collections import Counter
+from operator import itemgetter
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # 미설치 대비
+    np = None
+
+TOKEN_RE = re.compile(r"[A-Za-z가-힣0-9#@]{2,}")
+TOP_K = 3
+# 이보다 작은 묶음은 배열 준비 비용이 더 큼
+NUMPY_MIN_BATCH = 32
+# 배열 경로 한 번에 넘길 텍스트 수 (해시/거듭제곱 표 메모리 상한)
+NUMPY_CHUNK = 1024
+
+_SEP = "\x00"  # 텍스트 경계 (토큰 문자가 아님)
+_BASES = (0x100000001B3, 0x9E3779B97F4A7C15)  # 홀수 (mod 2^64 역원 존재)
+_TEXT_MIX = 0xC2B2AE3D27D4EB4F
+
+if np is not None:
+    # BMP 코드포인트 → 토큰 문자 여부 (BMP 밖은 0xFFFF 로 잘라 False)
+    _TOKEN_CHARS = np.zeros(0x10000, dtype=bool)
+    for _lo, _hi in (("a", "z"), ("A", "Z"), ("0", "9"), ("가", "힣"), ("#", "#"), ("@", "@")):
+        _TOKEN_CHARS[ord(_lo):ord(_hi) + 1] = True
+
+Analysis = Tuple[str, List[str]]
+
+
+def _emotion(score: int) -> str:
+    return "positive" if score > 0 else "negative" if score < 0 else "neutral"
+
+
+class Lexicon:
+    """POS/NEG 단어 집합을 한 번만 준비해 두고 재사용"""
+
+    def __init__(self, pos: Iterable[str], neg: Iterable[str]) -> None:
+        self.pos = frozenset(pos)
+        self.neg = frozenset(neg)
+        # numpy 경로: 토큰 → +1/-1 (둘 다면 0)
+        self.weights = {w: (w in self.pos) - (w in self.neg) for w in self.pos | self.neg}
+        self._hashed: Optional[Tuple[Any, Any, Any]] = None
+
+    def analyze_one(self, text: str) -> Analysis:
+        cnt = Counter(TOKEN_RE.findall(text.lower()))
+        score = len(self.pos.intersection(cnt)) - len(self.neg.intersection(cnt))
+        top = heapq.nlargest(TOP_K, cnt.items(), key=itemgetter(1))
+        return _emotion(score), [w for w, _ in top]
+
+    def analyze_many(self, texts: Sequence[str]) -> List[Analysis]:
+        if np is None or len(texts) < NUMPY_MIN_BATCH:
+            return [self.analyze_one(t) for t in texts]
+        out: List[Analysis] = []
+        for i in range(0, len(texts), NUMPY_CHUNK):
+            chunk = texts[i:i + NUMPY_CHUNK]
+            try:
+                out.extend(self._analyze_arrays(chunk))
+            except (_Fallback, UnicodeEncodeError):  # UnicodeEncodeError: 짝 없는 서로게이트
+                out.extend(self.analyze_one(t) for t in chunk)
+        return out
+
+    def _analyze_arrays(self, texts: Sequence[str]) -> List[Analysis]:
+        joined = _SEP.join(texts)
+        if joined.count(_SEP) != len(texts) - 1:
+            raise _Fallback  # 본문에 NUL 이 있으면 경계를 못 찾음
+        # 토큰 문자는 소문자화로 길이가 바뀌지 않음 → 길이가 같으면 위치도 같음
+        lowered = joined.lower()
+        if len(lowered) != len(joined):
+            raise _Fallback
+        cp = np.frombuffer(lowered.encode("utf-32-le"), dtype=np.uint32)
+
+        is_tok = _TOKEN_CHARS[np.minimum(cp, 0xFFFF)]
+        edge = np.diff(is_tok.view(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edge == 1)
+        ends = np.flatnonzero(edge == -1)
+        long_enough = ends - starts >= 2
+        starts, ends = starts[long_enough], ends[long_enough]
+        if len(starts) == 0:
+            return [("neutral", []) for _ in texts]
+        text_of = np.cumsum(cp == 0)[starts]  # 앞에 있는 경계 수 = 텍스트 번호
+
+        # 토큰 문자열을 만들지 않고 구간 해시 두 개로 비교 (h1 로 묶고 h2 로 충돌 확인)
+        wide = cp.astype(np.uint64)
+        h1 = _span_hash(wide, starts, ends, 0)
+        h2 = _span_hash(wide, starts, ends, 1)
+        with np.errstate(over="ignore"):
+            key = h1 + text_of.astype(np.uint64) * np.uint64(_TEXT_MIX)
+        order = np.argsort(key)
+        k_sorted = key[order]
+        bounds = np.flatnonzero(np.concatenate(([True], k_sorted[1:] != k_sorted[:-1])))
+        h2_sorted = h2[order]
+        if np.any(np.maximum.reduceat(h2_sorted, bounds) != np.minimum.reduceat(h2_sorted, bounds)):
+            raise _Fallback  # 해시 충돌
+        g_first = np.minimum.reduceat(order, bounds)  # (텍스트, 토큰) 의 첫 등장 토큰 번호
+        g_count = np.diff(bounds, append=len(order))
+        g_text = text_of[g_first]
+
+        lex_h1, lex_h2, lex_v = self._hashed_lexicon()
+        if len(lex_h1):
+            g_h1 = h1[g_first]
+            at = np.minimum(np.searchsorted(lex_h1, g_h1), len(lex_h1) - 1)
+            hit = (lex_h1[at] == g_h1) & (lex_h2[at] == h2[g_first])
+            scores = np.bincount(g_text[hit], weights=lex_v[at[hit]], minlength=len(texts))
+        else:
+            scores = np.zeros(len(texts))
+
+        # 텍스트별: 개수 내림차순, 같으면 먼저 나온 것 → 앞 TOP_K 개
+        top = _rank_order(g_text, g_count, g_first)
+        t_sorted = g_text[top]
+        pos = np.arange(len(top))
+        head = np.concatenate(([True], t_sorted[1:] != t_sorted[:-1]))
+        rank = pos - np.maximum.accumulate(np.where(head, pos, 0))
+        picked = g_first[top[rank < TOP_K]]
+
+        keywords: List[List[str]] = [[] for _ in texts]
+        for t, a, b in zip(text_of[picked].tolist(), starts[picked].tolist(), ends[picked].tolist()):
+            keywords[t].append(lowered[a:b])
+        return [(_emotion(int(s)), kws) for s, kws in zip(scores.tolist(), keywords)]
+
+    def _hashed_lexicon(self) -> Tuple[Any, Any, Any]:
+        """사전 단어의 (h1, h2, 점수) 배열, h1 로 정렬. 토큰이 될 수 없는 단어는 빼도 결과가 같음"""
+        if self._hashed is None:
+            words = [w for w, v in self.weights.items() if v and TOKEN_RE.fullmatch(w)]
+            cp = np.array([ord(c) for w in words for c in w], dtype=np.uint64)
+            lengths = np.array([len(w) for w in words], dtype=np.int64)
+            ends = np.cumsum(lengths)
+            starts = ends - lengths
+            h1 = _span_hash(cp, starts, ends, 0)
+            h2 = _span_hash(cp, starts, ends, 1)
+            v = np.array([self.weights[w] for w in words], dtype=np.float64)
+            order = np.argsort(h1)
+            self._hashed = (h1[order], h2[order], v[order])
+        return self._hashed
+
+
+class _Fallback(Exception):
+    """배열 경로로 정확히 처리할 수 없는 묶음 → 한 건씩"""
+
+
+# base^i, base^-i (mod 2^64) 표. 필요한 길이까지 늘려 가며 재사용
+_powers: List[Tuple["np.ndarray", "np.ndarray"]] = []
+
+
+def _power_table(which: int, n: int):
+    while len(_powers) <= which:
+        _powers.append((np.ones(1, dtype=np.uint64), np.ones(1, dtype=np.uint64)))
+    pw, inv = _powers[which]
+    if len(pw) < n:
+        size = max(n, 2 * len(pw))
+        base = _BASES[which]
+        with np.errstate(over="ignore"):
+            pw = np.full(size, base, dtype=np.uint64)
+            pw[0] = 1
+            pw = np.cumprod(pw, dtype=np.uint64)
+            inv = np.full(size, pow(base, -1, 1 << 64), dtype=np.uint64)
+            inv[0] = 1
+            inv = np.cumprod(inv, dtype=np.uint64)
+        _powers[which] = (pw, inv)
+    return pw[:n], inv[:n]
+
+
+def _span_hash(cp, starts, ends, which: int):
+    """cp[s:e] 의 다항식 해시 (mod 2^64): 접두합 차이에 base^-s 를 곱해 시작 위치와 무관하게"""
+    pw, inv = _power_table(which, len(cp))
+    prefix = np.zeros(len(cp) + 1, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        np.cumsum(cp * pw, dtype=np.uint64, out=prefix[1:])
+        return (prefix[ends] - prefix[starts]) * inv[starts]
+
+
+def _rank_order(text, count, first):
+    """(text 오름차순, count 내림차순, first 오름차순) 정렬 순서. 64비트에 들어가면 키 하나로"""
+    bits = [int(x.max()).bit_length() for x in (count, first)]
+    if int(text.max()).bit_length() + sum(bits) <= 63:
+        key = (text << (bits[0] + bits[1])) | ((count.max() - count) << bits[1]) | first
+        return np.argsort(key)
+    return np.lexsort((first, -count, text))
+
+
+__all__ = ["Lexicon", "TOKEN_RE", "NUMPY_MIN_BATCH", "NUMPY_CHUNK"]
@@ -0,0 +1,158 @@
+# app/api/services/maintenance.py
+"""
+주기 정리 작업 (앱 startup 에서 시작, 외부 스케줄러 없음).
+
+- MAINTENANCE_INTERVAL_SECONDS 마다 만료된 token_blacklist / revoked_tokens / refresh_token_family 행 삭제
+  (기동 직후 한 번 포함)
+  · MAINTENANCE_BATCH_SIZE 행씩 나눠 지움 → DELETE 한 문장이 잠금을 오래 잡지 않음
+  · 배치 사이 MAINTENANCE_BATCH_PAUSE_SECONDS 만큼 쉼
+- 여러 uvicorn 워커 중 하나만 실행: maintenance_lease 행을 조건부 UPDATE 로 잡은 워커가 리더
+  · `UPDATE ... WHERE name=? AND (owner=나 OR expires_at < now)` → 동시에 시도해도 한 워커만 성공
+  · 리더는 실행할 때마다 lease 연장, 멈추면 MAINTENANCE_LEASE_SECONDS 뒤 다른 워커가 넘겨받음
+  · 종료 시 lease 를 바로 풀어 다음 워커가 기다리지 않게
+- 보고: 로그 한 줄 + 메트릭 maintenance.purged.<table>, maintenance.run_ms, maintenance.leader
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from tortoise.expressions import Q
+
+from app.api.core import metrics
+from app.api.core.config import settings
+from app.api.models.maintenance_lease import MaintenanceLease
+from app.api.repositories.refresh_family_repo import purge_expired_families
+from app.api.repositories.token_blacklist_repo import purge_expired
+from app.api.repositories.token_repo import purge_revoked_expired
+
+log = logging.getLogger(__name__)
+
+LEASE_NAME = "token_purge"
+
+# 이 프로세스 식별자 (호스트:pid:임의값 — 재시작한 같은 pid 와도 구분)
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_leader = False
+_task: Optional[asyncio.Task] = None
+
+_purged_blacklist = metrics.counter("maintenance.purged.token_blacklist")
+_purged_revoked = metrics.counter("maintenance.purged.revoked_tokens")
+_purged_families = metrics.counter("maintenance.purged.refresh_token_family")
+_runs = metrics.counter("maintenance.runs")
+_run_ms = metrics.histogram("maintenance.run_ms")
+metrics.gauge("maintenance.leader", lambda: int(_leader))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def acquire_lease(name: str, owner: str, seconds: float) -> bool:
+    """비어 있거나 만료됐거나 이미 내 것이면 owner 로 잡고(연장) True"""
+    now = _now()
+    for _ in range(2):
+        updated = await MaintenanceLease.filter(
+            Q(owner=owner) | Q(expires_at__lt=now), name=name
+        ).update(owner=owner, expires_at=now + timedelta(seconds=seconds))
+        if updated:
+            return True
+        # 행이 아직 없을 때만 내 것으로 만들고 한 번 더 확인 (동시에 만들면 먼저 들어간 쪽이 리더)
+        if await MaintenanceLease.exists(name=name):
+            return False
+        await MaintenanceLease.bulk_create(
+            [MaintenanceLease(name=name, owner=owner, expires_at=now + timedelta(seconds=seconds))],
+            ignore_conflicts=True,
+        )
+    return False
+
+
+async def release_lease(name: str, owner: str) -> None:
+    await MaintenanceLease.filter(name=name, owner=owner).update(owner="", expires_at=_now())
+
+
+async def run_maintenance(owner: str = OWNER) -> Dict[str, Any]:
+    """
+    리더면 한 번 정리하고 보고를 돌려줌.
+    {"leader": True, "token_blacklist": 삭제 수, "revoked_tokens": 삭제 수,
+     "refresh_token_family": 삭제 수, "seconds": 걸린 시간}
+    리더가 아니면 {"leader": False}
+    """
+    global _leader
+    _leader = await acquire_lease(LEASE_NAME, owner, settings.MAINTENANCE_LEASE_SECONDS)
+    if not _leader:
+        return {"leader": False}
+    batch, pause = settings.MAINTENANCE_BATCH_SIZE, settings.MAINTENANCE_BATCH_PAUSE_SECONDS
+    started = time.perf_counter()
+    blacklist = await purge_expired(batch_size=batch, pause=pause)
+    revoked = await purge_revoked_expired(batch_size=batch, pause=pause)
+    families = await purge_expired_families(batch_size=batch, pause=pause)
+    seconds = time.perf_counter() - started
+
+    _runs.inc()
+    _purged_blacklist.inc(blacklist)
+    _purged_revoked.inc(revoked)
+    _purged_families.inc(families)
+    _run_ms.observe(seconds * 1000)
+    log.info(
+        "maintenance: purged %d token_blacklist, %d revoked_tokens, %d refresh_token_family in %.1fms",
+        blacklist, revoked, families, seconds * 1000,
+    )
+    return {
+        "leader": True,
+        "token_blacklist": blacklist,
+        "revoked_tokens": revoked,
+        "refresh_token_family": families,
+        "seconds": seconds,
+    }
+
+
+async def _loop() -> None:
+    while True:
+        try:
+            await run_maintenance()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("maintenance run failed")
+        await asyncio.sleep(settings.MAINTENANCE_INTERVAL_SECONDS)
+
+
+def start_maintenance() -> None:
+    """startup 에서 호출"""
+    global _task
+    if not settings.MAINTENANCE_ENABLED:
+        return
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_loop())
+
+
+async def stop_maintenance() -> None:
+    global _task, _leader
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+    if _leader:
+        _leader = False
+        try:
+            await release_lease(LEASE_NAME, OWNER)
+        except Exception:
+            pass
+
+
+__all__ = [
+    "OWNER",
+    "acquire_lease",
+    "release_lease",
+    "run_maintenance",
+    "start_maintenance",
+    "stop_maintenance",
+]
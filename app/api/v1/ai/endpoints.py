@@ -1,106 +1,164 @@
 from __future__ import annotations
-from typing import Any
-from datetime import datetime as _dt
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+import datetime as dt
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from app.api.core.config import settings
+from app.api.core.responses import EventStreamResponse, FastJSONResponse, sse_event
 from app.api.core.security import get_current_user
 from app.api.schemas import DiaryOut
 from app.api.services.ai_provider import ai  # Gemini/Rule-based 자동 선택
+from app.api.services.ai_enrich import (
+    analyze_diary as enrich_analyze,
+    summarize_diary as enrich_summarize,
+    summarize_diary_stream as enrich_summarize_stream,
+)
+from app.api.services.ai_bulk import bulk_analyze, select_diaries
+from app.api.services.ai_jobs import enqueue, get_job_for_user, job_status
 from app.api.models.diary import Diary
-from app.api.models.emotion import EmotionKeyword
+from app.api.v1.diary.serializers import diary_to_ai_dict  # diary 엔드포인트와 같은 인코더
 
 router = APIRouter(prefix="/ai", tags=["ai"])
+log = logging.getLogger(__name__)
 
 @router.get("/ping")
 async def ping():
     return {"ok": True}
 
-# 공용: Diary 모델 -> dict 직렬화 (diary/endpoints.py와 동일 컨벤션)
-def _to_diary_dict(d) -> dict[str, Any]:
-    raw_date = getattr(d, "date", None)
-    out_date = raw_date.date() if isinstance(raw_date, _dt) else raw_date
-    try:
-        tags = [t.name for t in d.tags]
-    except Exception:
-        tags = []
+
+def _accepted(job) -> FastJSONResponse:
+    """202 + 작업 상태 (Location: 상태 조회 URL)"""
+    return FastJSONResponse(
+        job_status(job),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"/api/v1/ai/jobs/{job.id}"},
+    )
+
+
+async def _summary_events(diary: Diary) -> AsyncIterator[bytes]:
+    """token(조각) … → done(저장된 요약) / 실패하면 error 로 끝남 (이미 200 을 보낸 뒤라 상태 코드 대신)"""
     try:
-        emos = [e.name for e in d.emotion_keywords]
+        async for piece in enrich_summarize_stream(ai, diary):
+            yield sse_event("token", {"text": piece})
     except Exception:
-        emos = []
-    return {
-        "id": d.id,
-        "title": d.title,
-        "content": d.content,
-        "mood": getattr(d, "mood", None),
-        "date": out_date,
-        "is_private": getattr(d, "is_private", True),
-        "tags": tags,
-        "ai_summary": getattr(d, "ai_summary", None),
-        "main_emotion": getattr(d, "main_emotion", None),
-        "emotion_keywords": emos,
-        "created_at": getattr(d, "created_at", None),
-        "updated_at": getattr(d, "updated_at", None),
-    }
+        log.exception("streaming summary failed (diary %s)", diary.id)
+        yield sse_event("error", {"detail": "Summary generation failed"})
+        return
+    yield sse_event("done", {"id": diary.id, "ai_summary": diary.ai_summary})
 
 @router.post(
     "/diaries/{diary_id}/summarize",
-    response_model=DiaryOut,              # dict 대신 DiaryOut 권장
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={200: {"model": DiaryOut, "description": "background=false: 저장된 결과"}},
     summary="일기 내용 AI 요약",
     description=(
         "지정한 일기의 제목/내용을 AI로 요약합니다.\n"
         "- 기본 2문장으로 요약합니다.\n"
-        "- `overwrite`가 true면 결과를 DB의 `ai_summary` 필드에 저장합니다."
+        "- `overwrite`가 true면 결과를 DB의 `ai_summary` 필드에 저장합니다.\n"
+        "- 기본은 작업만 등록하고 202 + 작업 ID를 바로 반환합니다 "
+        "(진행 상황은 `GET /ai/jobs/{job_id}`, 같은 일기에 대기/실행 중인 요약 작업이 있으면 그 작업).\n"
+        "- `background=false`면 끝날 때까지 기다려 200 + 저장된 결과를 반환합니다.\n"
+        "- `stream=true`면 Server-Sent Events(text/event-stream)로 생성되는 대로 보냅니다: "
+        "`token` 이벤트(`{\"text\": 조각}`) 여러 개 → 저장 후 `done`(`{\"id\", \"ai_summary\"}`), "
+        "실패하면 `error`."
     ),
 )
-async def summarize_diary(diary_id: int, user=Depends(get_current_user)):
+async def summarize_diary(
+    diary_id: int,
+    background: Optional[bool] = Query(
+        None, description="기본 true(202 + 작업 ID). false면 완료까지 기다려 결과(200). stream=true 면 기본 false"
+    ),
+    stream: bool = Query(False, description="true면 SSE 로 요약 조각을 바로바로 전송"),
+    user=Depends(get_current_user),
+):
+    if background and stream:
+        raise HTTPException(status_code=400, detail="background and stream cannot be combined")
+    if background is None:
+        background = not stream
     diary = await Diary.get_or_none(id=diary_id, user=user)
     if not diary:
         raise HTTPException(status_code=404, detail="Diary not found")
 
-    diary.ai_summary = await ai.summarize(diary.title or "", diary.content or "")
-    await diary.save()
+    if background:
+        return _accepted(await enqueue(user, diary, "summarize"))
+    if stream:
+        return EventStreamResponse(_summary_events(diary))
+
+    await enrich_summarize(ai, diary)
     await diary.fetch_related("tags", "emotion_keywords")
-    return _to_diary_dict(diary)
+    return FastJSONResponse(diary_to_ai_dict(diary))
 
 @router.post(
     "/diaries/{diary_id}/analyze",
-    response_model=DiaryOut,  # dict 대신 DiaryOut 권장
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={200: {"model": DiaryOut, "description": "background=false: 저장된 결과"}},
     summary="일기 감정 분석 & 키워드 추출",
     description=(
         "지정한 일기의 제목/내용을 AI로 분석해 감정(main_emotion)과 키워드(emotion_keywords)를 추출합니다.\n"
         "- 기본은 기존 키워드/결과를 덮어씁니다(overwrite=true).\n"
         "- overwrite=false로 주면 기존 키워드에 합쳐 저장(중복 제거).\n"
-        "- top_k로 저장할 키워드 최대 개수를 지정할 수 있습니다."
+        "- top_k로 저장할 키워드 최대 개수를 지정할 수 있습니다.\n"
+        "- 기본은 작업만 등록하고 202 + 작업 ID를 바로 반환합니다 (진행 상황은 `GET /ai/jobs/{job_id}`).\n"
+        "- `background=false`면 끝날 때까지 기다려 200 + 저장된 결과를 반환합니다."
     ),
 )
 async def analyze_diary(
     diary_id: int = Path(..., ge=1, description="분석할 일기의 ID"),
     top_k: int = Query(5, ge=1, le=10, description="추출/저장할 키워드 개수(최대 10)"),
     overwrite: bool = Query(True, description="기존 키워드/감정 결과를 덮어쓸지 여부"),
+    background: bool = Query(True, description="기본 true(202 + 작업 ID). false면 완료까지 기다려 결과(200)"),
     user=Depends(get_current_user),
 ):
     diary = await Diary.get_or_none(id=diary_id, user=user)
     if not diary:
         raise HTTPException(status_code=404, detail="Diary not found")
 
-    # 1) AI 분석
-    emotion, keywords = await ai.analyze(f"{diary.title}\n{diary.content or ''}")
-    diary.main_emotion = emotion
-    await diary.save()
+    if background:
+        job = await enqueue(user, diary, "analyze", {"top_k": top_k, "overwrite": overwrite})
+        return _accepted(job)
+
+    diary = await enrich_analyze(ai, diary, top_k=top_k, overwrite=overwrite)
+    await diary.fetch_related("tags", "emotion_keywords")
+    return FastJSONResponse(diary_to_ai_dict(diary))
 
-    # 2) 키워드 저장 로직
-    await diary.fetch_related("emotion_keywords")
 
-    if overwrite:
-        await diary.emotion_keywords.clear()
+@router.post(
+    "/diaries/analyze-bulk",
+    response_model=dict,
+    summary="일기 여러 개 일괄 감정 분석",
+    description=(
+        "내 일기 중 조건에 맞는 것들을 한 번에 분석해 감정(main_emotion)과 키워드를 저장합니다.\n"
+        "- 기본은 아직 분석되지 않은 일기만(only_unanalyzed=true), 오래된 것부터 limit 개.\n"
+        "- provider 가 허용하면 프롬프트 하나에 여러 일기를 묶어 보냅니다.\n"
+        "- 응답: 처리/실패 개수, 소요 시간, 처리량(diaries_per_second)."
+    ),
+)
+async def analyze_diaries_bulk(
+    date_from: Optional[dt.date] = Query(None, description="시작 날짜"),
+    date_to: Optional[dt.date] = Query(None, description="끝 날짜"),
+    only_unanalyzed: bool = Query(True, description="main_emotion 이 없는 일기만"),
+    limit: int = Query(100, ge=1, le=settings.AI_BULK_MAX_DIARIES, description="최대 처리 개수"),
+    top_k: int = Query(5, ge=1, le=10, description="일기당 저장할 키워드 개수(최대 10)"),
+    overwrite: bool = Query(True, description="기존 키워드를 덮어쓸지 여부"),
+    user=Depends(get_current_user),
+):
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be <= date_to")
+    diaries = await select_diaries(user.id, date_from, date_to, only_unanalyzed, limit)
+    report = await bulk_analyze(ai, diaries, top_k=top_k, overwrite=overwrite)
+    return FastJSONResponse(report)
 
-    # 기존 키워드와 병합(중복 제거) + top_k 제한
-    existing = {ek.name for ek in diary.emotion_keywords} if not overwrite else set()
-    for kw in (keywords or [])[:top_k]:
-        if kw and kw not in existing:
-            ek, _ = await EmotionKeyword.get_or_create(name=str(kw))
-            await diary.emotion_keywords.add(ek)
-            existing.add(kw)
 
-    await diary.fetch_related("tags", "emotion_keywords")
-    return _to_diary_dict(diary)
+@router.get(
+    "/jobs/{job_id}",
+    response_model=dict,
+    summary="AI 백그라운드 작업 상태",
+    description="status: queued | running | succeeded | failed. 성공하면 result 에 저장된 결과가 들어 있습니다.",
+)
+async def get_job(job_id: int = Path(..., ge=1), user=Depends(get_current_user)):
+    job = await get_job_for_user(user, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse(job_status(job))
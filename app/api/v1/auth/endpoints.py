@@ -4,6 +4,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     HTTPException,
     Response,
     Request,
@@ -24,10 +25,13 @@ from app.api.repositories.token_blacklist_repo import (
     is_jti_blacklisted,
     blacklist_jti,
 )
+from app.api.repositories import refresh_family_repo
 from app.api.core.security import (
     get_current_user,
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
+    upgrade_password_hash,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -35,6 +39,7 @@ from app.api.core.security import (
     clear_auth_cookies,
 )
 from app.api.core.config import settings
+from app.api.core.ratelimit import get_login_limiter
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -68,7 +73,7 @@ async def register(
     if await get_by_email(payload.email):
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    hashed = get_password_hash(payload.password.get_secret_value())
+    hashed = await get_password_hash_async(payload.password.get_secret_value())
     await create_user(email=payload.email, name=payload.name, hashed_password=hashed)
 
     return MessageResponse(message="registered")
@@ -77,15 +82,30 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     payload: LoginRequest,
+    request: Request,
     response: Response,
+    background_tasks: BackgroundTasks,
     as_cookie: bool = Query(False, description="쿠키로 access/refresh를 설정할지 여부"),
 ):
+    # 시도 제한: 사용자 조회/bcrypt 전에 429, 틀린 비밀번호만 (이메일, IP) 버킷을 씀
+    limiter = get_login_limiter()
+    ip = limiter.client_ip(request)
+    await limiter.check(ip, payload.email)
+
     user = await get_by_email(payload.email)
-    if not user or not verify_password(payload.password.get_secret_value(), user.hashed_password):
+    plain = payload.password.get_secret_value()
+    if not user or not await verify_password_async(plain, user.hashed_password):
+        await limiter.failed(ip, payload.email)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # 해시 정책(스킴/비용)이 바뀐 사용자는 응답 후 백그라운드 재해시
+    if password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(upgrade_password_hash, user.id, plain)
+
     access = create_access_token(user.email)
-    refresh = create_refresh_token(user.email)
+    # 로그인 세션 = refresh 토큰 family 하나
+    family = await refresh_family_repo.start_family(user.id)
+    refresh = create_refresh_token(user.email, family=family)
 
     if as_cookie:
         set_auth_cookies(response, access, refresh)
@@ -112,25 +132,28 @@ async def refresh_token(
     email: str | None = payload.get("sub")
     jti: str | None = payload.get("jti")
     exp: int | None = payload.get("exp")
+    family: str | None = payload.get("fam")
+    generation = payload.get("gen")
 
-    if not jti or not exp:
+    if not jti or not exp or (family is not None and not isinstance(generation, int)):
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    # 블랙리스트 확인
-    if await is_jti_blacklisted(jti):
-        raise HTTPException(status_code=401, detail="Refresh token revoked")
-
     user = await get_by_email(email or "")
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
-    # 토큰 회전
-    new_access = create_access_token(email)          # type: ignore[arg-type]
-    new_refresh = create_refresh_token(email)        # type: ignore[arg-type]
+    # 토큰 회전: family 행의 generation 을 조건부로 +1 (블랙리스트에 쓰지 않음)
+    if family is not None:
+        rotated = await refresh_family_repo.rotate(family, generation, user.id)
+    else:
+        # fam 없는 배포 전 토큰: 예전 회전분은 블랙리스트에 있음 → 확인 후 family 로 옮김
+        rotated = not await is_jti_blacklisted(jti) and await refresh_family_repo.adopt_legacy(jti, user.id)
+        family, generation = jti, 0
+    if not rotated:
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
 
-    # 방금 사용한 refresh는 블랙리스트에 등록
-    expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
-    await blacklist_jti(jti, expires_at)
+    new_access = create_access_token(email)          # type: ignore[arg-type]
+    new_refresh = create_refresh_token(email, family=family, generation=generation + 1)  # type: ignore[arg-type]
 
     if as_cookie:
         set_auth_cookies(response, new_access, new_refresh)
@@ -144,11 +167,13 @@ async def refresh_token(
 
 @router.post("/logout", response_model=MessageResponse)
 async def logout(request: Request, response: Response, user=Depends(get_current_user)):
-    # 1) 쿠키의 refresh 블랙리스트
+    # 1) 쿠키의 refresh: 세션(family) 전체 폐기, fam 없는 배포 전 토큰은 블랙리스트
     if (rt := request.cookies.get("refresh_token")):
         try:
             p = decode_token(rt, token_type="refresh")
-            if (jti := p.get("jti")) and (exp := p.get("exp")):
+            if (fam := p.get("fam")):
+                await refresh_family_repo.revoke_family(fam)
+            elif (jti := p.get("jti")) and (exp := p.get("exp")):
                 await blacklist_jti(jti, datetime.fromtimestamp(exp, tz=timezone.utc))
         except Exception:
             pass
@@ -1,63 +1,51 @@
 # app/api/v1/diary/endpoints.py
 from __future__ import annotations
 
-from typing import Optional, Literal, List, Any
-from datetime import date, datetime as _dt
+from typing import Optional, Literal, List
 import datetime as dt
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 
+from app.api.core.responses import FastJSONResponse, etag_matches, make_etag, not_modified
 from app.api.core.security import get_current_user
 from app.api.schemas.diary import DiaryCreate, DiaryUpdate  # ⬅ DiaryOut 안 씀
 from app.api.repositories.diary_repo import (
     create_diary,
-    list_diaries,
+    list_diary_rows,
     get_diary_by_id_for_user,
     update_diary,
     delete_diary,
+    encode_cursor,
+    search_diaries,
+    list_page_key,
+    get_list_page,
+    set_list_page,
 )
+from app.api.repositories.diary_stats_repo import get_stats
+from .serializers import diary_etag, diary_to_dict, encode_diary, encode_diary_rows
 
 router = APIRouter(prefix="/diaries", tags=["diary"])
 
+# 클라이언트/프록시는 저장해도 되지만 매번 ETag 로 재검증
+_CACHE_CONTROL = "private, no-cache"
+
 
 @router.get("/ping")
 async def ping():
     return {"ok": True}
 
 
-def _to_out_dict(d) -> dict[str, Any]:
-    """Tortoise Diary -> dict(JSON 직렬화용)"""
-    raw_date = getattr(d, "date", None)
-    out_date = raw_date.date() if isinstance(raw_date, _dt) else raw_date
-
-    try:
-        tag_names = [str(t.name) for t in d.tags]
-    except Exception:
-        tag_names = []
-
-    return {
-        "id": int(d.id),
-        "title": str(getattr(d, "title", "")),
-        "content": str(getattr(d, "content", "")),
-        "mood": getattr(d, "mood", None),
-        "date": out_date,
-        "is_private": bool(getattr(d, "is_private", True)),
-        "tags": tag_names,
-        "created_at": getattr(d, "created_at", None),
-        "updated_at": getattr(d, "updated_at", None),
-    }
-
-
 # 작성 (mission_2)
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=dict)
 async def create_diary_api(
     payload: DiaryCreate,
-    response: Response,
     user=Depends(get_current_user),
 ):
-    diary = await create_diary(user, payload.model_dump(exclude_unset=True))
-    await diary.fetch_related("tags")
-    response.headers["Location"] = f"/api/v1/diaries/{diary.id}"
-    return _to_out_dict(diary)
+    diary, tags = await create_diary(user, payload.model_dump(exclude_unset=True))
+    return FastJSONResponse(
+        encode_diary(diary, tags),
+        status_code=status.HTTP_201_CREATED,
+        headers={"Location": f"/api/v1/diaries/{diary.id}", "ETag": diary_etag(diary, tags)},
+    )
 
 
 # 조회 + 검색/정렬/페이징 (mission_3, mission_6)
@@ -71,6 +59,10 @@ async def list_diaries_api(
     order: Literal["asc", "desc"] = Query("desc", description="정렬: asc|desc"),
     tags: Optional[str] = Query(None, description="쉼표구분 태그(ANY)"),
     tags_all: Optional[str] = Query(None, description="쉼표구분 태그(ALL)"),
+    cursor: Optional[str] = Query(
+        None, description="keyset 커서(이전 응답의 X-Next-Cursor). 주면 page는 무시"
+    ),
+    if_none_match: Optional[str] = Header(None),
     user=Depends(get_current_user),
 ):
     if date_from and date_to and date_from > date_to:
@@ -79,36 +71,97 @@ async def list_diaries_api(
     any_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else None
     all_list = [t.strip() for t in tags_all.split(",") if t.strip()] if tags_all else None
 
-    diaries = await list_diaries(
-        user=user,
-        page=page,
-        page_size=page_size,
-        q=q,
-        date_from=date_from,
-        date_to=date_to,
-        order=order,
-        tags_any=any_list,
-        tags_all=all_list,
+    # 사용자별 페이지 캐시: (etag, body, next_cursor). 키에 일기 버전이 들어가 쓰기 후엔 miss
+    key = await list_page_key(
+        user, page, page_size, q, date_from, date_to, order,
+        tuple(any_list or ()), tuple(all_list or ()), cursor,
     )
-
-    # 필요시 관계 로드
-    for d in diaries:
+    cached = get_list_page(key)
+    if cached is None:
         try:
-            _ = [t.name for t in d.tags]
-        except Exception:
-            await d.fetch_related("tags")
+            rows = await list_diary_rows(
+                user=user,
+                page=page,
+                page_size=page_size,
+                q=q,
+                date_from=date_from,
+                date_to=date_to,
+                order=order,
+                tags_any=any_list,
+                tags_all=all_list,
+                cursor=cursor,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # 다음 페이지 커서 (마지막 페이지면 헤더 없음)
+        next_cursor = encode_cursor(rows[-1]) if len(rows) == page_size else None
+        body = encode_diary_rows(rows)
+        cached = (make_etag(body), body, next_cursor)
+        set_list_page(key, cached)
+
+    etag, body, next_cursor = cached
+    headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if etag_matches(if_none_match, etag):
+        return not_modified(headers)
+    return FastJSONResponse(body, headers=headers)
+
+
+# 전문검색 (관련도순, 접두어 매칭)
+@router.get("/search", response_model=List[dict])
+async def search_diaries_api(
+    q: str = Query(..., min_length=1, description="검색어(단어별 접두어 AND 매칭)"),
+    limit: int = Query(20, ge=1, le=100),
+    user=Depends(get_current_user),
+):
+    diaries = await search_diaries(user, q, limit)
+    return FastJSONResponse([diary_to_dict(d) for d in diaries])
 
-    return [_to_out_dict(d) for d in diaries]
+
+# 기분/감정/키워드 통계 (집계 테이블 diary_stat 에서, 일기 수와 무관)
+_STATS_DEFAULT_SPAN = {
+    "day": dt.timedelta(days=29),
+    "week": dt.timedelta(weeks=11),
+    "month": dt.timedelta(days=365),
+}
+_STATS_MAX_SPAN = dt.timedelta(days=3 * 366)
+
+
+@router.get("/stats", response_model=dict)
+async def diary_stats_api(
+    period: Literal["day", "week", "month"] = Query("day", description="집계 단위 (week 는 월요일 시작)"),
+    date_from: Optional[dt.date] = Query(None, description="시작 날짜 (기본: 기간 단위별 최근 30일/12주/약 1년)"),
+    date_to: Optional[dt.date] = Query(None, description="끝 날짜 (기본: 오늘)"),
+    top_keywords: int = Query(5, ge=1, le=20, description="버킷/합계별 감정 키워드 개수"),
+    user=Depends(get_current_user),
+):
+    date_to = date_to or dt.date.today()
+    date_from = date_from or date_to - _STATS_DEFAULT_SPAN[period]
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be <= date_to")
+    if date_to - date_from > _STATS_MAX_SPAN:
+        raise HTTPException(status_code=400, detail="date range too large")
+    stats = await get_stats(user.id, period, date_from, date_to, top_keywords)
+    return FastJSONResponse(stats, headers={"Cache-Control": _CACHE_CONTROL})
 
 
 # 단건 조회 (mission_3)
 @router.get("/{diary_id}", response_model=dict)
-async def get_diary_api(diary_id: int, user=Depends(get_current_user)):
+async def get_diary_api(
+    diary_id: int,
+    if_none_match: Optional[str] = Header(None),
+    user=Depends(get_current_user),
+):
     diary = await get_diary_by_id_for_user(user, diary_id)
     if not diary:
         raise HTTPException(status_code=404, detail="Diary not found")
-    await diary.fetch_related("tags")
-    return _to_out_dict(diary)
+
+    headers = {"ETag": diary_etag(diary), "Cache-Control": _CACHE_CONTROL}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)  # 직렬화 생략
+    return FastJSONResponse(encode_diary(diary), headers=headers)
 
 
 # 수정 (mission_4)
@@ -118,20 +171,19 @@ async def update_diary_api(
     payload: DiaryUpdate,
     user=Depends(get_current_user),
 ):
-    diary = await get_diary_by_id_for_user(user, diary_id)
+    diary = await get_diary_by_id_for_user(user, diary_id, for_update=True)
     if not diary:
         raise HTTPException(status_code=404, detail="Diary not found")
 
     data = payload.model_dump(exclude_unset=True)
-    diary = await update_diary(diary, data)
-    await diary.fetch_related("tags")
-    return _to_out_dict(diary)
+    diary, tags = await update_diary(diary, data)
+    return FastJSONResponse(encode_diary(diary, tags), headers={"ETag": diary_etag(diary, tags)})
 
 
 # 삭제 (mission_5)
 @router.delete("/{diary_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_diary_api(diary_id: int, user=Depends(get_current_user)):
-    diary = await get_diary_by_id_for_user(user, diary_id)
+    diary = await get_diary_by_id_for_user(user, diary_id, for_update=True)
     if not diary:
         raise HTTPException(status_code=404, detail="Diary not found")
 
@@ -0,0 +1,95 @@
+# app/api/v1/diary/serializers.py
+"""
+Diary 응답 인코더 (diary / ai 엔드포인트 공용).
+
+- 모델 필드는 이미 타입이 맞으므로 getattr/str()/bool() 재변환 없이 바로 dict
+- dict → JSON bytes 는 core.responses.dumps (orjson 우선)
+- 엔드포인트는 FastJSONResponse(bytes)를 반환 → response_model 재검증 생략
+  (문서화된 필드 구성은 그대로 유지)
+- 단건 ETag 는 본문을 만들지 않고 updated_at + 태그 집합으로 계산
+  (태그 외 필드는 저장 시 updated_at 이 같이 바뀜, 태그는 태그 삭제로도 바뀜)
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from app.api.core.responses import dumps, make_etag
+from app.api.models.diary import Diary
+
+
+def _day(v: Any) -> Any:
+    return v.date() if isinstance(v, datetime) else v
+
+
+def _utc_z(v: Optional[datetime]) -> Any:
+    """pydantic(DiaryOut) 직렬화와 같은 표기: UTC 오프셋은 "Z" """
+    if v is None:
+        return None
+    text = v.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _tag_names(d: Diary, tags: Optional[Iterable[str]]) -> list[str]:
+    """태그는 id 순 (목록 행의 태그 조회와 같은 순서)"""
+    if tags is not None:
+        return list(tags)
+    return [t.name for t in sorted(d.tags, key=lambda t: t.id)]
+
+
+def diary_to_dict(d: Diary, tags: Optional[Iterable[str]] = None) -> dict[str, Any]:
+    """
+    GET/POST/PATCH /diaries 응답 필드.
+    tags: 태그 이름 (레포의 create/update 반환값, id 순). 없으면 d.tags (prefetch 된 상태여야 함)
+    """
+    return {
+        "id": d.id,
+        "title": d.title,
+        "content": d.content,
+        "mood": d.mood,
+        "date": _day(d.date),
+        "is_private": d.is_private,
+        "tags": _tag_names(d, tags),
+        "created_at": d.created_at,
+        "updated_at": d.updated_at,
+    }
+
+
+def diary_to_ai_dict(d: Diary) -> dict[str, Any]:
+    """/ai 엔드포인트 응답(DiaryOut) 필드 (tags, emotion_keywords 로드된 상태)"""
+    out = diary_to_dict(d)
+    out["ai_summary"] = d.ai_summary
+    out["main_emotion"] = getattr(d, "main_emotion", None)
+    out["emotion_keywords"] = [e.name for e in d.emotion_keywords]
+    # 이전 response_model=DiaryOut 응답과 같은 날짜 표기 유지 (diary 엔드포인트는 "+00:00")
+    out["created_at"] = _utc_z(d.created_at)
+    out["updated_at"] = _utc_z(d.updated_at)
+    return out
+
+
+def encode_diary(d: Diary, tags: Optional[Iterable[str]] = None) -> bytes:
+    return dumps(diary_to_dict(d, tags))
+
+
+def diary_etag(d: Diary, tags: Optional[Iterable[str]] = None) -> str:
+    """GET /diaries/{id} 응답의 강한 ETag (tags 는 diary_to_dict 와 같음)"""
+    joined = "\x1f".join(sorted(_tag_names(d, tags)))
+    return make_etag(f"v1|{d.id}|{d.updated_at.isoformat()}|{joined}".encode())
+
+
+def encode_diary_rows(rows: Iterable[dict]) -> bytes:
+    """diary_repo.list_diary_rows 결과를 그대로 인코딩 (date 만 보정)"""
+    out = []
+    for r in rows:
+        r["date"] = _day(r["date"])
+        out.append(r)
+    return dumps(out)
+
+
+__all__ = [
+    "diary_to_dict",
+    "diary_to_ai_dict",
+    "encode_diary",
+    "encode_diary_rows",
+    "diary_etag",
+]
@@ -9,9 +9,10 @@ from pydantic import SecretStr
 from app.api.core.security import (
     decode_token,
     get_current_user,
-    verify_password,
+    verify_password_async,
     clear_auth_cookies,
-    get_password_hash,
+    get_password_hash_async,
+    invalidate_user_principals,
 )
 from app.api.repositories.token_blacklist_repo import blacklist_jti
 from app.api.repositories.user_repo import (
@@ -39,11 +40,11 @@ async def update_me(payload: UpdateMeRequest, user=Depends(get_current_user)):
     new = data.pop("new_password", None)
     if new is not None:
         cur_plain = cur.get_secret_value() if isinstance(cur, SecretStr) else cur
-        if not cur_plain or not verify_password(cur_plain, user.hashed_password):
+        if not cur_plain or not await verify_password_async(cur_plain, user.hashed_password):
             raise HTTPException(status_code=400, detail="Current password mismatch")
 
         new_plain = new.get_secret_value() if isinstance(new, SecretStr) else new
-        data["hashed_password"] = get_password_hash(new_plain)
+        data["hashed_password"] = await get_password_hash_async(new_plain)
     # ---------------------------
 
     # 허용 필드만 업데이터에 전달
@@ -52,6 +53,8 @@ async def update_me(payload: UpdateMeRequest, user=Depends(get_current_user)):
 
     if filtered:
         await update_user_by_id(user.id, **filtered)
+        # 캐시에 남은 이전 User 스냅샷 제거
+        invalidate_user_principals(user.id)
         user = await get_user_by_id(user.id)
 
     return UserOut.model_validate(user)
@@ -79,6 +82,7 @@ async def delete_me(request: Request, response: Response, user=Depends(get_curre
         except Exception:
             pass
 
-    await delete_user(user.id)
+    await delete_user(user)
+    invalidate_user_principals(user.id)
     clear_auth_cookies(response)
     return MessageResponse(message="Deleted successfully")
@@ -1,29 +1,56 @@
 # app/main.py
-from fastapi import FastAPI
+import hmac
+
+from fastapi import FastAPI, Header, HTTPException, Response
 from app.api.v1 import api_router as v1_router
 from app.api.db.database import init_db, close_db
-from app.api.repositories.token_blacklist_repo import purge_expired
+from app.api.core import metrics
+from app.api.core.config import settings
+from app.api.core.jwt_keys import get_keyring
+from app.api.core.ratelimit import close_login_limiter
+from app.api.core.security import shutdown_hash_pool
+from app.api.repositories.token_blacklist_repo import (
+    rebuild_filter,
+    start_filter_refresh,
+    stop_filter_refresh,
+)
+from app.api.services.ai_jobs import start_worker, stop_worker
+from app.api.services.maintenance import start_maintenance, stop_maintenance
+from app.api.services.ai_provider import close_ai
 
 app = FastAPI(title="FastAPI Mini Project")
 
 # ── startup ─────────────────────────────────────────────
 @app.on_event("startup")
 async def on_startup() -> None:
+    # JWT 서명/검증 키 파싱 (설정이 잘못됐으면 기동 실패)
+    get_keyring()
     await init_db()
     try:
-        # 만료된 블랙리스트 먼저 정리 (있어도 되고 없어도 됨)
-        await purge_expired()
+        # 블랙리스트 Bloom filter 적재 (실패 시 첫 조회 때 다시 시도)
+        await rebuild_filter()
     except Exception:
-        # 실패해도 앱이 뜨도록 무시
         pass
+    # 주기적 필터 재구성(만료분 정리)은 요청 경로 밖에서
+    start_filter_refresh()
+    # AI 백그라운드 작업 워커 (ai_job 테이블)
+    await start_worker()
+    # 만료 토큰 주기 정리 (여러 워커 중 lease 잡은 하나만, 기동 직후 한 번 포함)
+    start_maintenance()
 
 # ── shutdown ────────────────────────────────────────────
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
+    await stop_worker()
+    await stop_maintenance()
+    await stop_filter_refresh()
+    await close_ai()
+    await close_login_limiter()
     try:
         await close_db()  # close_db가 sync면 await 제거
     except Exception:
         pass
+    shutdown_hash_pool()
 
 # ── 라우팅 ──────────────────────────────────────────────
 app.include_router(v1_router, prefix="/api/v1")
@@ -33,6 +60,22 @@ app.include_router(v1_router, prefix="/api/v1")
 async def root():
     return {"message": "Hello, FastAPI + Tortoise + asyncpg!"}
 
+# ── JWT 검증 키 (다른 서비스의 로컬 검증용, HS256 이면 빈 목록) ──
+@app.get("/.well-known/jwks.json")
+async def jwks(response: Response):
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return get_keyring().jwks()
+
+# ── 메트릭(워커별 in-process 값, METRICS_TOKEN 있어야 열림) ──
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: str | None = Header(None)):
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not hmac.compare_digest((authorization or "").encode(), expected):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    return metrics.snapshot()
+
 # ── 로컬 실행 ───────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
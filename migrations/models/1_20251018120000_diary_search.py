@@ -0,0 +1,15 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE EXTENSION IF NOT EXISTS btree_gin;
+CREATE INDEX IF NOT EXISTS "idx_diary_search_user_tsv" ON "diary" USING GIN (
+    "user_id",
+    to_tsvector('simple', coalesce("title", '') || ' ' || coalesce("content", ''))
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_diary_search_user_tsv";"""
@@ -0,0 +1,30 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "diary" ADD "main_emotion" VARCHAR(20);
+CREATE TABLE IF NOT EXISTS "ai_job" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "kind" VARCHAR(16) NOT NULL,
+    "params" JSONB NOT NULL,
+    "status" VARCHAR(16) NOT NULL DEFAULT 'queued',
+    "attempts" INT NOT NULL DEFAULT 0,
+    "max_attempts" INT NOT NULL DEFAULT 3,
+    "run_after" TIMESTAMPTZ NOT NULL,
+    "locked_at" TIMESTAMPTZ,
+    "last_error" TEXT,
+    "result" JSONB,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "finished_at" TIMESTAMPTZ,
+    "diary_id" INT NOT NULL REFERENCES "diary" ("id") ON DELETE CASCADE,
+    "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS "idx_ai_job_status_run_after" ON "ai_job" ("status", "run_after");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "ai_job";
+        ALTER TABLE "diary" DROP COLUMN IF EXISTS "main_emotion";"""
@@ -0,0 +1,21 @@
+from tortoise import BaseDBAsyncClient
+
+
+# 기존 일기는 올린 뒤 한 번 채울 것: python -m app.api.scripts.rebuild_diary_stats
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "diary_stat" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "period" VARCHAR(8) NOT NULL,
+    "period_start" DATE NOT NULL,
+    "dimension" VARCHAR(16) NOT NULL,
+    "value" VARCHAR(50) NOT NULL DEFAULT '',
+    "count" INT NOT NULL DEFAULT 0,
+    "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_diary_stat_user_id_period_dim" UNIQUE ("user_id", "period", "period_start", "dimension", "value")
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "diary_stat";"""
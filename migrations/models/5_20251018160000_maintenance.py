@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "maintenance_lease" (
+    "name" VARCHAR(64) NOT NULL PRIMARY KEY,
+    "owner" VARCHAR(128) NOT NULL DEFAULT '',
+    "expires_at" TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS "idx_token_blacklist_expires_at" ON "token_blacklist" ("expires_at");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_token_blacklist_expires_at";
+        DROP TABLE IF EXISTS "maintenance_lease";"""
@@ -0,0 +1,21 @@
+from tortoise import BaseDBAsyncClient
+
+
+# 배포 전 발급된 refresh 토큰(fam 클레임 없음)은 첫 회전 때 family 로 옮겨짐 (REFRESH_TOKEN_DAYS 뒤엔 없음)
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "refresh_token_family" (
+    "id" VARCHAR(64) NOT NULL PRIMARY KEY,
+    "generation" INT NOT NULL DEFAULT 0,
+    "revoked_at" TIMESTAMPTZ,
+    "expires_at" TIMESTAMPTZ NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS "idx_refresh_token_family_expires_at" ON "refresh_token_family" ("expires_at");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "refresh_token_family";"""
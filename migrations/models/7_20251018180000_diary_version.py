@@ -0,0 +1,12 @@
+from tortoise import BaseDBAsyncClient
+
+
+# 목록 캐시 키: 일기 집계(Count/Max) 대신 users 행의 버전 하나 (쓰기 트랜잭션에서 +1)
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "users" ADD COLUMN IF NOT EXISTS "diary_version" BIGINT NOT NULL DEFAULT 0;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "users" DROP COLUMN IF EXISTS "diary_version";"""
@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+
+# 일기·종류당 대기/실행 중 작업 하나 (ai_jobs.enqueue). 이미 겹쳐 있는 것은 최신 하나만 남기고 failed 처리
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        UPDATE "ai_job" AS j SET "status" = 'failed', "last_error" = 'superseded', "finished_at" = CURRENT_TIMESTAMP
+WHERE j."status" IN ('queued', 'running') AND EXISTS (
+    SELECT 1 FROM "ai_job" n
+    WHERE n."diary_id" = j."diary_id" AND n."kind" = j."kind"
+      AND n."status" IN ('queued', 'running') AND n."id" > j."id"
+);
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_ai_job_active" ON "ai_job" ("diary_id", "kind")
+WHERE "status" IN ('queued', 'running');"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "uid_ai_job_active";"""
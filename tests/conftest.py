@@ -17,6 +17,8 @@ def _test_settings():
     settings.COOKIE_SECURE = False
     settings.ACCESS_TOKEN_MINUTES = 5
     settings.REFRESH_TOKEN_DAYS = 1
+    settings.AI_JOB_WORKER_ENABLED = False  # 작업은 테스트에서 claim()/run_job() 으로 직접 실행
+    settings.MAINTENANCE_ENABLED = False    # 정리는 테스트에서 run_maintenance() 로 직접 실행
 
 
 @pytest.fixture(scope="session")
@@ -42,4 +44,24 @@ def _reset_inmemory_repos_between_tests():
         from app.api.repositories.memory.token_blacklist_repo import _reset as bl_reset
         bl_reset()
     except Exception:
-        pass
\ No newline at end of file
+        pass
+    try:
+        from app.api.core.security import _principal_cache
+        _principal_cache.clear()
+    except Exception:
+        pass
+    try:
+        from app.api.repositories.diary_repo import _list_pages
+        _list_pages.clear()
+    except Exception:
+        pass
+    try:
+        from app.api.services.ai_cache import _memory as ai_memory
+        ai_memory.clear()
+    except Exception:
+        pass
+    try:
+        from app.api.core.ratelimit import get_login_limiter
+        get_login_limiter().reset()
+    except Exception:
+        pass
@@ -0,0 +1,82 @@
+# tests/fake_gemini.py
+"""
+Gemini generateContent / streamGenerateContent(SSE) 를 흉내 내는 로컬 ASGI 서버 (httpx.ASGITransport 로 연결).
+
+    fake = FakeGemini(reply=lambda prompt, json_mode: "...", delay=0.05)
+    ai = GeminiAI("test-key", transport=fake.transport())
+
+calls: 받은 (프롬프트, json 모드) / max_active: 동시에 처리 중이던 요청 수 최대값
+스트리밍은 reply 를 단어 단위 조각으로 나눠 보내고 마지막에 텍스트 없는 finishReason 조각
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from typing import Callable, List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+
+def default_reply(prompt: str, json_mode: bool) -> str:
+    if json_mode:
+        return '{"emotion": "positive", "keywords": ["행복", "산책"]}'
+    return "요약: " + prompt.strip().splitlines()[-1][:40]
+
+
+class FakeGemini:
+    def __init__(
+        self,
+        reply: Optional[Callable[[str, bool], str]] = None,
+        delay: float = 0.0,
+    ) -> None:
+        self.reply = reply or default_reply
+        self.delay = delay
+        self.calls: List[Tuple[str, bool]] = []
+        self.active = 0
+        self.max_active = 0
+        self.app = FastAPI()
+
+        @self.app.post("/v1beta/models/{model}:generateContent")
+        async def generate(model: str, request: Request, x_goog_api_key: str = Header(None)):
+            if not x_goog_api_key:
+                raise HTTPException(status_code=403, detail="API key missing")
+            body = await request.json()
+            prompt = body["contents"][0]["parts"][0]["text"]
+            json_mode = body["generationConfig"].get("responseMimeType") == "application/json"
+            self.calls.append((prompt, json_mode))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            try:
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                text = self.reply(prompt, json_mode)
+            finally:
+                self.active -= 1
+            return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+        @self.app.post("/v1beta/models/{model}:streamGenerateContent")
+        async def stream(model: str, request: Request, alt: str = "", x_goog_api_key: str = Header(None)):
+            if not x_goog_api_key:
+                raise HTTPException(status_code=403, detail="API key missing")
+            if alt != "sse":
+                raise HTTPException(status_code=400, detail="alt=sse required")
+            body = await request.json()
+            prompt = body["contents"][0]["parts"][0]["text"]
+            self.calls.append((prompt, False))
+            pieces = re.findall(r"\S+\s*", self.reply(prompt, False))
+
+            async def events():
+                for piece in pieces:
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    chunk = {"candidates": [{"content": {"role": "model", "parts": [{"text": piece}]}}]}
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\r\n\r\n"
+                yield 'data: {"candidates": [{"finishReason": "STOP"}]}\r\n\r\n'
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+    def transport(self) -> httpx.ASGITransport:
+        return httpx.ASGITransport(app=self.app)
@@ -1,5 +1,8 @@
 # tests/helpers.py
 from __future__ import annotations
+import logging
+from contextlib import contextmanager
+
 import httpx
 
 async def _register(
@@ -47,3 +50,36 @@ async def _login_cookie(
     )
     assert res.status_code == 200, f"login cookie failed: {res.status_code} {res.text}"
     return res
+
+
+class _QueryLog(logging.Handler):
+    """tortoise.db_client 로거가 남기는 실행 쿼리 로그를 수집"""
+
+    def __init__(self) -> None:
+        super().__init__(logging.DEBUG)
+        self.queries: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.queries.append(str(record.args[0]) if record.args else record.getMessage())
+
+
+@contextmanager
+def count_queries():
+    """
+    블록 안에서 실행된 SQL 목록을 수집.
+        with count_queries() as queries:
+            ...
+        assert len(queries) == 2, queries
+    """
+    logger = logging.getLogger("tortoise.db_client")
+    handler = _QueryLog()
+    prev_level, prev_disabled = logger.level, logger.disabled
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.disabled = False
+    try:
+        yield handler.queries
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(prev_level)
+        logger.disabled = prev_disabled
@@ -0,0 +1,466 @@
+# tests/test_ai.py
+import pytest
+from .helpers import _register, _login_bearer
+from app.api.services.ai_provider import RuleBasedAI
+
+
+class _CountingAI(RuleBasedAI):
+    def __init__(self):
+        self.calls = 0
+
+    async def summarize(self, title, content, max_sentences=2):
+        self.calls += 1
+        return await super().summarize(title, content, max_sentences)
+
+    async def analyze(self, text):
+        self.calls += 1
+        return await super().analyze(text)
+
+
+# 같은 내용이면 provider 재호출 없음 (메모리 → DB 순), 내용이 바뀌면 다시 호출
+@pytest.mark.anyio
+async def test_ai_results_are_cached_by_content(client, monkeypatch):
+    from app.api.services import ai_cache
+    from app.api.v1.ai import endpoints
+
+    fake = _CountingAI()
+    monkeypatch.setattr(endpoints, "ai", fake)
+
+    await _register(client, email="ai@example.com")
+    _, _, headers = await _login_bearer(client, email="ai@example.com")
+    r = await client.post(
+        "/api/v1/diaries", json={"title": "행복", "content": "오늘은 행복했다. 정말 좋다."}, headers=headers
+    )
+    diary_id = r.json()["id"]
+
+    first = await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?background=false", headers=headers)
+    second = await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?background=false", headers=headers)
+    assert first.json()["ai_summary"] == second.json()["ai_summary"]
+    assert fake.calls == 1
+
+    # 메모리 단이 비어도(재시작) DB 단에서
+    ai_cache._memory.clear()
+    await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?background=false", headers=headers)
+    assert fake.calls == 1
+
+    a1 = await client.post(f"/api/v1/ai/diaries/{diary_id}/analyze?background=false", headers=headers)
+    a2 = await client.post(f"/api/v1/ai/diaries/{diary_id}/analyze?background=false&top_k=1", headers=headers)
+    assert fake.calls == 2
+    assert a2.json()["emotion_keywords"] == a1.json()["emotion_keywords"][:1]
+
+    await client.patch(f"/api/v1/diaries/{diary_id}", json={"content": "다른 내용"}, headers=headers)
+    await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?background=false", headers=headers)
+    assert fake.calls == 3
+
+
+class _EmptyAnalysisAI(_CountingAI):
+    async def analyze(self, text):
+        self.calls += 1
+        return "neutral", []
+
+
+# 키워드 없는 분석(파싱 실패 대체값일 수 있음)은 캐시하지 않고 다음에 다시 호출
+@pytest.mark.anyio
+async def test_empty_analysis_is_not_cached(client):
+    from app.api.models.ai_result import AIResult
+    from app.api.services.ai_cache import cached_analyze
+
+    fake = _EmptyAnalysisAI()
+    assert await cached_analyze(fake, "??") == ("neutral", [])
+    assert await cached_analyze(fake, "??") == ("neutral", [])
+    assert fake.calls == 2
+    assert await AIResult.filter(kind="analysis").count() == 0
+
+
+class _FailingAI(RuleBasedAI):
+    async def summarize(self, title, content, max_sentences=2):
+        raise RuntimeError("provider down")
+
+
+# 기본(background 생략) → 202 + Location, 같은 작업 중복 등록 없음(동시 요청도), claim/run_job 으로 실행 후 상태 조회
+@pytest.mark.anyio
+async def test_background_job_enqueue_run_and_status(client):
+    import asyncio
+    from datetime import datetime, timezone
+    from tortoise.exceptions import IntegrityError
+    from app.api.models import Diary
+    from app.api.models.ai_job import AIJob
+    from app.api.services import ai_jobs
+
+    await _register(client, email="job@example.com")
+    _, _, headers = await _login_bearer(client, email="job@example.com")
+    r = await client.post(
+        "/api/v1/diaries", json={"title": "행복", "content": "오늘은 행복했다. 정말 좋다."}, headers=headers
+    )
+    diary_id = r.json()["id"]
+
+    r = await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize", headers=headers)
+    assert r.status_code == 202
+    job = r.json()
+    assert job["status"] == "queued" and r.headers["location"] == f"/api/v1/ai/jobs/{job['id']}"
+    again = await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?background=true", headers=headers)
+    assert again.json()["id"] == job["id"]
+
+    assert await ai_jobs.claim(job["id"])
+    assert not await ai_jobs.claim(job["id"])  # 이미 running
+    await ai_jobs.run_job(job["id"])
+
+    r = await client.get(f"/api/v1/ai/jobs/{job['id']}", headers=headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["status"] == "succeeded" and body["attempts"] == 1
+    assert body["result"]["ai_summary"]
+    assert (await Diary.get(id=diary_id)).ai_summary == body["result"]["ai_summary"]
+
+    # 동시에 들어와도 대기/실행 중 작업은 하나 (부분 유니크 인덱스), 대기 중이면 params 는 마지막 요청 값
+    url = f"/api/v1/ai/diaries/{diary_id}/analyze"
+    rs = await asyncio.gather(*(client.post(f"{url}?top_k={k}", headers=headers) for k in (2, 2, 2, 2)))
+    assert {r.status_code for r in rs} == {202} and len({r.json()["id"] for r in rs}) == 1
+    r = await client.post(f"{url}?top_k=3", headers=headers)
+    assert r.json()["id"] == rs[0].json()["id"]
+    assert (await AIJob.get(id=r.json()["id"])).params == {"top_k": 3, "overwrite": True}
+    assert await AIJob.filter(diary_id=diary_id, kind="analyze").count() == 1
+    with pytest.raises(IntegrityError):
+        diary = await Diary.get(id=diary_id)
+        await AIJob.create(user_id=diary.user_id, diary=diary, kind="analyze", run_after=datetime.now(timezone.utc))
+
+    # 다른 사용자의 작업은 404
+    await _register(client, email="other-job@example.com")
+    _, _, other = await _login_bearer(client, email="other-job@example.com")
+    assert (await client.get(f"/api/v1/ai/jobs/{job['id']}", headers=other)).status_code == 404
+
+
+# 실패 → backoff 후 재대기, max_attempts 넘으면 failed / lease 만료된 running 은 다시 queued
+@pytest.mark.anyio
+async def test_background_job_retry_backoff_and_lease_reclaim(client, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+    from app.api.core.config import settings
+    from app.api.models import Diary, User
+    from app.api.models.ai_job import AIJob
+    from app.api.services import ai_jobs, ai_provider
+
+    monkeypatch.setattr(ai_provider, "ai", _FailingAI())
+    monkeypatch.setattr(settings, "AI_JOB_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "AI_JOB_BACKOFF_SECONDS", 10.0)
+
+    user = await User.create(email="retry@example.com", name="r", hashed_password="x")
+    diary = await Diary.create(user=user, title="t", content="c")
+    job = await ai_jobs.enqueue(user, diary, "summarize")
+
+    before = datetime.now(timezone.utc)
+    assert await ai_jobs.claim(job.id)
+    await ai_jobs.run_job(job.id)
+    job = await AIJob.get(id=job.id)
+    assert job.status == "queued" and job.attempts == 1
+    assert "provider down" in job.last_error
+    assert job.run_after >= before + timedelta(seconds=8)  # 10s ±20%
+
+    assert await ai_jobs.claim(job.id)
+    await ai_jobs.run_job(job.id)
+    job = await AIJob.get(id=job.id)
+    assert job.status == "failed" and job.attempts == 2 and job.finished_at is not None
+
+    # 워커가 죽어 running 으로 남은 작업
+    stuck = await ai_jobs.enqueue(user, diary, "analyze")
+    assert await ai_jobs.claim(stuck.id)
+    assert await ai_jobs.reclaim_expired() == 0
+    await AIJob.filter(id=stuck.id).update(
+        locked_at=datetime.now(timezone.utc) - timedelta(seconds=settings.AI_JOB_LEASE_SECONDS + 1)
+    )
+    assert await ai_jobs.reclaim_expired() == 1
+    stuck = await AIJob.get(id=stuck.id)
+    assert stuck.status == "queued" and stuck.locked_at is None
+
+    assert 1.6 <= ai_jobs.backoff_seconds(1) / settings.AI_JOB_BACKOFF_SECONDS * 2 <= 2.4
+    assert ai_jobs.backoff_seconds(20) <= settings.AI_JOB_BACKOFF_MAX_SECONDS * 1.2
+
+
+class _BatchCountingAI(RuleBasedAI):
+    batch_size = 2
+
+    def __init__(self):
+        self.batches = []
+
+    async def analyze_many(self, texts):
+        self.batches.append(len(texts))
+        return await super().analyze_many(texts)
+
+
+# 일괄 분석: 미분석 일기만, batch_size 씩 묶어 호출, main_emotion/키워드 일괄 저장 + 처리량 보고
+@pytest.mark.anyio
+async def test_bulk_analyze_unanalyzed_diaries(client, monkeypatch):
+    from app.api.models import Diary
+    from app.api.v1.ai import endpoints
+
+    fake = _BatchCountingAI()
+    monkeypatch.setattr(endpoints, "ai", fake)
+
+    await _register(client, email="bulk@example.com")
+    _, _, headers = await _login_bearer(client, email="bulk@example.com")
+    ids = []
+    for i, body in enumerate(["행복 좋다 최고", "우울 슬픔 비", "산책 공원 행복", "그냥 평범", "분석됨"]):
+        r = await client.post("/api/v1/diaries", json={"title": f"d{i}", "content": body}, headers=headers)
+        ids.append(r.json()["id"])
+    await Diary.filter(id=ids[-1]).update(main_emotion="negative")
+
+    r = await client.post("/api/v1/ai/diaries/analyze-bulk?top_k=2", headers=headers)
+    assert r.status_code == 200
+    report = r.json()
+    assert report["selected"] == 4 and report["analyzed"] == 4 and report["failed"] == 0
+    assert report["batches"] == 2 and report["diaries_per_second"] > 0
+    assert fake.batches == [2, 2]
+
+    rows = {d.id: d for d in await Diary.filter(id__in=ids).prefetch_related("emotion_keywords")}
+    assert rows[ids[0]].main_emotion == "positive"
+    assert rows[ids[1]].main_emotion == "negative"
+    assert rows[ids[-1]].main_emotion == "negative"  # 이미 분석된 일기는 대상 아님
+    assert len(rows[ids[0]].emotion_keywords) == 2
+    expected = (await RuleBasedAI().analyze("d2\n산책 공원 행복"))[1][:2]
+    assert sorted(k.name for k in rows[ids[2]].emotion_keywords) == sorted(expected)
+
+    # 다시 돌리면 대상 없음 / only_unanalyzed=false 면 캐시에서 (provider 호출 없음)
+    r = await client.post("/api/v1/ai/diaries/analyze-bulk", headers=headers)
+    assert r.json()["selected"] == 0
+    r = await client.post("/api/v1/ai/diaries/analyze-bulk?only_unanalyzed=false&overwrite=false", headers=headers)
+    assert r.json()["analyzed"] == 5 and fake.batches == [2, 2, 1]
+
+
+class _FixedAI(RuleBasedAI):
+    def __init__(self, emotion, keywords):
+        self.result = (emotion, keywords)
+
+    async def analyze(self, text):
+        return self.result
+
+
+# analyze 저장은 잠근 행 기준 한 트랜잭션: 옛 객체로 동시에 돌아도 통계 = 재계산, 키워드는 마지막 결과
+@pytest.mark.anyio
+async def test_concurrent_analyze_keeps_stats_consistent(client):
+    import asyncio
+    from app.api.models import Diary, DiaryStat
+    from app.api.repositories.diary_stats_repo import rebuild_stats
+    from app.api.services.ai_enrich import analyze_diary
+
+    await _register(client, email="race@example.com")
+    _, _, headers = await _login_bearer(client, email="race@example.com")
+    r = await client.post("/api/v1/diaries", json={"title": "t", "content": "c", "date": "2025-09-01"}, headers=headers)
+    diary_id = r.json()["id"]
+
+    # 둘 다 분석 전 상태(main_emotion=None, 키워드 없음)의 객체를 들고 시작
+    stale = [await Diary.get(id=diary_id), await Diary.get(id=diary_id)]
+    results = await asyncio.gather(
+        analyze_diary(_FixedAI("positive", ["햇살", "산책"]), stale[0]),
+        analyze_diary(_FixedAI("negative", ["비"]), stale[1], overwrite=False),
+    )
+    assert all(d.id == diary_id for d in results)
+
+    diary = await Diary.get(id=diary_id).prefetch_related("emotion_keywords")
+    assert diary.main_emotion == "negative"
+    assert sorted(k.name for k in diary.emotion_keywords) == ["비", "산책", "햇살"]
+
+    async def snapshot():
+        return sorted(
+            await DiaryStat.filter(count__gt=0).values_list("period", "period_start", "dimension", "value", "count")
+        )
+    incremental = await snapshot()
+    await rebuild_stats()
+    assert await snapshot() == incremental
+
+
+# Gemini: httpx 비동기 호출(가짜 서버), 같은 프롬프트 동시 요청은 1번으로, 동시 요청 수 제한
+@pytest.mark.anyio
+async def test_gemini_client_coalesces_and_limits_concurrency():
+    import asyncio
+    from app.api.services.ai_provider import GeminiAI
+    from .fake_gemini import FakeGemini
+
+    fake = FakeGemini(delay=0.05)
+    ai = GeminiAI("test-key", transport=fake.transport(), max_concurrency=2)
+    try:
+        summaries = await asyncio.gather(*(ai.summarize("제목", "같은 내용") for _ in range(5)))
+        assert len(set(summaries)) == 1 and summaries[0].startswith("요약:")
+        assert len(fake.calls) == 1
+
+        await asyncio.gather(*(ai.summarize("제목", f"내용 {i}") for i in range(6)))
+        assert len(fake.calls) == 7
+        assert fake.max_active == 2
+
+        assert await ai.analyze("오늘 행복") == ("positive", ["행복", "산책"])
+        assert fake.calls[-1][1] is True  # JSON 모드
+
+        # 마크다운에 감싼 JSON 은 같은 응답에서 파싱 (재요청 없음)
+        fake.reply = lambda prompt, json_mode: '```json\n{"emotion": "negative", "keywords": ["빗소리"]}\n```'
+        before = len(fake.calls)
+        assert await ai.analyze("비 오는 날") == ("negative", ["빗소리"])
+        assert len(fake.calls) == before + 1
+
+        # 여러 일기를 프롬프트 하나로
+        fake.reply = lambda prompt, json_mode: (
+            '{"results": [{"i": 0, "emotion": "positive", "keywords": ["맑음"]},'
+            ' {"i": 1, "emotion": "neutral", "keywords": ["회의"]}]}'
+        )
+        before = len(fake.calls)
+        assert await ai.analyze_many(["맑은 날", "회의 많은 날"]) == [
+            ("positive", ["맑음"]), ("neutral", ["회의"]),
+        ]
+        assert len(fake.calls) == before + 1
+    finally:
+        await ai.aclose()
+
+
+# provider 체인: 마감 초과 → rule-based 폴백(캐시 안 함), 연속 실패 → 브레이커 open → half-open 시험 후 closed
+@pytest.mark.anyio
+async def test_provider_chain_deadline_breaker_and_metrics(client):
+    import asyncio
+    from fastapi import HTTPException
+    from app.api.core import metrics
+    from app.api.models.ai_result import AIResult
+    from app.api.services import ai_chain
+    from app.api.services.ai_cache import cached_summarize
+    from app.api.services.ai_provider import GeminiAI
+    from .fake_gemini import FakeGemini
+
+    fake = FakeGemini(delay=0.2)
+    gemini = GeminiAI("test-key", model_name="fake-model", transport=fake.transport())
+    chain = ai_chain.ProviderChain(
+        [gemini, RuleBasedAI()], deadline=0.05, breaker_failures=2, breaker_reset_seconds=0.1
+    )
+    breaker = chain.breakers[0]
+    try:
+        # 느림 → 마감에서 끊고 폴백, 폴백 결과는 영구 캐시에 안 남음
+        summary = await cached_summarize(chain, "제목", "내용입니다.")
+        assert summary == await RuleBasedAI().summarize("제목", "내용입니다.")
+        assert ai_chain.degraded()
+        assert await AIResult.filter(kind="summary").count() == 0
+
+        def unavailable(prompt, json_mode):
+            raise HTTPException(status_code=503)
+
+        fake.delay, fake.reply = 0.0, unavailable
+        await chain.summarize("t", "c2")
+        assert breaker.state == ai_chain.OPEN
+        calls = len(fake.calls)
+        await chain.summarize("t", "c3")  # open: Gemini 호출 없이 바로 폴백
+        assert len(fake.calls) == calls
+
+        await asyncio.sleep(0.12)
+        fake.reply = lambda prompt, json_mode: "gemini 요약"
+        assert await chain.summarize("t", "c4") == "gemini 요약"
+        assert breaker.state == ai_chain.CLOSED and not ai_chain.degraded()
+
+        snap = metrics.snapshot()
+        assert snap["ai.provider.fake-model.timeouts"] >= 1
+        assert snap["ai.provider.fake-model.errors"] >= 1
+        assert snap["ai.provider.fake-model.short_circuited"] >= 1
+        assert snap["ai.provider.fake-model.latency_ms"]["count"] >= 1
+        assert snap["ai.provider.rule-based.latency_ms"]["count"] >= 3
+        assert snap["ai.chain.fallbacks"] >= 3
+    finally:
+        await chain.aclose()
+
+
+# RuleBasedAI.analyze_many: 묶음 처리(numpy/순수 파이썬 둘 다)가 analyze 한 건씩과 결과가 같음
+@pytest.mark.anyio
+async def test_rule_based_analyze_many_matches_analyze(monkeypatch):
+    import random
+    from app.api.services import ai_rules
+
+    vocab = [
+        "좋다", "행복", "우울", "짜증", "Good", "BAD", "love", "hate", "산책", "커피", "친구와",
+        "#일기", "@친구", "2025", "a", "가", "x1", "İstanbul", "ΣΑΣ", "😀", "é", "\x00", "",
+    ]
+    rng = random.Random(7)
+    texts = [
+        " ".join(rng.choice(vocab) + rng.choice(["", ".", ",", "!", "…"]) for _ in range(rng.randint(0, 40)))
+        for _ in range(300)
+    ]
+    texts += ["", "   ", "a b c", "좋다 나쁘 좋다 나쁘", "tie1 tie2 tie3 tie4 tie2 tie3"]
+    ai = RuleBasedAI()
+    expected = [await ai.analyze(t) for t in texts]
+
+    # NUL(텍스트 경계와 겹침) / 소문자화로 길어지는 문자(İ)가 섞인 묶음은 한 건씩으로 폴백
+    clean = [t.replace("\x00", " ").replace("İ", "I") for t in texts]
+    clean_expected = [await ai.analyze(t) for t in clean]
+    assert await ai.analyze_many(texts) == expected
+    assert await ai.analyze_many(clean) == clean_expected
+    if ai_rules.np is not None:
+        assert ai._lexicon._analyze_arrays(clean) == clean_expected
+    assert await ai.analyze_many(clean[:5]) == clean_expected[:5]
+    assert await ai.analyze_many([]) == []
+
+    monkeypatch.setattr(ai_rules, "np", None)
+    assert await ai.analyze_many(texts) == expected
+
+
+def _sse(body: str):
+    """text/event-stream 본문 → [(event, data dict)]"""
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+# 요약 스트리밍(SSE): token 조각들 → done, 끝나면 ai_summary 저장, 두 번째는 캐시에서 한 조각
+@pytest.mark.anyio
+async def test_summarize_stream_sse(client):
+    from app.api.models import Diary
+
+    await _register(client, email="stream@example.com")
+    _, _, headers = await _login_bearer(client, email="stream@example.com")
+    r = await client.post(
+        "/api/v1/diaries",
+        json={"title": "산책", "content": "공원을 한참 걸었다. 바람이 시원했다. 저녁엔 책을 읽었다."},
+        headers=headers,
+    )
+    diary_id = r.json()["id"]
+
+    r = await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?stream=true", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = _sse(r.text)
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert len(tokens) > 1
+    assert events[-1][0] == "done"
+    expected = await RuleBasedAI().summarize("산책", "공원을 한참 걸었다. 바람이 시원했다. 저녁엔 책을 읽었다.")
+    assert "".join(tokens) == expected == events[-1][1]["ai_summary"]
+    assert (await Diary.get(id=diary_id)).ai_summary == expected
+
+    r = await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?stream=true", headers=headers)
+    assert [e for e, _ in _sse(r.text)] == ["token", "done"]
+
+    r = await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?stream=true&background=true", headers=headers)
+    assert r.status_code == 400
+    r = await client.post("/api/v1/ai/diaries/999999/summarize?stream=true", headers=headers)
+    assert r.status_code == 404
+
+
+# Gemini streamGenerateContent 조각 전달 + 체인: 첫 조각 전 실패면 rule-based 스트림으로 폴백
+@pytest.mark.anyio
+async def test_gemini_summarize_stream_and_chain_fallback():
+    from fastapi import HTTPException
+    from app.api.services import ai_chain
+    from app.api.services.ai_provider import GeminiAI
+    from .fake_gemini import FakeGemini
+
+    fake = FakeGemini(reply=lambda prompt, json_mode: "오늘은 공원을 걸었다. 기분이 좋았다.")
+    gemini = GeminiAI("test-key", model_name="fake-stream", transport=fake.transport())
+    chain = ai_chain.ProviderChain([gemini, RuleBasedAI()], deadline=1.0)
+    try:
+        pieces = [p async for p in gemini.summarize_stream("제목", "내용")]
+        assert len(pieces) == 5 and "".join(pieces) == "오늘은 공원을 걸었다. 기분이 좋았다."
+
+        pieces = [p async for p in chain.summarize_stream("제목", "내용")]
+        assert "".join(pieces) == "오늘은 공원을 걸었다. 기분이 좋았다." and not ai_chain.degraded()
+
+        def unavailable(prompt, json_mode):
+            raise HTTPException(status_code=503)
+
+        fake.reply = unavailable
+        pieces = [p async for p in chain.summarize_stream("제목", "내용입니다. 둘째 문장.")]
+        assert "".join(pieces) == await RuleBasedAI().summarize("제목", "내용입니다. 둘째 문장.")
+        assert ai_chain.degraded()
+    finally:
+        await chain.aclose()
@@ -26,7 +26,7 @@ async def test_login_sets_cookies_when_as_cookie_true(client):
 async def test_refresh_cookie_rotation_and_blacklist(client):
     """
     1) 쿠키 로그인 -> refresh_token 쿠키 획득
-    2) /refresh 호출 -> 새 쿠키 발급 + 이전 refresh는 블랙리스트
+    2) /refresh 호출 -> 새 쿠키 발급 + family generation 증가 (이전 refresh 무효)
     3) 이전 refresh로 다시 /refresh 호출 시 401
     """
     await _register(client, email="rot@example.com")
@@ -99,4 +99,491 @@ async def test_login_with_nonexistent_email(client):
         json={"email": "no_user@example.com", "password": "DoesNotMatter123!"}
     )
     assert res.status_code == 401
-    assert res.json()["detail"] == "Invalid credentials"
\ No newline at end of file
+    assert res.json()["detail"] == "Invalid credentials"
+
+# principal 캐시: 두 번째 요청부터 hit, 로그아웃하면 즉시 무효화
+@pytest.mark.anyio
+async def test_principal_cache_hit_and_logout_invalidation(client):
+    from app.api.core.security import _principal_cache
+
+    await _register(client, email="cache@example.com")
+    access, refresh, headers = await _login_bearer(client, email="cache@example.com")
+
+    hits_before = _principal_cache.hits.value
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    assert _principal_cache.hits.value == hits_before + 1
+
+    res = await client.post("/api/v1/auth/logout", headers=headers)
+    assert res.status_code == 200
+
+    me = await client.get("/api/v1/users/me", headers=headers)
+    assert me.status_code == 401
+
+
+# /metrics: METRICS_TOKEN 없으면 404, 있으면 Bearer 토큰이 맞아야 열림
+@pytest.mark.anyio
+async def test_metrics_requires_token(client, monkeypatch):
+    from app.api.core.config import settings
+
+    assert (await client.get("/metrics")).status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert (await client.get("/metrics")).status_code == 401
+    assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+    r = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert r.status_code == 200 and "auth.principal_cache.size" in r.json()
+
+
+# 다른 워커가 DB에 직접 넣은 jti도 delta sync 후 블랙리스트로 판정
+@pytest.mark.anyio
+async def test_blacklist_filter_syncs_rows_from_other_workers(client, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+    from app.api.core.config import settings
+    from app.api.models.token_blacklist import TokenBlacklist
+    from app.api.repositories.db import token_blacklist_repo as repo
+
+    monkeypatch.setattr(settings, "BLACKLIST_SYNC_SECONDS", 0)
+    assert await repo.is_blacklisted("jti-from-other-worker") is False
+
+    exp = datetime.now(timezone.utc) + timedelta(minutes=5)
+    await TokenBlacklist.create(jti="jti-from-other-worker", expires_at=exp)
+    assert await repo.is_blacklisted("jti-from-other-worker") is True
+
+
+# 필터가 비어 있을 때 동시에 들어온 조회들은 재구성을 한 번만 (Lock 안에서 재확인)
+@pytest.mark.anyio
+async def test_blacklist_filter_rebuild_is_not_stampeded(client, monkeypatch):
+    import asyncio
+    from app.api.core import metrics
+    from app.api.repositories.db import token_blacklist_repo as repo
+
+    monkeypatch.setattr(repo, "_rebuilt_at", 0.0)
+    before = metrics.snapshot()["blacklist.filter.rebuilds"]
+    results = await asyncio.gather(*(repo.is_blacklisted(f"jti-{i}") for i in range(20)))
+    assert results == [False] * 20
+    assert metrics.snapshot()["blacklist.filter.rebuilds"] == before + 1
+
+
+# 다른 워커에서 로그아웃된 토큰: 이 워커의 principal 캐시에 있어도 sync 후 거부
+@pytest.mark.anyio
+async def test_cached_principal_rejected_after_remote_blacklist(client, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+    from app.api.core.config import settings
+    from app.api.core.security import _principal_cache, decode_token
+    from app.api.models.token_blacklist import TokenBlacklist
+
+    monkeypatch.setattr(settings, "BLACKLIST_SYNC_SECONDS", 0)
+    await _register(client, email="remote@example.com")
+    access, _, headers = await _login_bearer(client, email="remote@example.com")
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    jti = decode_token(access)["jti"]
+    assert _principal_cache.get(jti) is not None
+
+    # blacklist_jti 를 거치지 않음 → 이 워커의 캐시는 그대로
+    exp = datetime.now(timezone.utc) + timedelta(minutes=5)
+    await TokenBlacklist.create(jti=jti, expires_at=exp)
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 401
+    assert _principal_cache.get(jti) is None
+
+
+# 해시 워커 대기열이 가득 차면 bcrypt 실행 없이 503
+@pytest.mark.anyio
+async def test_login_rejected_when_hash_queue_full(client, monkeypatch):
+    from app.api.core.config import settings
+
+    await _register(client, email="busy@example.com")
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_WAITING", 0)
+    res = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "busy@example.com", "password": "Passw0rd!"},
+    )
+    assert res.status_code == 503
+    assert res.headers.get("retry-after") == "1"
+
+
+# 해시 정책(bcrypt rounds)이 바뀌면 로그인 성공 후 백그라운드로 재해시
+@pytest.mark.anyio
+async def test_login_rehashes_outdated_password_hash(client, monkeypatch):
+    from app.api.core import security
+    from app.api.core.config import settings
+    from app.api.models.user import User
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    security.configure_password_context()
+    try:
+        await _register(client, email="rehash@example.com")
+        before = (await User.get(email="rehash@example.com")).hashed_password
+        assert before.startswith("$2b$04$")
+
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        security.configure_password_context()
+        await _login_bearer(client, email="rehash@example.com")
+
+        after = (await User.get(email="rehash@example.com")).hashed_password
+        assert after.startswith("$2b$05$")
+        await _login_bearer(client, email="rehash@example.com")
+    finally:
+        monkeypatch.undo()
+        security.configure_password_context()
+
+
+# 프로세스 풀: 풀을 만든 뒤 정책을 바꿔도 자식 프로세스가 새 정책으로 해시
+@pytest.mark.anyio
+async def test_process_hash_pool_follows_policy_changes(monkeypatch):
+    from app.api.core import security
+    from app.api.core.config import settings
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_EXECUTOR", "process")
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    security.configure_password_context()
+    try:
+        first = await security.get_password_hash_async("Passw0rd!")
+        assert first.startswith("$2b$04$")
+
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        security.configure_password_context()
+        second = await security.get_password_hash_async("Passw0rd!")
+        assert second.startswith("$2b$05$")
+        assert await security.verify_password_async("Passw0rd!", first)
+    finally:
+        security.shutdown_hash_pool()
+        monkeypatch.undo()
+        security.configure_password_context()
+
+
+# 만료 토큰 주기 정리: lease 잡은 워커만 실행, 배치로 나눠 삭제, 보고/메트릭
+@pytest.mark.anyio
+async def test_maintenance_purges_expired_tokens_on_leader_only(client, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+    from app.api.core import metrics
+    from app.api.core.config import settings
+    from app.api.models.revoked_token import RevokedToken
+    from app.api.models.token_blacklist import TokenBlacklist
+    from app.api.services import maintenance
+    from tests.helpers import count_queries
+
+    monkeypatch.setattr(settings, "MAINTENANCE_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "MAINTENANCE_BATCH_PAUSE_SECONDS", 0)
+    now = datetime.now(timezone.utc)
+    past, future = now - timedelta(minutes=1), now + timedelta(minutes=5)
+    await TokenBlacklist.bulk_create(
+        [TokenBlacklist(jti=f"old-{i}", expires_at=past) for i in range(7)]
+        + [TokenBlacklist(jti="live", expires_at=future)]
+    )
+    await RevokedToken.bulk_create(
+        [RevokedToken(jti=f"r-old-{i}", expires_at=past) for i in range(4)]
+        + [RevokedToken(jti="r-live", expires_at=future)]
+    )
+    before = metrics.snapshot()
+
+    with count_queries() as queries:
+        report = await maintenance.run_maintenance("worker-a")
+    assert report["leader"] is True
+    assert (report["token_blacklist"], report["revoked_tokens"], report["refresh_token_family"]) == (7, 4, 0)
+    assert report["seconds"] >= 0
+    # DELETE 한 문장당 최대 3행
+    deletes = [q for q in queries if q.startswith("DELETE")]
+    assert len(deletes) == 3 + 2, deletes
+    assert await TokenBlacklist.all().values_list("jti", flat=True) == ["live"]
+    assert await RevokedToken.all().values_list("jti", flat=True) == ["r-live"]
+
+    after = metrics.snapshot()
+    assert after["maintenance.purged.token_blacklist"] == before["maintenance.purged.token_blacklist"] + 7
+    assert after["maintenance.purged.revoked_tokens"] == before["maintenance.purged.revoked_tokens"] + 4
+    assert after["maintenance.leader"] == 1
+
+    # 다른 워커는 lease 가 살아 있는 동안 실행하지 않음, 리더는 계속 연장
+    await TokenBlacklist.create(jti="old-again", expires_at=past)
+    assert await maintenance.run_maintenance("worker-b") == {"leader": False}
+    assert await TokenBlacklist.exists(jti="old-again")
+    assert (await maintenance.run_maintenance("worker-a"))["token_blacklist"] == 1
+
+    # 리더가 lease 를 놓으면(종료/만료) 다른 워커가 넘겨받음
+    await maintenance.release_lease(maintenance.LEASE_NAME, "worker-a")
+    assert (await maintenance.run_maintenance("worker-b"))["leader"] is True
+    assert await maintenance.acquire_lease(maintenance.LEASE_NAME, "worker-a", 60) is False
+
+
+# refresh 토큰 family: 회전은 행 갱신 하나(블랙리스트 쓰기 없음), 재사용 시 family 전체 폐기
+@pytest.mark.anyio
+async def test_refresh_family_rotation_reuse_and_logout(client):
+    import asyncio
+    from app.api.core import metrics
+    from app.api.core.security import decode_token
+    from app.api.models.refresh_family import RefreshFamily
+    from app.api.models.token_blacklist import TokenBlacklist
+    from tests.helpers import count_queries
+
+    async def refresh(token):
+        return await client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+
+    await _register(client, email="family@example.com")
+    _, r0, _ = await _login_bearer(client, email="family@example.com")
+    claims = decode_token(r0, token_type="refresh")
+    family = claims["fam"]
+    assert claims["gen"] == 0
+
+    with count_queries() as queries:
+        res = await refresh(r0)
+    assert res.status_code == 200
+    r1 = res.json()["refresh_token"]
+    assert decode_token(r1, token_type="refresh")["fam"] == family
+    assert decode_token(r1, token_type="refresh")["gen"] == 1
+    # 사용자 조회 + family UPDATE
+    assert [q.split()[0] for q in queries] == ["SELECT", "UPDATE"], queries
+    assert await TokenBlacklist.all().count() == 0
+    r2 = (await refresh(r1)).json()["refresh_token"]
+    assert await RefreshFamily.all().count() == 1
+    assert (await RefreshFamily.get(id=family)).generation == 2
+
+    # 이미 회전된 r1 재사용 → 거부 + family 폐기 → 최신 r2 도 거부
+    before = metrics.snapshot()["auth.refresh.reuse_detected"]
+    assert (await refresh(r1)).status_code == 401
+    assert metrics.snapshot()["auth.refresh.reuse_detected"] == before + 1
+    assert (await refresh(r2)).status_code == 401
+
+    # 같은 토큰 동시 사용: 하나만 성공
+    _, s0, _ = await _login_bearer(client, email="family@example.com")
+    results = await asyncio.gather(refresh(s0), refresh(s0))
+    assert sorted(r.status_code for r in results) == [200, 401]
+
+    # 로그아웃: 쿠키의 refresh family 를 UPDATE 한 번으로 폐기
+    await _login_cookie(client, email="family@example.com")
+    cookie_refresh = client.cookies.get("refresh_token")
+    cookie_family = decode_token(cookie_refresh, token_type="refresh")["fam"]
+    assert (await client.post("/api/v1/auth/refresh", params={"as_cookie": "true"})).status_code == 200
+    latest = client.cookies.get("refresh_token")
+    assert (await client.post("/api/v1/auth/logout")).status_code == 200
+    assert (await RefreshFamily.get(id=cookie_family)).revoked_at is not None
+    assert (await refresh(latest)).status_code == 401
+
+
+# fam 클레임 없는(배포 전 발급) refresh 토큰은 한 번만 family 로 옮겨 회전
+@pytest.mark.anyio
+async def test_legacy_refresh_token_adopted_once(client):
+    from app.api.core.security import create_refresh_token, decode_token
+
+    await _register(client, email="legacy@example.com")
+    legacy = create_refresh_token("legacy@example.com")
+    res = await client.post("/api/v1/auth/refresh", json={"refresh_token": legacy})
+    assert res.status_code == 200
+    claims = decode_token(res.json()["refresh_token"], token_type="refresh")
+    assert claims["fam"] == decode_token(legacy, token_type="refresh")["jti"] and claims["gen"] == 1
+
+    res = await client.post("/api/v1/auth/refresh", json={"refresh_token": legacy})
+    assert res.status_code == 401
+
+
+# 비대칭 서명(ES256/EdDSA) + kid + JWKS, 키 교체 중엔 이전 공개키로도 검증
+@pytest.mark.anyio
+@pytest.mark.parametrize("alg", ["ES256", "EdDSA"])
+async def test_asymmetric_jwt_with_jwks_and_key_rotation(client, monkeypatch, alg):
+    from jose import jwt as jose_jwt
+    from app.api.core import jwt_keys
+    from app.api.core.config import settings
+    from app.api.core.security import _principal_cache
+
+    await _register(client, email=f"{alg}@example.com")
+    hs256_access, _, hs256_headers = await _login_bearer(client, email=f"{alg}@example.com")
+
+    old_key, new_key = jwt_keys.generate_private_key_pem(alg), jwt_keys.generate_private_key_pem(alg)
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", alg)
+    monkeypatch.setattr(settings, "JWT_SIGNING_KEY", old_key)
+    monkeypatch.setattr(settings, "JWT_VERIFICATION_KEYS", [])
+    try:
+        jwt_keys.reload_keyring()
+        access, refresh, headers = await _login_bearer(client, email=f"{alg}@example.com")
+        header = jose_jwt.get_unverified_header(access)
+        assert header["alg"] == alg and header["kid"]
+        assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+
+        jwks = (await client.get("/.well-known/jwks.json")).json()
+        assert [k["kid"] for k in jwks["keys"]] == [header["kid"]]
+        if alg == "ES256":
+            # 다른 서비스: JWKS 만으로 로컬 검증
+            claims = jose_jwt.decode(access, jwks["keys"][0], algorithms=["ES256"])
+            assert claims["sub"] == f"{alg}@example.com" and claims["typ"] == "access"
+
+        # 옮기는 동안 kid 없는 기존 HS256 토큰 허용 (끄면 거부)
+        assert (await client.get("/api/v1/users/me", headers=hs256_headers)).status_code == 200
+        monkeypatch.setattr(settings, "JWT_ACCEPT_HS256", False)
+        _principal_cache.clear()
+        assert (await client.get("/api/v1/users/me", headers=hs256_headers)).status_code == 401
+
+        # 키 교체: 새 키로 서명, 이전 공개키는 검증 목록에 → 기존 토큰도 통과
+        monkeypatch.setattr(settings, "JWT_SIGNING_KEY", new_key)
+        monkeypatch.setattr(settings, "JWT_VERIFICATION_KEYS", [jwt_keys.public_key_pem(old_key)])
+        jwt_keys.reload_keyring()
+        _principal_cache.clear()
+        assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+        assert len((await client.get("/.well-known/jwks.json")).json()["keys"]) == 2
+        res = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh})
+        assert res.status_code == 200
+        assert jose_jwt.get_unverified_header(res.json()["access_token"])["kid"] != header["kid"]
+
+        # 이전 키를 목록에서 빼면 그 키로 서명된 토큰은 거부
+        monkeypatch.setattr(settings, "JWT_VERIFICATION_KEYS", [])
+        jwt_keys.reload_keyring()
+        _principal_cache.clear()
+        assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 401
+
+        # kid 는 맞지만 서명이 다른 토큰
+        head, body, sig = res.json()["access_token"].split(".")
+        tampered = f"{head}.{body}.{sig[:-4]}AAAA"
+        r = await client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {tampered}"})
+        assert r.status_code == 401
+    finally:
+        monkeypatch.undo()
+        jwt_keys.reload_keyring()
+
+
+# JWT 백엔드: fast/jose 토큰 상호 검증, 위조/만료/alg 불일치는 둘 다 거부
+@pytest.mark.anyio
+async def test_jwt_backends_are_interchangeable(client, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+    from fastapi import HTTPException
+    from jose import JWTError
+    from app.api.core import security
+    from app.api.core.config import settings
+
+    now = datetime.now(timezone.utc)
+    claims = {"sub": "a@example.com", "typ": "access", "jti": "j1", "exp": now + timedelta(minutes=5), "iat": now}
+    backends = [factory(settings.SECRET_KEY, "HS256") for factory in security.JWT_BACKENDS.values()]
+    exp = int(claims["exp"].timestamp())
+    for a in backends:
+        # python-jose 는 넘긴 dict 의 datetime 을 제자리에서 바꾸므로 매번 복사
+        token = a.encode(dict(claims))
+        for b in backends:
+            decoded = b.decode(token)
+            assert decoded["sub"] == "a@example.com" and decoded["exp"] == exp
+
+        head, body, sig = token.split(".")
+        expired = a.encode({**claims, "exp": now - timedelta(seconds=5)})
+        other_alg = security.JoseJWTBackend(settings.SECRET_KEY, "HS512").encode(dict(claims))
+        other_key = type(a)("other-secret", "HS256").encode(dict(claims))
+        for b in backends:
+            for bad in (f"{head}.{body}.{sig[:-2]}xx", expired, other_alg, other_key, "a.b", f"{head}.!!.{sig}"):
+                with pytest.raises(JWTError):
+                    b.decode(bad)
+
+    # 앱 경로: 어느 백엔드로 바꿔도 기존 토큰 그대로 통과
+    await _register(client, email="backend@example.com")
+    _, refresh, headers = await _login_bearer(client, email="backend@example.com")
+    monkeypatch.setattr(settings, "JWT_BACKEND", "jose")
+    security._principal_cache.clear()
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    assert security.get_jwt_backend().name == "jose"
+    res = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh})
+    monkeypatch.setattr(settings, "JWT_BACKEND", "fast")
+    assert security.decode_token(res.json()["access_token"])["sub"] == "backend@example.com"
+    with pytest.raises(HTTPException):
+        security.decode_token(res.json()["refresh_token"], token_type="access")
+
+
+# 로그인 시도 제한: IP/이메일 token bucket, 넘으면 사용자 조회·bcrypt 전에 429 + Retry-After
+@pytest.mark.anyio
+async def test_login_rate_limited_before_db_and_hash(client, monkeypatch):
+    from app.api.core import metrics, ratelimit, security
+    from app.api.core.config import settings
+    from tests.helpers import count_queries
+
+    monkeypatch.setattr(settings, "LOGIN_EMAIL_BURST", 3)
+    monkeypatch.setattr(settings, "LOGIN_IP_BURST", 6)
+    ratelimit.configure_login_limiter()
+    try:
+        await _register(client, email="limit@example.com")
+        bad = {"email": "limit@example.com", "password": "wrong-pass"}
+        for _ in range(3):
+            assert (await client.post("/api/v1/auth/login", json=bad)).status_code == 401
+
+        hashed = []
+        monkeypatch.setattr(security, "verify_password", lambda *a: hashed.append(a) or False)
+        before = metrics.snapshot()
+        with count_queries() as queries:
+            r = await client.post("/api/v1/auth/login", json={**bad, "email": "LIMIT@example.com "})
+        assert r.status_code == 429 and int(r.headers["retry-after"]) >= 1
+        assert queries == [] and hashed == []
+        after = metrics.snapshot()
+        assert after["ratelimit.login.rejected.email"] == before["ratelimit.login.rejected.email"] + 1
+        # 맞는 비밀번호도 버킷이 찰 때까지는 거부
+        r = await client.post("/api/v1/auth/login", json={**bad, "password": "Passw0rd!"})
+        assert r.status_code == 429
+
+        # 다른 이메일은 IP 버킷이 남은 만큼만 (이메일에서 막힌 시도도 IP 토큰은 씀 → 6개 중 5개 사용됨)
+        assert (await client.post("/api/v1/auth/login", json={**bad, "email": "x@example.com"})).status_code == 401
+        r = await client.post("/api/v1/auth/login", json={**bad, "email": "y@example.com"})
+        assert r.status_code == 429
+        assert metrics.snapshot()["ratelimit.login.rejected.ip"] == after["ratelimit.login.rejected.ip"] + 1
+    finally:
+        monkeypatch.undo()
+        ratelimit.configure_login_limiter()
+
+
+# 이메일 버킷: (이메일, IP) 별 + 틀린 비밀번호만 → 다른 IP 의 실패로 잠기지 않음. 신뢰 프록시만 X-Forwarded-For
+@pytest.mark.anyio
+async def test_login_email_bucket_per_ip_and_failures_only(client, monkeypatch):
+    from app.api.core import ratelimit
+    from app.api.core.config import settings
+
+    monkeypatch.setattr(settings, "LOGIN_EMAIL_BURST", 2)
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["127.0.0.0/8"])
+    ratelimit.configure_login_limiter()
+    try:
+        await _register(client, email="victim@example.com")
+        good = {"email": "victim@example.com", "password": "Passw0rd!"}
+        bad = {**good, "password": "wrong-pass"}
+
+        def via(ip):
+            return {"X-Forwarded-For": f"{ip}, 127.0.0.5"}
+
+        # 성공한 로그인은 버킷을 쓰지 않음
+        for _ in range(4):
+            assert (await client.post("/api/v1/auth/login", json=good, headers=via("203.0.113.1"))).status_code == 200
+
+        # 공격자 IP 에서 실패 2번 → 그 IP 에선 맞는 비밀번호도 429
+        for _ in range(2):
+            assert (await client.post("/api/v1/auth/login", json=bad, headers=via("198.51.100.9"))).status_code == 401
+        r = await client.post("/api/v1/auth/login", json=good, headers=via("198.51.100.9"))
+        assert r.status_code == 429
+        # 사용자 IP 에선 그대로 로그인
+        assert (await client.post("/api/v1/auth/login", json=good, headers=via("203.0.113.1"))).status_code == 200
+
+        limiter = ratelimit.get_login_limiter()
+
+        class _Req:
+            def __init__(self, host, xff=None):
+                self.client = type("C", (), {"host": host})()
+                self.headers = {"x-forwarded-for": xff} if xff else {}
+
+        # 신뢰하지 않는 연결의 헤더는 무시, 위조된 왼쪽 값 대신 신뢰 프록시 바로 앞 주소
+        assert limiter.client_ip(_Req("192.0.2.7", "1.2.3.4")) == "192.0.2.7"
+        assert limiter.client_ip(_Req("127.0.0.1", "6.6.6.6, 203.0.113.1, 127.0.0.9")) == "203.0.113.1"
+        assert limiter.client_ip(_Req("127.0.0.1")) == "127.0.0.1"
+    finally:
+        monkeypatch.undo()
+        ratelimit.configure_login_limiter()
+
+
+def test_token_bucket_refill_and_eviction():
+    from app.api.core.ratelimit import TokenBucketLimiter
+
+    limiter = TokenBucketLimiter("test.bucket", per_minute=60, burst=2, maxsize=3, evict_seconds=1000)
+    assert limiter.hit("a", now=0) == 0 and limiter.hit("a", now=0) == 0
+    assert limiter.hit("a", now=0) == pytest.approx(1.0)
+    assert limiter.hit("a", now=0.5) == pytest.approx(0.5)
+    assert limiter.hit("a", now=1.5) == 0  # 1초에 1개씩 다시 참
+    # cost=0: 확인만 (토큰을 쓰지 않고, 없는 키는 저장하지 않음)
+    assert limiter.hit("a", now=1.5, cost=0) == pytest.approx(0.5)
+    assert limiter.hit("a", now=2.0, cost=0) == 0 and limiter.hit("a", now=2.0, cost=0) == 0
+    assert limiter.hit("new", now=1.5, cost=0) == 0 and "new" not in limiter._buckets
+
+    # 가득 찬 버킷만 정리 (새 버킷과 같으므로 결과 불변)
+    limiter.hit("b", now=1.5)
+    assert limiter.evict(now=2.0) == 0
+    assert limiter.evict(now=4.0) == 2 and len(limiter) == 0
+
+    # 최대 키 수를 넘으면 가장 오래 안 쓴 키부터
+    for key in "wxyz":
+        limiter.hit(key, now=10)
+    assert len(limiter) == 3 and list(limiter._buckets) == ["x", "y", "z"]
@@ -0,0 +1,146 @@
+# tests/test_db.py
+import asyncio
+
+import pytest
+
+from app.api.core import metrics
+from app.api.core.config import settings
+from app.api.db.database import build_tortoise_config
+from app.api.db.pool import _MeteredPool
+
+
+# Postgres DSN 은 풀 설정이 credentials 로 펼쳐지고, DSN 에 명시한 값이 우선
+def test_postgres_config_renders_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_MAX_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 0)
+    conf = build_tortoise_config("postgres://u:p@db:5432/app?minsize=3")["connections"]["default"]
+
+    assert conf["engine"] == "app.api.db.pool"
+    creds = conf["credentials"]
+    assert (creds["host"], creds["port"], creds["database"]) == ("db", 5432, "app")
+    assert int(creds["minsize"]) == 3
+    assert creds["maxsize"] == 20
+    assert creds["statement_cache_size"] == 0
+    assert creds["command_timeout"] == settings.DB_COMMAND_TIMEOUT
+    assert creds["max_inactive_connection_lifetime"] == settings.DB_MAX_INACTIVE_CONNECTION_LIFETIME
+
+    # sqlite 는 그대로
+    assert build_tortoise_config("sqlite://:memory:")["connections"]["default"] == "sqlite://:memory:"
+
+
+class _FakePool:
+    def __init__(self, size):
+        self._free = asyncio.Queue()
+        for i in range(size):
+            self._free.put_nowait(i)
+        self.size = size
+        self.closed = False
+
+    async def acquire(self, *, timeout=None):
+        if self.closed:
+            raise RuntimeError("pool is closed")
+        return await asyncio.wait_for(self._free.get(), timeout)
+
+    async def release(self, conn):
+        self._free.put_nowait(conn)
+
+    def get_size(self):
+        return self.size
+
+    def get_idle_size(self):
+        return self._free.qsize()
+
+    def get_max_size(self):
+        return self.size
+
+
+# 풀 계측: 포화도/대기열/대기 시간/타임아웃 (취소/풀 오류는 타임아웃과 따로)
+@pytest.mark.anyio
+async def test_metered_pool_reports_saturation_and_wait():
+    pool = _MeteredPool(_FakePool(2), "test")
+    metrics._reset()
+
+    a = await pool.acquire()
+    b = await pool.acquire()
+    snap = metrics.snapshot()
+    assert snap["db.pool.test.in_use"] == 2 and snap["db.pool.test.saturation"] == 1.0
+
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.02)
+    assert metrics.snapshot()["db.pool.test.waiting"] == 1
+    await pool.release(a)
+    c = await waiter
+
+    snap = metrics.snapshot()
+    assert snap["db.pool.test.waiting"] == 0
+    assert snap["db.pool.test.acquired"] == 3
+    assert snap["db.pool.test.wait_us"] >= 15_000
+
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.acquire(timeout=0.01)
+    assert metrics.snapshot()["db.pool.test.timeouts"] == 1
+
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await pool.release(b)
+    await pool.release(c)
+
+    pool._pool.closed = True
+    with pytest.raises(RuntimeError):
+        await pool.acquire()
+
+    snap = metrics.snapshot()
+    assert (snap["db.pool.test.timeouts"], snap["db.pool.test.cancelled"], snap["db.pool.test.errors"]) == (1, 1, 1)
+    assert snap["db.pool.test.waiting"] == 0
+
+
+# 복제본 라우팅 (SQLite 파일 여러 개로 대역): 라운드로빈 / 헬스체크 제외 / 쓴 직후 primary
+@pytest.mark.anyio
+async def test_reads_route_to_healthy_replicas_with_read_your_writes(tmp_path, monkeypatch):
+    from tortoise import connections
+    from app.api.db import routing
+    from app.api.db.database import close_db, init_db
+    from app.api.models import Diary, User
+    from app.api.repositories.db.user_repo import get_by_email
+    from app.api.repositories.diary_repo import create_diary, get_diary_by_id_for_user, list_diaries
+
+    monkeypatch.setenv("DB_URL", f"sqlite://{tmp_path / 'primary.db'}")
+    monkeypatch.setattr(settings, "DB_REPLICA_URLS", [
+        f"sqlite://{tmp_path / 'r0.db'}",
+        f"sqlite://{tmp_path / 'r1.db'}",
+        f"sqlite://{tmp_path / 'missing' / 'r2.db'}",  # 열 수 없음 → unhealthy
+    ])
+    await init_db()
+    try:
+        assert routing.replica_aliases() == ["replica_0", "replica_1", "replica_2"]
+        assert metrics.snapshot()["db.replica.healthy"] == 2
+
+        user = await User.create(email="rr@example.com", name="rr", hashed_password="x")
+        await Diary.create(user=user, title="primary", content="c")
+        for alias in ("replica_0", "replica_1"):
+            db = connections.get(alias)
+            await User.create(id=user.id, email=user.email, name="rr", hashed_password="x", using_db=db)
+            await Diary.create(user_id=user.id, title=alias, content="c", using_db=db)
+
+        seen = {(await list_diaries(user))[0].title for _ in range(4)}
+        assert seen == {"replica_0", "replica_1"}
+
+        # 쓴 직후엔 같은 사용자의 읽기가 primary 로
+        await create_diary(user, {"title": "new", "content": "c"})
+        assert {d.title for d in await list_diaries(user)} == {"primary", "new"}
+
+        # 창이 지나면 다시 복제본. 수정/삭제 전 조회(for_update)는 항상 primary
+        routing._recent_writers.clear()
+        assert (await list_diaries(user))[0].title.startswith("replica_")
+        first_id = (await Diary.filter(user=user).order_by("id").first()).id
+        assert (await get_diary_by_id_for_user(user, first_id)).title.startswith("replica_")
+        assert (await get_diary_by_id_for_user(user, first_id, for_update=True)).title == "primary"
+
+        # 복제본에 아직 없는 사용자(방금 가입)는 primary 로 재조회
+        await User.create(email="fresh@example.com", name="f", hashed_password="x")
+        assert (await get_by_email("fresh@example.com")).name == "f"
+    finally:
+        await close_db()
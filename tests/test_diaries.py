@@ -0,0 +1,339 @@
+# tests/test_diaries.py
+import pytest
+from .helpers import _register, _login_bearer, count_queries
+
+
+async def _auth(client, email="diary@example.com"):
+    await _register(client, email=email)
+    _, _, headers = await _login_bearer(client, email=email)
+    return headers
+
+
+# keyset 커서: offset 페이징과 같은 순서로 빠짐/중복 없이 끝까지 순회
+@pytest.mark.anyio
+async def test_cursor_pagination_matches_offset_order(client):
+    headers = await _auth(client)
+    for i, day in enumerate(["2025-08-01", "2025-08-02", "2025-08-02", "2025-08-03", "2025-08-05"]):
+        r = await client.post(
+            "/api/v1/diaries", json={"title": f"d{i}", "content": "c", "date": day}, headers=headers
+        )
+        assert r.status_code == 201
+
+    for order in ("desc", "asc"):
+        full = await client.get(f"/api/v1/diaries?order={order}&page_size=100", headers=headers)
+        expected = [d["id"] for d in full.json()]
+
+        seen, cursor = [], None
+        while True:
+            params = {"order": order, "page_size": 2}
+            if cursor:
+                params["cursor"] = cursor
+            r = await client.get("/api/v1/diaries", params=params, headers=headers)
+            assert r.status_code == 200
+            seen += [d["id"] for d in r.json()]
+            cursor = r.headers.get("x-next-cursor")
+            if not cursor:
+                break
+        assert seen == expected
+
+    bad = await client.get("/api/v1/diaries?cursor=not-a-cursor", headers=headers)
+    assert bad.status_code == 400
+
+
+# 전문검색: 접두어 매칭 + 관련도순, 목록의 q 필터도 같은 인덱스 사용
+@pytest.mark.anyio
+async def test_full_text_search_prefix_and_rank(client):
+    headers = await _auth(client, email="search@example.com")
+    bodies = [
+        ("운동 기록", "헬스장에서 운동했다"),
+        ("행복한 하루", "친구랑 행복했다. 정말 행복 그 자체"),
+        ("점심", "파스타 먹음, 행복했다"),
+    ]
+    for title, content in bodies:
+        await client.post("/api/v1/diaries", json={"title": title, "content": content}, headers=headers)
+
+    r = await client.get("/api/v1/diaries/search", params={"q": "행복"}, headers=headers)
+    assert r.status_code == 200
+    titles = [d["title"] for d in r.json()]
+    assert titles[0] == "행복한 하루"
+    assert set(titles) == {"행복한 하루", "점심"}
+
+    r = await client.get("/api/v1/diaries", params={"q": "헬스"}, headers=headers)
+    assert [d["title"] for d in r.json()] == ["운동 기록"]
+
+    # 수정하면 인덱스도 갱신
+    diary_id = r.json()[0]["id"]
+    await client.patch(f"/api/v1/diaries/{diary_id}", json={"content": "수영장"}, headers=headers)
+    r = await client.get("/api/v1/diaries", params={"q": "헬스"}, headers=headers)
+    assert r.json() == []
+
+    # q 필터는 매치 개수 제한 없이 목록 쿼리 안에서 평가 → 페이징/total 이 전체 매치 기준
+    from app.api.models.user import User
+    from app.api.repositories.diary_repo import list_diaries_with_total
+    user = await User.get(email="search@example.com")
+    items, total = await list_diaries_with_total(user, page=2, page_size=1, q="행복")
+    assert total == 2 and len(items) == 1
+    items, total = await list_diaries_with_total(user, q="행복' OR 1=1 --")
+    assert total == 0
+
+
+# 태그 교체는 diff 반영, tags 없이 PATCH 하면 기존 태그 유지
+@pytest.mark.anyio
+async def test_update_tags_applies_diff_and_keeps_tags_when_omitted(client):
+    headers = await _auth(client, email="tags@example.com")
+    r = await client.post(
+        "/api/v1/diaries", json={"title": "t", "content": "c", "tags": ["a", "b", "a"]}, headers=headers
+    )
+    diary_id = r.json()["id"]
+    assert sorted(r.json()["tags"]) == ["a", "b"]
+
+    r = await client.patch(f"/api/v1/diaries/{diary_id}", json={"tags": ["b", "c"]}, headers=headers)
+    assert sorted(r.json()["tags"]) == ["b", "c"]
+
+    r = await client.patch(f"/api/v1/diaries/{diary_id}", json={"title": "t2"}, headers=headers)
+    assert r.json()["title"] == "t2"
+    assert sorted(r.json()["tags"]) == ["b", "c"]
+
+    # 같은 이름 태그는 사용자별로 하나만
+    await client.post("/api/v1/diaries", json={"title": "u", "content": "c", "tags": ["c"]}, headers=headers)
+    r = await client.get("/api/v1/tags", headers=headers)
+    assert sorted(t["name"] for t in r.json()) == ["a", "b", "c"]
+
+
+# 관계 로딩은 레포에서 한 번만: 목록은 행 수와 무관하게 쿼리 3개(캐시 버전 + 일기 + 태그 prefetch)
+@pytest.mark.anyio
+async def test_diary_endpoints_issue_no_extra_relation_queries(client):
+    headers = await _auth(client, email="queries@example.com")
+    await client.get("/api/v1/users/me", headers=headers)  # principal 캐시 채우기
+
+    with count_queries() as queries:
+        r = await client.post(
+            "/api/v1/diaries", json={"title": "t", "content": "c", "tags": ["x", "y", "z"]}, headers=headers
+        )
+    assert r.status_code == 201 and sorted(r.json()["tags"]) == ["x", "y", "z"]
+    # diary INSERT + 태그 SELECT + 태그 bulk INSERT + 새 태그 SELECT + diary_tag INSERT + 통계 upsert + 목록 버전
+    assert len(queries) == 7, queries
+    diary_id = r.json()["id"]
+
+    with count_queries() as queries:
+        r = await client.get(f"/api/v1/diaries/{diary_id}", headers=headers)
+    assert r.status_code == 200
+    assert len(queries) == 2, queries
+
+    for i in range(6):
+        await client.post("/api/v1/diaries", json={"title": f"n{i}", "content": "c", "tags": ["x"]}, headers=headers)
+    with count_queries() as queries:
+        r = await client.get("/api/v1/diaries", headers=headers)
+    assert len(r.json()) == 7
+    assert len(queries) == 3, queries
+
+    with count_queries() as queries:
+        r = await client.patch(f"/api/v1/diaries/{diary_id}", json={"title": "t2"}, headers=headers)
+    assert r.status_code == 200 and sorted(r.json()["tags"]) == ["x", "y", "z"]
+    # 조회 2 + UPDATE 1 + 목록 버전 1
+    assert len(queries) == 4, queries
+
+
+def _previous_diary_dict(d):
+    """직렬화 전용 인코더 도입 전 diary 엔드포인트의 dict (jsonable_encoder → JSONResponse 로 응답)"""
+    from datetime import datetime
+
+    raw_date = getattr(d, "date", None)
+    return {
+        "id": int(d.id),
+        "title": str(getattr(d, "title", "")),
+        "content": str(getattr(d, "content", "")),
+        "mood": getattr(d, "mood", None),
+        "date": raw_date.date() if isinstance(raw_date, datetime) else raw_date,
+        "is_private": bool(getattr(d, "is_private", True)),
+        "tags": [str(t.name) for t in d.tags],
+        "created_at": getattr(d, "created_at", None),
+        "updated_at": getattr(d, "updated_at", None),
+    }
+
+
+# 직렬화: orjson / stdlib 폴백 모두 이전 경로(jsonable_encoder, /ai 는 DiaryOut)와 같은 JSON
+#  (날짜, 태그 순서, None 필드, 비ASCII 문자열)
+@pytest.mark.anyio
+@pytest.mark.parametrize("use_orjson", [True, False])
+async def test_diary_serializers_match_previous_encoding(client, monkeypatch, use_orjson):
+    import json
+    from datetime import date
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+    from app.api.core import responses
+    from app.api.models import Diary, User
+    from app.api.repositories.diary_repo import create_diary, list_diary_rows, update_diary
+    from app.api.schemas import DiaryOut
+    from app.api.v1.diary.serializers import diary_to_ai_dict, encode_diary, encode_diary_rows
+
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson not installed")
+
+    user = await User.create(email="encode@example.com", name="e", hashed_password="x")
+    await create_diary(user, {"title": "먼저", "content": "c", "tags": ["z"]})
+    diary, tags = await create_diary(user, {
+        "title": "오늘 ✓ \"따옴표\"",
+        "content": "줄바꿈\n탭\t이모지 😀 \\ </script>",
+        "date": date(2024, 2, 29),
+        "tags": ["가", "z", "a"],
+    })
+    await create_diary(user, {"title": "빈 태그", "content": "c", "mood": "happy", "is_private": False})
+
+    async def reloaded(diary_id):
+        return await Diary.filter(id=diary_id).prefetch_related("tags", "emotion_keywords").first()
+
+    def previous(d) -> bytes:
+        return JSONResponse(jsonable_encoder(_previous_diary_dict(d))).body
+
+    fresh = await reloaded(diary.id)
+    assert fresh.mood is None and fresh.ai_summary is None
+    assert encode_diary(diary, tags) == previous(fresh)
+    assert encode_diary(fresh) == previous(fresh)
+
+    diary, tags = await update_diary(fresh, {"tags": ["a", "새 태그"], "mood": None})
+    fresh = await reloaded(diary.id)
+    assert encode_diary(diary, tags) == previous(fresh)
+
+    # 목록: values 행 + 태그 일괄 조회
+    rows = await list_diary_rows(user)
+    olds = [await reloaded(r["id"]) for r in rows]
+    assert encode_diary_rows(rows) == JSONResponse(jsonable_encoder([_previous_diary_dict(d) for d in olds])).body
+
+    # /ai 응답: 이전엔 response_model=DiaryOut (필드 순서만 다르고 값은 같아야 함)
+    previous_ai = DiaryOut.model_validate({
+        **_previous_diary_dict(fresh),
+        "ai_summary": fresh.ai_summary,
+        "main_emotion": fresh.main_emotion,
+        "emotion_keywords": [e.name for e in fresh.emotion_keywords],
+    })
+    assert json.loads(responses.dumps(diary_to_ai_dict(fresh))) == json.loads(previous_ai.model_dump_json())
+
+
+# ETag: 같으면 본문 없이 304, 수정/태그 삭제/작성 후엔 새 ETag. 목록 재검증은 캐시에서 (버전 조회 1번)
+@pytest.mark.anyio
+async def test_etag_revalidation_and_list_page_cache(client):
+    from app.api.models import User
+    from app.api.repositories.tag_repo import delete_tag, list_tags
+
+    headers = await _auth(client, email="etag@example.com")
+    r = await client.post("/api/v1/diaries", json={"title": "t", "content": "c", "tags": ["a"]}, headers=headers)
+    diary_id = r.json()["id"]
+
+    r = await client.get(f"/api/v1/diaries/{diary_id}", headers=headers)
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"] == "private, no-cache"
+    r = await client.get(f"/api/v1/diaries/{diary_id}", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304 and r.content == b""
+
+    r = await client.patch(f"/api/v1/diaries/{diary_id}", json={"title": "t2"}, headers=headers)
+    assert r.headers["etag"] != etag
+    new_etag = r.headers["etag"]
+    r = await client.get(f"/api/v1/diaries/{diary_id}", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["etag"] == new_etag
+
+    # 목록
+    r = await client.get("/api/v1/diaries", headers=headers)
+    list_etag = r.headers["etag"]
+    with count_queries() as queries:
+        r = await client.get("/api/v1/diaries", headers={**headers, "If-None-Match": f'W/{list_etag}, "x"'})
+    assert r.status_code == 304
+    assert len(queries) == 1
+
+    await client.post("/api/v1/diaries", json={"title": "n", "content": "c"}, headers=headers)
+    r = await client.get("/api/v1/diaries", headers={**headers, "If-None-Match": list_etag})
+    assert r.status_code == 200 and len(r.json()) == 2
+    list_etag = r.headers["etag"]
+
+    # 태그 삭제도 목록/단건 ETag 를 바꿈
+    user = await User.get(email="etag@example.com")
+    (tag,) = await list_tags(user)
+    assert await delete_tag(user, tag.id)
+    r = await client.get("/api/v1/diaries", headers={**headers, "If-None-Match": list_etag})
+    assert r.status_code == 200 and all(d["tags"] == [] for d in r.json())
+    r = await client.get(f"/api/v1/diaries/{diary_id}", headers={**headers, "If-None-Match": new_etag})
+    assert r.status_code == 200
+    list_etag = r_list_etag = (await client.get("/api/v1/diaries", headers=headers)).headers["etag"]
+
+    # 다른 워커의 쓰기도 users.diary_version 으로 반영 (워커 로컬 상태 없음) → 304 아님
+    from app.api.models import Diary
+    from app.api.repositories.diary_repo import update_diary
+    version = (await User.get(id=user.id)).diary_version
+    await update_diary(await Diary.get(id=diary_id), {"title": "from another worker"})
+    assert (await User.get(id=user.id)).diary_version == version + 1
+    r = await client.get("/api/v1/diaries", headers={**headers, "If-None-Match": list_etag})
+    assert r.status_code == 200 and r.json()[-1]["title"] == "from another worker"
+    list_etag = r.headers["etag"]
+
+    # AI 결과 저장도 목록 캐시 무효화
+    r = await client.post(f"/api/v1/ai/diaries/{diary_id}/summarize?background=false", headers=headers)
+    assert r.status_code == 200
+    r = await client.get("/api/v1/diaries", headers={**headers, "If-None-Match": list_etag})
+    assert r.status_code == 200 and r.headers["etag"] != r_list_etag
+
+
+# 통계: 쓰기마다 diary_stat 에 차이만 반영, 조회는 집계 행만 (일기 수와 무관), 재계산과 항상 같음
+@pytest.mark.anyio
+async def test_diary_stats_follow_writes(client):
+    from app.api.models import DiaryStat
+    from app.api.repositories.diary_stats_repo import rebuild_stats
+
+    headers = await _auth(client, email="stats@example.com")
+    url = "/api/v1/diaries"
+    ids = []
+    for day, mood in (("2025-09-01", "happy"), ("2025-09-03", "happy"), ("2025-09-10", "sad"), ("2025-10-02", None)):
+        body = {"title": day, "content": "c", "date": day, **({"mood": mood} if mood else {})}
+        r = await client.post(url, json=body, headers=headers)
+        assert r.status_code == 201
+        ids.append(r.json()["id"])
+
+    r = await client.post(f"/api/v1/ai/diaries/{ids[0]}/analyze?background=false", headers=headers)
+    emotion, keywords = r.json()["main_emotion"], r.json()["emotion_keywords"]
+    assert emotion and keywords
+
+    await client.patch(f"{url}/{ids[1]}", json={"mood": "calm"}, headers=headers)
+    await client.patch(f"{url}/{ids[0]}", json={"date": "2025-09-08"}, headers=headers)
+    await client.delete(f"{url}/{ids[3]}", headers=headers)
+
+    q = {"date_from": "2025-09-01", "date_to": "2025-10-31"}
+    r = await client.get(f"{url}/stats", params={**q, "period": "week"}, headers=headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["totals"]["diaries"] == 3
+    assert body["totals"]["moods"] == {"happy": 1, "calm": 1, "sad": 1}
+    assert body["totals"]["emotions"] == {emotion: 1}
+    assert {k["name"] for k in body["totals"]["keywords"]} == set(keywords)
+    assert [(b["start"], b["diaries"], b["moods"]) for b in body["buckets"]] == [
+        ("2025-09-01", 1, {"calm": 1}),
+        ("2025-09-08", 2, {"happy": 1, "sad": 1}),
+    ]
+    assert body["buckets"][1]["emotions"] == {emotion: 1}
+
+    r = await client.get(f"{url}/stats", params={**q, "period": "month"}, headers=headers)
+    assert [(b["start"], b["diaries"]) for b in r.json()["buckets"]] == [("2025-09-01", 3)]
+
+    # 집계 행만 읽음: 일기가 늘어도 쿼리 수 그대로
+    with count_queries() as queries:
+        await client.get(f"{url}/stats", params={**q, "period": "day"}, headers=headers)
+    for i in range(5):
+        await client.post(url, json={"title": f"n{i}", "content": "c", "date": "2025-09-20"}, headers=headers)
+    with count_queries() as more:
+        r = await client.get(f"{url}/stats", params={**q, "period": "day"}, headers=headers)
+    assert len(more) == len(queries), more
+    assert r.json()["totals"]["diaries"] == 8
+
+    # 증분 결과 == 원본에서 다시 계산한 결과
+    def snapshot():
+        return DiaryStat.all().order_by("period", "period_start", "dimension", "value").values_list(
+            "user_id", "period", "period_start", "dimension", "value", "count"
+        )
+    incremental = await snapshot()
+    assert await rebuild_stats() == 8
+    assert await snapshot() == incremental
+
+    r = await client.get(f"{url}/stats", params={"date_from": "2025-10-01", "date_to": "2025-09-01"}, headers=headers)
+    assert r.status_code == 400
+    r = await client.get(f"{url}/stats", params={"date_from": "2015-01-01", "date_to": "2025-01-01"}, headers=headers)
+    assert r.status_code == 400
@@ -28,6 +28,10 @@ async def test_get_and_update_me(client):
     assert upd.status_code == 200
     assert upd.json()["name"] == "New Name"
 
+    # 캐시된 principal이 아니라 변경된 값이 보여야 함
+    again = await client.get("/api/v1/users/me", headers=headers)
+    assert again.json()["name"] == "New Name"
+
 
 @pytest.mark.anyio
 async def test_change_password_and_login_again(client):